@@ -0,0 +1,81 @@
+import logging
+import os
+from interfaces.host import (IHost, exit_code_marker)
+from var.global_var import g_oasis_batch_path
+
+
+class HostCmdBatch:
+    """Collect the shell commands of each host and run them in a single exec.
+
+    When batching is disabled, every command is executed immediately with
+    `host.cmd()`, which is one blocking round trip per command.
+    When batching is enabled, commands are queued per host and `flush()`
+    writes them into one script per host, then runs that script once.
+
+    The script is written to `g_oasis_batch_path`, which lives in the oasis
+    workspace and is mounted into every docker node at the same path.
+    Every command of the script is followed by an echo of its exit code, so
+    a failed command is reported without stopping the commands after it.
+    """
+
+    def __init__(self, enabled: bool = False, script_dir: str = g_oasis_batch_path):
+        self.enabled = enabled
+        self.script_dir = script_dir
+        # host name -> (host, [(command, check)])
+        self.pending = {}
+        # (host, command, output) of the failed commands of the last `flush()`
+        self.failed_cmds = []
+
+    def cmd(self, host: IHost, command: str, check: bool = True) -> str:
+        """Run or queue `command`; a queued command with `check` disabled is
+        not reported by `flush()` when it fails.
+        """
+        if not self.enabled:
+            return host.cmd(command)
+        if host.name() not in self.pending:
+            self.pending[host.name()] = (host, [])
+        self.pending[host.name()][1].append((command, check))
+        return ""
+
+    def flush(self) -> bool:
+        """Run all the queued commands, one script per host.
+
+        Returns False if any command failed, see `failed_cmds`.
+        """
+        self.failed_cmds = []
+        if not self.pending:
+            return True
+        if not os.path.exists(self.script_dir):
+            os.makedirs(self.script_dir)
+        for host_name, (host, commands) in self.pending.items():
+            script = f"{self.script_dir}{host_name}.sh"
+            with open(script, 'w', encoding='utf-8') as f:
+                f.write("".join(f"{command}\necho {exit_code_marker}$?\n"
+                                for command, _ in commands))
+            logging.info("Oasis runs %s batched commands on host %s",
+                         len(commands), host_name)
+            output = host.cmd(f"sh {script}")
+            os.remove(script)
+            self._check_exit_codes(host, commands, output or "")
+        self.pending = {}
+        return len(self.failed_cmds) == 0
+
+    def _check_exit_codes(self, host: IHost, commands, output: str):
+        """Match the output of a batch script to its commands, the output of
+        a command ends with its exit code marker.
+        """
+        chunks = output.split(exit_code_marker)
+        # the first chunk is the output of the first command, every other
+        # one starts with the exit code of the command before it.
+        cmd_output = chunks[0]
+        for i, (command, check) in enumerate(commands):
+            if i + 1 >= len(chunks):
+                if check:
+                    self.failed_cmds.append(
+                        (host, command, "not run, the batch script stopped"))
+                continue
+            exit_code, _, next_output = chunks[i + 1].partition('\n')
+            if check and exit_code.strip() != '0':
+                self.failed_cmds.append(
+                    (host, command, cmd_output.strip() or f"exit code {exit_code.strip()}"))
+            cmd_output = next_output
@@ -1,11 +1,18 @@
 import logging
 from interfaces.host import IHost
+from interfaces.net_backend import INetBackend
+from netbackend.shell_backend import ShellBackend
 from var.global_var import g_root_path
 
 
 class ContainernetHostAdapter(IHost):
-    def __init__(self, containernet_host):
+    def __init__(self, containernet_host, net_backend: INetBackend = None):
+        super().__init__()
         self.containernet_host = containernet_host
+        # the backend to clean up the tc rules; the shell is used if not set.
+        self.net_backend = net_backend or ShellBackend()
+        # interface name -> the ifb device that shapes its ingress traffic
+        self.intf_to_ifb = {}
 
     def is_connected(self) -> bool:
         return True
@@ -13,12 +20,15 @@ class ContainernetHostAdapter(IHost):
     def cmd(self, command: str) -> str:
         """Execute a command on the host and print the output.
         """
-        return self.containernet_host.cmd(command)
+        # the mininet shell of the node is shared by all the threads.
+        with self.cmd_lock:
+            return self.containernet_host.cmd(command)
 
     def cmdPrint(self, command: str) -> str:
         """Execute a command on the host and print the output.
         """
-        return self.containernet_host.cmdPrint(command)
+        with self.cmd_lock:
+            return self.containernet_host.cmdPrint(command)
 
     def name(self) -> str:
         """Get the name of the host.
@@ -38,6 +48,25 @@ class ContainernetHostAdapter(IHost):
     def getIntfs(self):
         return self.containernet_host.intfList()
 
+    def netns(self) -> str:
+        return f"/proc/{self.containernet_host.pid}/ns/net"
+
+    def allocate_ifb(self, intf: str) -> str:
+        """Get the ifb device for the ingress traffic of `intf`;
+        a new device takes the lowest free index of the host.
+        """
+        if intf in self.intf_to_ifb:
+            return self.intf_to_ifb[intf]
+        used_ifbs = set(self.intf_to_ifb.values())
+        index = 0
+        while f"ifb{index}" in used_ifbs:
+            index += 1
+        self.intf_to_ifb[intf] = f"ifb{index}"
+        return self.intf_to_ifb[intf]
+
+    def ifb_of(self, intf: str) -> str:
+        return self.intf_to_ifb.get(intf)
+
     def cleanup(self):
         """Cleanup the host.
         """
@@ -46,19 +75,13 @@ class ContainernetHostAdapter(IHost):
             logging.debug(
                 f"clean up tc qdisc on host %s, interface %s",
                 self.containernet_host.name, intf.name)
-            tc_output = self.containernet_host.cmd(
-                f'tc qdisc show dev {intf.name}')
-            if "priomap" not in tc_output and "noqueue" not in tc_output:
-                self.containernet_host.cmd(
-                    f'tc qdisc del dev {intf.name} root')
-            intf_port = intf.name[-1]
-            if intf_port.isdigit():
-                ifb = f'ifb{intf_port}'
-                tc_output = self.containernet_host.cmd(
-                    f'tc qdisc show dev {ifb}')
-                if "priomap" not in tc_output and "noqueue" not in tc_output:
-                    self.containernet_host.cmd(
-                        f'tc qdisc del dev {ifb} root')
+            self.net_backend.del_root_qdisc(self, intf.name)
+        # remove the ifb devices, their qdiscs are removed with them.
+        for intf, ifb in self.intf_to_ifb.items():
+            logging.debug("remove %s of interface %s on host %s",
+                          ifb, intf, self.containernet_host.name)
+            self.net_backend.del_link(self, ifb)
+        self.intf_to_ifb = {}
         return self.containernet_host.cleanup()
 
     def get_host(self):
@@ -1,27 +1,31 @@
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from mininet.net import Containernet  # type: ignore
-from mininet.util import ipStr, netParse
+from mininet.node import Docker  # type: ignore
 from core.config import (NodeConfig)
-from core.topology import (ITopology, MatrixType)
+from core.topology import (ITopology, MatrixType, changed_links, is_same_matrix)
 from containernet.containernet_host import ContainernetHostAdapter
+from containernet.node_image import NodeImageBaker
 from interfaces.network import INetwork
+from interfaces.net_backend import NetemParams
 from interfaces.routing import IRoutingStrategy
 from var.global_var import g_oasis_root_fs
-from tools.util import (is_same_path)
+from tools.util import (is_same_path, is_base_path)
+from tools.tracer import g_tracer
+from tools.ipam import LinkIPAM
+from tools.host_fanout import fan_out
+from netbackend.backend_factory import create_net_backend
 
-
-def subnets(base_ip, parent_ip):
-    """
-    Find all the sibling subnets of `base_ip` that lives in `parent_ip`
-    """
-    parent, parent_prefix_len = netParse(parent_ip)
-    base, prefix_len = netParse(base_ip)
-
-    max_ip = (0xffffffff >> parent_prefix_len) | parent
-    step = 1 << 32 - prefix_len
-    # not allowing x.255.255
-    yield from range(base, max_ip, step)
+# the link attributes of `tools.link_trace` -> the matrix type
+trace_attr_mats = {
+    'bandwidth': MatrixType.BW_MATRIX,
+    'loss': MatrixType.LOSS_MATRIX,
+    'latency': MatrixType.LATENCY_MATRIX,
+    'jitter': MatrixType.JITTER_MATRIX
+}
 
 
 class ContainerizedNetwork (INetwork):
@@ -37,21 +41,34 @@ class ContainerizedNetwork (INetwork):
         super().__init__(**params)
         self.is_started_flag = False
         self.containernet = Containernet()
+        # guards the node bookkeeping of `containernet`, see `_setup_docker_nodes`.
+        self.containernet_lock = threading.Lock()
         self.routing_strategy = routing_strategy
         self.hosts = []
         # NodeConfig: Docker node related
         self.node_img = node_config.img
         self.node_vols = node_config.vols
         self.node_bind_port = node_config.bind_port
+        self.node_port_base = node_config.port_base or 10000
         self.node_name_prefix = node_config.name_prefix
         self.node_ip_range = node_config.ip_range or ""
         self.node_init_script = node_config.init_script or ""
+        self.node_build_workers = node_config.build_workers or 1
+        self.node_mount_rootfs = node_config.mount_rootfs or False
+        self.node_bake_image = node_config.bake_image or False
+        # True when `node_img` already has the root fs and the init script applied.
+        self.node_img_baked = False
         self.config_base_path = node_config.config_base_path or ""
+        self.net_backend_name = node_config.net_backend or "shell"
+        self.net_backend = create_net_backend(self.net_backend_name,
+                                              node_config.batch_setup or False)
+        # changes the links at runtime without the node shells, see `update_link`.
+        self.trace_backend = None
         logging.info('ContainerizedNetwork uses node_img %s', self.node_img)
-        # `node_ip_start` init from node_ip_range
-        base, _ = netParse(self.node_ip_range)
-        self.node_ip_prefix = 24
-        self.node_ip_start = ipStr(base) + f'/{self.node_ip_prefix}'
+        # one subnet of `node_ip_prefix` bits per link, taken from node_ip_range
+        self.node_ip_prefix = node_config.link_prefix or 24
+        self.ipam = LinkIPAM(self.node_ip_range or '10.0.0.0/8',
+                             self.node_ip_prefix)
         # Topology related
         self.net_top_description = net_topology.description()
         self._init_matrix(net_topology)
@@ -62,8 +79,11 @@ class ContainerizedNetwork (INetwork):
         else:
             raise ValueError('The topology matrix is None.')
         self.net_routes = [range(self.num_of_hosts)]
+        # (host index, peer host index) -> link, the lower index first
         self.pair_to_link = {}
         self.pair_to_link_ip = {}
+        # (host index, peer host index) -> interface name on the host
+        self.link_intfs = {}
         self.test_suites = []
         self._init_containernet()
 
@@ -76,6 +96,12 @@ class ContainerizedNetwork (INetwork):
     def get_host_ip_range(self):
         return self.node_ip_range
 
+    def get_link_prefix(self):
+        return self.node_ip_prefix
+
+    def get_ipam(self):
+        return self.ipam
+
     def get_routing_strategy(self):
         return self.routing_strategy
 
@@ -96,6 +122,10 @@ class ContainerizedNetwork (INetwork):
     def stop(self):
         self.routing_strategy.teardown_routes(self)
         self.containernet.stop()
+        self.net_backend.close()
+        if self.trace_backend is not None:
+            self.trace_backend.close()
+            self.trace_backend = None
         self.is_started_flag = False
 
     def reload(self, top: ITopology):
@@ -106,6 +136,13 @@ class ContainerizedNetwork (INetwork):
             "############### Oasis reload Networking ###########")
         # check topology change only.
         if self._check_topology_change(top):
+            if self._is_shaping_change_only(top):
+                self._reload_link_shaping(top)
+                if self.routing_strategy.depends_on_link_quality():
+                    # the least cost paths may change with the link attributes.
+                    self._setup_routes()
+                self.net_top_description = top.description()
+                return
             self._init_matrix(top)
             if self.net_mat is not None:
                 diff = self.num_of_hosts - len(self.net_mat)
@@ -122,21 +159,24 @@ class ContainerizedNetwork (INetwork):
     def get_link_table(self):
         return self.pair_to_link_ip
 
+    def get_link_intfs(self):
+        return self.link_intfs
+
     def _check_topology_change(self, top: ITopology):
         is_changed = False
-        if self.net_mat != top.get_matrix(MatrixType.ADJACENCY_MATRIX):
+        if not is_same_matrix(self.net_mat, top.get_matrix(MatrixType.ADJACENCY_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the topology change.")
-        if self.net_loss_mat != top.get_matrix(MatrixType.LOSS_MATRIX):
+        if not is_same_matrix(self.net_loss_mat, top.get_matrix(MatrixType.LOSS_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the loss matrix change.")
-        if self.net_bw_mat != top.get_matrix(MatrixType.BW_MATRIX):
+        if not is_same_matrix(self.net_bw_mat, top.get_matrix(MatrixType.BW_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the bandwidth matrix change.")
-        if self.net_latency_mat != top.get_matrix(MatrixType.LATENCY_MATRIX):
+        if not is_same_matrix(self.net_latency_mat, top.get_matrix(MatrixType.LATENCY_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the latency matrix change.")
-        if self.net_jitter_mat != top.get_matrix(MatrixType.JITTER_MATRIX):
+        if not is_same_matrix(self.net_jitter_mat, top.get_matrix(MatrixType.JITTER_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the jitter matrix change.")
         if is_changed is False:
@@ -153,6 +193,8 @@ class ContainerizedNetwork (INetwork):
             MatrixType.LATENCY_MATRIX)
         self.net_jitter_mat = net_topology.get_matrix(
             MatrixType.JITTER_MATRIX)
+        # the link attributes before `update_link`, None if they are not changed.
+        self.trace_base_mats = None
         logging.info('self.net_mat %s', self.net_mat)
         logging.info('self.net_loss_mat %s', self.net_loss_mat)
         logging.info('self.net_bw_mat %s', self.net_bw_mat)
@@ -160,18 +202,61 @@ class ContainerizedNetwork (INetwork):
         logging.info('self.net_jitter_mat %s', self.net_jitter_mat)
 
     def _init_containernet(self):
+        if self.node_bake_image:
+            self._bake_node_image()
         self._setup_docker_nodes(0, self.num_of_hosts - 1)
         self._init_root_fs(0, self.num_of_hosts - 1)
         self._setup_topology()
-        self.routing_strategy.setup_routes(self)
+        self._setup_routes()
         self._run_init_script(0, self.num_of_hosts - 1)
 
+    def _setup_routes(self):
+        with g_tracer.span("setup_routes", network=self.node_name_prefix):
+            self.routing_strategy.setup_routes(self)
+            self._flush_net_backend()
+
+    def _root_fs_dirs(self):
+        """
+        The root fs installed on the nodes, in the order of installation:
+        user's root fs can overwrite oasis's root fs.
+        """
+        root_fs_dirs = [g_oasis_root_fs]
+        root_fs_from_user = f"{self.config_base_path}rootfs"
+        if os.path.exists(root_fs_from_user) and \
+                not is_same_path(g_oasis_root_fs, root_fs_from_user):
+            root_fs_dirs.append(root_fs_from_user)
+        return [root_fs for root_fs in root_fs_dirs if os.path.exists(root_fs)]
+
+    def _bake_node_image(self):
+        """
+        Replace `node_img` with the image that has the root fs installed;
+        keep the original image if baking fails.
+        """
+        with g_tracer.span("bake_node_image", img=self.node_img):
+            baked_img = NodeImageBaker(self.node_vols).bake(
+                self.node_img, self._root_fs_dirs())
+        if baked_img is None:
+            logging.warning(
+                "Failed to bake the node image, fall back to %s", self.node_img)
+            return False
+        self.node_img = baked_img
+        self.node_img_baked = True
+        return True
+
     def _init_root_fs(self, start_index, end_index):
         """
         Install the root filesystem for the docker nodes.
         """
         if start_index > end_index:
             return False
+        if self.node_img_baked:
+            logging.info(
+                "############### Oasis Root fs is baked into %s", self.node_img)
+            return True
+        if self.node_mount_rootfs:
+            logging.info(
+                "############### Oasis Root fs is mounted read-only on the nodes")
+            return True
         # from oasis means it is mapped with oasis workspace
         root_fs_from_oasis = g_oasis_root_fs
         # from user means it is mapped by `-p config_folder`
@@ -185,7 +270,8 @@ class ContainerizedNetwork (INetwork):
         if not os.path.exists(root_fs_from_user):
             logging.error("User Root fs not found at %s", root_fs_from_user)
             return False
-        for i in range(start_index, end_index + 1):
+
+        def __install_root_fs(i):
             # user's root fs can overwrite oasis's root fs
             self.hosts[i].cmd("cp -r %s/* /" % root_fs_from_oasis)
             if is_same_root_fs is False:
@@ -197,20 +283,77 @@ class ContainerizedNetwork (INetwork):
                 logging.info(
                     "############### Oasis Root fs %s installed on %s",
                     root_fs_from_oasis, self.hosts[i].name())
+        self._for_each_node(__install_root_fs, start_index, end_index)
         return True
 
+    def _root_fs_volumes(self):
+        """
+        Bind-mount every file of the root filesystem read-only into the
+        docker nodes instead of copying it. Files of the user's root fs
+        override the ones of oasis's root fs.
+        """
+        mounted_files = {}
+        for root_fs in [g_oasis_root_fs, f"{self.config_base_path}rootfs"]:
+            if not os.path.exists(root_fs):
+                continue
+            for cur_dir, _, files in os.walk(root_fs):
+                for file_name in files:
+                    src = os.path.join(cur_dir, file_name)
+                    dst = '/' + os.path.relpath(src, root_fs)
+                    mounted_files[dst] = self._to_docker_host_path(src)
+        logging.info("Oasis mounts %s root fs files read-only",
+                     len(mounted_files))
+        return [f"{src}:{dst}:ro" for dst, src in mounted_files.items()]
+
+    def _to_docker_host_path(self, path):
+        """
+        Paths seen by oasis are mapped from the docker host by `node_vols`;
+        translate `path` back to the docker host so that it can be mounted.
+        """
+        host_path = None
+        matched_len = 0
+        for vol in self.node_vols or []:
+            src, dst, *_ = vol.split(':')
+            # the most specific mapping wins
+            if is_base_path(dst, path) and len(dst) > matched_len:
+                matched_len = len(dst)
+                host_path = os.path.normpath(
+                    os.path.join(src, os.path.relpath(path, dst)))
+        if host_path is None:
+            logging.warning("%s is not mapped from the docker host.", path)
+            return path
+        return host_path
+
+    def _for_each_node(self, func, start_index, end_index):
+        """
+        Run `func(i)` for the nodes from `start_index` to `end_index`,
+        through a pool of `build_workers` threads.
+        """
+        if self.node_build_workers <= 1:
+            for i in range(start_index, end_index + 1):
+                func(i)
+            return
+        with ThreadPoolExecutor(max_workers=self.node_build_workers) as pool:
+            # consume the results to raise the exceptions of workers.
+            list(pool.map(func, range(start_index, end_index + 1)))
+
     def _run_init_script(self, start_index, end_index):
         if not self.node_init_script:
             logging.info("No init script to run on the hosts.")
             return True
         if start_index > end_index:
             return False
-        for i in range(start_index, end_index + 1):
-            logging.info("run init script %s on host %s",
-                         self.node_init_script, self.hosts[i].name())
-            self.hosts[i].cmdPrint(self.node_init_script)
+        logging.info("run init script %s on hosts %s to %s",
+                     self.node_init_script, start_index, end_index)
+        results = fan_out(self.hosts[start_index:end_index + 1],
+                          self.node_init_script)
+        for result in results:
+            if not result.is_succeed():
+                logging.error("init script failed on host %s with exit code %s: %s",
+                              result.host.name(), result.exit_code, result.output)
         logging.info(
             "############### Oasis Init Node Scripts done ###########")
+        return True
 
     def _setup_docker_nodes(self, start_index, end_index):
         """
@@ -219,29 +362,51 @@ class ContainerizedNetwork (INetwork):
         """
         if start_index > end_index:
             return False
-        logging.info("Oasis finished Docker nodes setup with num of nodes %s",
-                     end_index - start_index + 1)
-        for i in range(start_index, end_index + 1):
+        volumes = list(self.node_vols or [])
+        if self.node_mount_rootfs and not self.node_img_baked:
+            volumes += self._root_fs_volumes()
+
+        def __add_docker(i):
             if self.node_bind_port:
-                port_bindings = {i + 10000: i + 10000}
-                ports = [i + 10000]
+                port_bindings = {i + self.node_port_base: i + self.node_port_base}
+                ports = [i + self.node_port_base]
             else:
                 port_bindings = {}
                 ports = []
-            self.containernet.addDocker(
+            # create and start the container, each node has its own docker client.
+            node = Docker(
                 f'{self.node_name_prefix}{i}',
                 ip=None,
-                volumes=self.node_vols,
+                volumes=volumes,
                 cap_add=["NET_ADMIN", "SYS_ADMIN"],
                 dimage=self.node_img,
                 ports=ports,
                 port_bindings=port_bindings,
                 publish_all_ports=True
             )
-        self.hosts = [ContainernetHostAdapter(host)
-                      for host in self.containernet.hosts]
+            # `addDocker` is `addHost(cls=Docker)`, which changes the shared
+            # state of Containernet(nextIP, hosts, nameToNode) without locking;
+            # register the started node through it one at a time.
+            with self.containernet_lock:
+                self.containernet.addHost(node.name, cls=lambda *_, **__: node, ip=None)
+        self._for_each_node(__add_docker, start_index, end_index)
+        self._refresh_hosts()
+        logging.info("Oasis finished Docker nodes setup with num of nodes %s",
+                     end_index - start_index + 1)
         return True
 
+    def _refresh_hosts(self):
+        """
+        Update the local hosts list, ordered by the node index since
+        the docker nodes may be created concurrently.
+        """
+        prefix_len = len(self.node_name_prefix)
+        # keep the adapters of the existing nodes, they track the ifb devices.
+        adapters = {host.get_host(): host for host in self.hosts}
+        self.hosts = [adapters.get(host) or ContainernetHostAdapter(host, self.net_backend)
+                      for host in sorted(self.containernet.hosts,
+                                         key=lambda host: int(host.name[prefix_len:]))]
+
     def _setup_topology(self):
         """
         Setup the topology of the network by adding routes, links, etc.
@@ -249,8 +414,6 @@ class ContainerizedNetwork (INetwork):
         if self.net_mat is None:
             logging.warning("The network matrix is None.")
             return False
-        link_subnets = subnets(self.node_ip_start, self.node_ip_range)
-        _, link_prefix = netParse(self.node_ip_start)
         # for adjacent matrix, only the upper triangle is used.
         logging.info("Oasis setup the network topology"
                      ", num. of nodes %s, mat size %s",
@@ -258,9 +421,9 @@ class ContainerizedNetwork (INetwork):
         for i in range(self.num_of_hosts):
             for j in range(i, self.num_of_hosts):
                 if self.net_mat[i][j] == 1:
-                    link_ip = next(link_subnets)
-                    left_ip = ipStr(link_ip + 1) + f'/{link_prefix}'
-                    right_ip = ipStr(link_ip + 2) + f'/{link_prefix}'
+                    left_ip, right_ip = self.ipam.allocate(i, j)
+                    if left_ip is None:
+                        return False
                     logging.info(
                         "addLink: %s(%s) <--> %s(%s)",
                         self.hosts[i].name(),
@@ -269,21 +432,23 @@ class ContainerizedNetwork (INetwork):
                         right_ip
                     )
                     self._addLink(i, j,
-                                  params1={'ip': left_ip},
-                                  params2={'ip': right_ip}
+                                  params1={
+                                      'ip': f'{left_ip}/{self.node_ip_prefix}'},
+                                  params2={
+                                      'ip': f'{right_ip}/{self.node_ip_prefix}'}
                                   )
                     self.pair_to_link_ip[(
                         self.hosts[i],
-                        self.hosts[j])] = ipStr(link_ip + 2)
+                        self.hosts[j])] = right_ip
                     self.pair_to_link_ip[(
                         self.hosts[j],
-                        self.hosts[i])] = ipStr(link_ip + 1)
+                        self.hosts[i])] = left_ip
 
         for i in range(self.num_of_hosts):
             logging.info("Oasis config ip routing for host %s",
                          self.hosts[i].name())
-            self.hosts[i].cmd("echo 1 > /proc/sys/net/ipv4/ip_forward")
-            self.hosts[i].cmd('sysctl -p')
+            self.net_backend.enable_ip_forward(self.hosts[i])
+        self._flush_net_backend()
         logging.info(
             "############### Oasis Init Networking done ###########")
         return True
@@ -302,6 +467,11 @@ class ContainerizedNetwork (INetwork):
         self._traffic_shaping_on_ingress(id1, id2, link.intf2.name)
         # direction from host2 to host1, setup ifb on host1
         self._traffic_shaping_on_ingress(id2, id1, link.intf1.name)
+        self.pair_to_link[(id1, id2)] = link
+        self.link_intfs[(id1, id2)] = link.intf1.name
+        self.link_intfs[(id2, id1)] = link.intf2.name
+        self.ipam.bind(self.ipam.ip_of(id1, id2), id1, link.intf1.name)
+        self.ipam.bind(self.ipam.ip_of(id2, id1), id2, link.intf2.name)
         return link
 
     def _bandwidth_limit_on_egress(self, link, id1, id2):
@@ -311,23 +481,23 @@ class ContainerizedNetwork (INetwork):
             Set the interface(attached to link) of host2 with the bandwidth limit.
         """
         def __set_bw_limit_on(host, attached_inf, bw_limit):
-            host.cmd(
-                f"tc qdisc add dev {attached_inf} root handle 1: {bw_limit}")
+            self.net_backend.set_bandwidth(host, attached_inf, bw_limit)
             logging.info(
                 "apply bandwidth limit on egress interface %s with %s", attached_inf, bw_limit)
             return True
-        default_queueing_strategy = "pfifo"
-        bw_limit1 = default_queueing_strategy
-        bw_limit2 = default_queueing_strategy
-        if self.net_bw_mat is not None:
-            # bw from host1 to host2
-            bw_limit1 = f"tbf rate {self.net_bw_mat[id1][id2]}mbit"
-            bw_limit1 += f" burst {self.net_bw_mat[id1][id2]*1.25}kb latency 1ms"
-            # bw from host2 to host1
-            bw_limit2 = f"tbf rate {self.net_bw_mat[id2][id1]}mbit"
-            bw_limit2 += f" burst {self.net_bw_mat[id2][id1]*1.25}kb latency 1ms"
-        __set_bw_limit_on(self.hosts[id1], link.intf1.name, bw_limit1)
-        __set_bw_limit_on(self.hosts[id2], link.intf2.name, bw_limit2)
+        __set_bw_limit_on(self.hosts[id1], link.intf1.name,
+                          self._bw_limit(id1, id2))
+        __set_bw_limit_on(self.hosts[id2], link.intf2.name,
+                          self._bw_limit(id2, id1))
+
+    def _bw_limit(self, src_id, dst_id):
+        """
+        The egress bandwidth(Mbit/s) of the link from host `src_id` to host `dst_id`;
+        None means no limit.
+        """
+        if self.net_bw_mat is None:
+            return None
+        return self.net_bw_mat[src_id][dst_id]
 
     def _traffic_shaping_on_ingress(self, id1, id2, attached_inf):
         """
@@ -338,45 +508,161 @@ class ContainerizedNetwork (INetwork):
 
         Details of traffic shaping in Oasis, please refer to <docs/tc-strategy.md>
         """
-        shaping_parameters = ""
+        host = self.hosts[id2]
+        ifb_interface = host.allocate_ifb(attached_inf)
+        self.net_backend.add_ifb(host, ifb_interface)
+        self.net_backend.redirect_ingress(host, attached_inf, ifb_interface)
+        self.net_backend.set_netem(
+            host, ifb_interface, self._netem_shaping(id1, id2))
+        return True
+
+    def _netem_shaping(self, src_id, dst_id):
+        """
+        The netem parameters(latency,jitter,loss) of the link from host `src_id` to host `dst_id`.
+        """
+        shaping_parameters = NetemParams()
         if self.net_loss_mat is not None:
-            shaping_parameters += f" loss {self.net_loss_mat[id1][id2]}%"
+            shaping_parameters.loss = self.net_loss_mat[src_id][dst_id]
         current_bdp = 250000  # default BDP,  delay 10, bw 200
         scaling_factor = 1.25
         if self.net_latency_mat is not None:
-            delay = self.net_latency_mat[id1][id2]
+            delay = self.net_latency_mat[src_id][dst_id]
             if delay > 0:
-                shaping_parameters += f" delay {delay}ms"
+                shaping_parameters.delay = delay
                 if self.net_bw_mat is not None:
                     current_bdp = int(
-                        scaling_factor * delay * self.net_bw_mat[id1][id2] * 1000 / 8)
+                        scaling_factor * delay * self.net_bw_mat[src_id][dst_id] * 1000 / 8)
                     logging.info("delay %d, bw %d, limits %d", delay,
-                                 self.net_bw_mat[id1][id2], current_bdp)
+                                 self.net_bw_mat[src_id][dst_id], current_bdp)
                 else:
                     logging.warning(
                         "self.net_bw_mat is None, using default BDP value.")
                 if self.net_jitter_mat is not None:
-                    jitter = self.net_jitter_mat[id1][id2]
+                    jitter = self.net_jitter_mat[src_id][dst_id]
                     if jitter > 0:
-                        shaping_parameters += f" {self.net_jitter_mat[id1][id2]}ms distribution normal"
+                        shaping_parameters.jitter = jitter
+        shaping_parameters.limit = current_bdp
         logging.info("shaping_parameters\"%s\"", shaping_parameters)
-        port = attached_inf[-1]
-        ifb_interface = f"ifb{port}"
-        self.hosts[id2].cmd(
-            f"ip link add name {ifb_interface} type ifb")
-        self.hosts[id2].cmd(f"ip link set {ifb_interface} up")
-        self.hosts[id2].cmd(
-            f"tc qdisc add dev {attached_inf} ingress")
-        self.hosts[id2].cmd(f"tc filter add dev {attached_inf} parent ffff: protocol ip u32 "
-                            f"match u32 0 0 action mirred egress redirect dev {ifb_interface}")
         # @note: Limit is the number of bytes that can be queued waiting for tokens to become available.
         # The proper value for limit might be at least the **bandwidth-delay product (BDP)**,
         # which is the amount of data "in flight" on the link.
         # for a link with 4000Mbps, 100ms delay, the BDP is about 50,000,000 bytes.
-        self.hosts[id2].cmd(
-            f"tc qdisc add dev {ifb_interface} root netem{shaping_parameters} limit {current_bdp}")
+        return shaping_parameters
+
+    def _is_shaping_change_only(self, top: ITopology):
+        """
+        Whether the new topology only changes the link attributes(loss, latency, jitter, bandwidth)
+        of the running network; the adjacency matrix must be the same.
+        """
+        if self.net_mat is None or \
+                not is_same_matrix(self.net_mat, top.get_matrix(MatrixType.ADJACENCY_MATRIX)):
+            return False
+        old_mats = self._link_attr_mats()
+        for mat_type, old_mat in old_mats.items():
+            if old_mat is None or top.get_matrix(mat_type) is None:
+                return False
         return True
 
+    def _link_attr_mats(self):
+        return {
+            MatrixType.LOSS_MATRIX: self.net_loss_mat,
+            MatrixType.LATENCY_MATRIX: self.net_latency_mat,
+            MatrixType.JITTER_MATRIX: self.net_jitter_mat,
+            MatrixType.BW_MATRIX: self.net_bw_mat
+        }
+
+    def _reload_link_shaping(self, top: ITopology):
+        """
+        Apply the changed link attributes with `tc qdisc change`;
+        containers, links and routes are kept alive.
+        """
+        old_mats = self._link_attr_mats()
+        self._init_matrix(top)
+        return self._change_link_shaping(old_mats, self.net_backend)
+
+    def update_link(self, id1: int, id2: int, attrs) -> bool:
+        """
+        Change the attributes of the link from host `id1` to host `id2` with
+        `tc qdisc change`, e.g. to replay a link trace during the test.
+
+        The commands run in their own processes instead of the node shells,
+        which are used by the test processes at the same time.
+        """
+        if (id1, id2) not in self.link_intfs:
+            logging.error("update_link: no link from %s to %s.", id1, id2)
+            return False
+        old_mats = self._link_attr_mats()
+        if self.trace_base_mats is None:
+            self.trace_base_mats = old_mats
+        new_mats = dict(old_mats)
+        for attr, value in attrs.items():
+            mat_type = trace_attr_mats.get(attr)
+            if mat_type is None or new_mats[mat_type] is None:
+                logging.error("update_link: can not change %s of the link.", attr)
+                return False
+            # the matrices are shared with the topology, they are never changed in place.
+            mat = np.array(new_mats[mat_type],
+                           dtype=np.result_type(new_mats[mat_type], value))
+            mat[id1][id2] = value
+            new_mats[mat_type] = mat
+        self._set_link_attr_mats(new_mats)
+        return self._change_link_shaping(old_mats, self._get_trace_backend())
+
+    def restore_links(self) -> bool:
+        """
+        Restore the link attributes of the topology after `update_link`.
+        """
+        if self.trace_base_mats is None:
+            return True
+        old_mats = self._link_attr_mats()
+        self._set_link_attr_mats(self.trace_base_mats)
+        self.trace_base_mats = None
+        return self._change_link_shaping(old_mats, self._get_trace_backend())
+
+    def _set_link_attr_mats(self, mats):
+        self.net_loss_mat = mats[MatrixType.LOSS_MATRIX]
+        self.net_latency_mat = mats[MatrixType.LATENCY_MATRIX]
+        self.net_jitter_mat = mats[MatrixType.JITTER_MATRIX]
+        self.net_bw_mat = mats[MatrixType.BW_MATRIX]
+
+    def _get_trace_backend(self):
+        if self.trace_backend is None:
+            self.trace_backend = create_net_backend(self.net_backend_name,
+                                                    detached=True)
+        return self.trace_backend
+
+    def _change_link_shaping(self, old_mats, net_backend):
+        """
+        Apply the link attributes changed from `old_mats` to the current ones.
+        """
+        changes = changed_links(self.net_mat, old_mats,
+                                self._link_attr_mats())
+        logging.info("Oasis reload the shaping of %s links.", len(changes))
+        for (id1, id2), mat_types in changes.items():
+            logging.debug("link %s->%s changed: %s", id1, id2, mat_types)
+            if MatrixType.BW_MATRIX in mat_types:
+                net_backend.set_bandwidth(
+                    self.hosts[id1], self.link_intfs[(id1, id2)],
+                    self._bw_limit(id1, id2), change=True)
+            # latency and bandwidth determine the queue limit of netem.
+            ifb_interface = self.hosts[id2].ifb_of(self.link_intfs[(id2, id1)])
+            net_backend.set_netem(
+                self.hosts[id2], ifb_interface,
+                self._netem_shaping(id1, id2), change=True)
+        return self._flush_net_backend(net_backend)
+
+    def _flush_net_backend(self, net_backend=None):
+        """
+        Apply the queued operations of the net backend and report the failed ones.
+        """
+        net_backend = net_backend or self.net_backend
+        if net_backend.flush():
+            return True
+        logging.error("%s network operations failed on network %s.",
+                      len(net_backend.get_failed_ops()), self.node_name_prefix)
+        net_backend.clear_failed_ops()
+        return False
+
     def _check_node_vols(self):
         if self.node_vols is None:
             return False
@@ -402,7 +688,7 @@ class ContainerizedNetwork (INetwork):
         self._init_root_fs(host_start_index, host_end_index)
         self.num_of_hosts += diff
         self._setup_topology()
-        self.routing_strategy.setup_routes(self)
+        self._setup_routes()
         self._run_init_script(host_start_index, host_end_index)
         logging.info(
             "Expand the network. number of nodes increased by %s",
@@ -419,27 +705,41 @@ class ContainerizedNetwork (INetwork):
             logging.info("removeDocker: %s", f'{self.node_name_prefix}{i}')
             self.containernet.removeDocker(f'{self.node_name_prefix}{i}')
         # update local hosts list.
-        self.hosts = [ContainernetHostAdapter(host)
-                      for host in self.containernet.hosts]
+        self._refresh_hosts()
         self.num_of_hosts -= diff
         self._setup_topology()
-        self.routing_strategy.setup_routes(self)
+        self._setup_routes()
+        return True
+
+    def _remove_links(self):
+        """
+        Remove all the links of the link table, whatever the topology is.
+        Deleting one end of a veth pair deletes its peer, so the links are
+        deleted on the lower indexed host and the commands of a host are
+        flushed together.
+        """
+        for (id1, id2), link in self.pair_to_link.items():
+            logging.info("removeLink: %s-%s",
+                         self.hosts[id1].name(), self.hosts[id2].name())
+            self.net_backend.del_link(self.hosts[id1], link.intf1.name)
+        self._flush_net_backend()
+        # the interfaces are gone, only drop them from the bookkeeping.
+        for link in self.pair_to_link.values():
+            for intf in (link.intf1, link.intf2):
+                intf.node.delIntf(intf)
+            if link in self.containernet.links:
+                self.containernet.links.remove(link)
+        self.pair_to_link = {}
         return True
 
     def _reset_network(self, num, diff):
         logging.info("Oasis reset the network.")
         self.routing_strategy.teardown_routes(self)
         for host in self.hosts:
-            host.cmd('ip route flush table main')
+            self.net_backend.flush_routes(host)
             host.cleanup()
-        # remove all links
-        for i in range(num - 1):
-            logging.info("removeLink: %s-%s",
-                         self.hosts[i].name(),
-                         self.hosts[i+1].name())
-            self.containernet.removeLink(
-                node1=self.hosts[i].name(),
-                node2=self.hosts[i+1].name())
+        self._flush_net_backend()
+        self._remove_links()
         # remove all routes.
         logging.info("Oasis reset the routes and interfaces.")
         for host in self.hosts:
@@ -447,4 +747,7 @@ class ContainerizedNetwork (INetwork):
         self.net_routes = [range(self.num_of_hosts + diff)]
         self.pair_to_link = {}
         self.pair_to_link_ip = {}
+        self.link_intfs = {}
+        # the subnets are reused by the links of the new topology.
+        self.ipam.release_all()
         return True
@@ -0,0 +1,122 @@
+import hashlib
+import io
+import logging
+import os
+import tarfile
+
+try:
+    import docker  # type: ignore
+    from docker.errors import (DockerException, ImageNotFound)  # type: ignore
+except ImportError:
+    docker = None
+    DockerException = OSError
+    ImageNotFound = OSError
+
+baked_image_repository = 'oasis-node'
+
+
+def node_image_digest(base_image_id: str, root_fs_dirs) -> str:
+    """The content hash of a baked node image.
+
+    It covers the id of the base image and the path, mode and content of
+    every file of `root_fs_dirs` (in order).
+    """
+    sha = hashlib.sha256()
+    sha.update(base_image_id.encode())
+    for root_fs in root_fs_dirs:
+        sha.update(b'\0rootfs\0')
+        for cur_dir, dirs, files in os.walk(root_fs):
+            dirs.sort()
+            for file_name in sorted(files):
+                path = os.path.join(cur_dir, file_name)
+                sha.update(os.path.relpath(path, root_fs).encode())
+                sha.update(oct(os.stat(path).st_mode).encode())
+                with open(path, 'rb') as f:
+                    while chunk := f.read(1 << 16):
+                        sha.update(chunk)
+    return sha.hexdigest()
+
+
+def baked_image_tag(digest: str) -> str:
+    return f"{baked_image_repository}:{digest[:16]}"
+
+
+def root_fs_archive(root_fs: str) -> bytes:
+    """Pack the content of `root_fs` so that it is extracted to `/`.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        for name in sorted(os.listdir(root_fs)):
+            tar.add(os.path.join(root_fs, name), arcname=name)
+    return buffer.getvalue()
+
+
+def is_docker_sdk_available() -> bool:
+    return docker is not None
+
+
+class NodeImageBaker:
+    """NodeImageBaker builds the node image with the root fs installed, so
+    that nodes start without the per-node copy work.
+
+    The init script is not baked: it runs on the nodes after the links and
+    routes are set up, like without a baked image.
+
+    Baked images are tagged by their content hash; an image that is already
+    baked is reused by every later build.
+    """
+
+    def __init__(self, volumes=None):
+        # volumes of the node, the init script may use the mounted files.
+        self.volumes = list(volumes or [])
+        self.client = None
+
+    def bake(self, img: str, root_fs_dirs):
+        """Returns the tag of the baked image, or None on failure.
+        """
+        if docker is None:
+            logging.error("NodeImageBaker: the docker SDK is not installed.")
+            return None
+        try:
+            self.client = self.client or docker.from_env()
+            digest = node_image_digest(self._base_image_id(img), root_fs_dirs)
+            tag = baked_image_tag(digest)
+            if self._has_image(tag):
+                logging.info("Oasis reuses the baked node image %s of %s",
+                             tag, img)
+                return tag
+            return self._build(img, tag, root_fs_dirs)
+        except (DockerException, OSError) as e:
+            logging.error("NodeImageBaker: failed to bake %s: %s", img, e)
+            return None
+
+    def _base_image_id(self, img):
+        try:
+            return self.client.images.get(img).id
+        except ImageNotFound:
+            logging.info("NodeImageBaker: pulling %s", img)
+            return self.client.images.pull(img).id
+
+    def _has_image(self, tag):
+        try:
+            self.client.images.get(tag)
+        except ImageNotFound:
+            return False
+        return True
+
+    def _build(self, img, tag, root_fs_dirs):
+        container = self.client.containers.run(
+            img, command='/bin/bash', tty=True, stdin_open=True, detach=True,
+            volumes=self.volumes, cap_add=["NET_ADMIN", "SYS_ADMIN"])
+        try:
+            # later root fs overwrite the files of the former ones.
+            for root_fs in root_fs_dirs:
+                if not container.put_archive('/', root_fs_archive(root_fs)):
+                    logging.error("NodeImageBaker: failed to install %s", root_fs)
+                    return None
+            repository, image_tag = tag.split(':')
+            container.commit(repository=repository, tag=image_tag)
+        finally:
+            container.remove(force=True)
+        logging.info("Oasis baked the node image %s from %s", tag, img)
+        return tag
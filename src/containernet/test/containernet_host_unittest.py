@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+from src.containernet.containernet_host import ContainernetHostAdapter
+
+
+class FakeIntf:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeContainernetHost:
+    def __init__(self, intf_names):
+        self.name = "h0"
+        self.intfs = [FakeIntf(name) for name in intf_names]
+        self.commands = []
+        # the number of commands running in the shell at the same time
+        self.running = 0
+        self.max_running = 0
+
+    def cmd(self, command):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        time.sleep(0.001)
+        self.commands.append(command)
+        self.running -= 1
+        return ""
+
+    def intfList(self):
+        return self.intfs
+
+    def cleanup(self):
+        return True
+
+
+class TestContainernetHostAdapter(unittest.TestCase):
+
+    def test_allocate_ifb_per_interface(self):
+        host = ContainernetHostAdapter(FakeContainernetHost([]))
+        ifbs = [host.allocate_ifb(f"h0-eth{i}") for i in range(16)]
+        # no collision for interfaces ending with the same digit
+        self.assertEqual(len(set(ifbs)), 16)
+        self.assertEqual(host.allocate_ifb("h0-eth1"), "ifb1")
+        self.assertEqual(host.allocate_ifb("h0-eth11"), "ifb11")
+        self.assertEqual(host.ifb_of("h0-eth11"), "ifb11")
+        self.assertIsNone(host.ifb_of("h0-eth16"))
+
+    def test_cleanup_removes_ifb(self):
+        containernet_host = FakeContainernetHost(["h0-eth0", "h0-eth10"])
+        host = ContainernetHostAdapter(containernet_host)
+        host.allocate_ifb("h0-eth0")
+        host.allocate_ifb("h0-eth10")
+        host.cleanup()
+        self.assertIn("ip link del ifb0", containernet_host.commands)
+        self.assertIn("ip link del ifb1", containernet_host.commands)
+        self.assertIsNone(host.ifb_of("h0-eth0"))
+        self.assertEqual(host.allocate_ifb("h0-eth10"), "ifb0")
+
+    def test_cmd_is_serialized(self):
+        containernet_host = FakeContainernetHost([])
+        host = ContainernetHostAdapter(containernet_host)
+        # plain `cmd()` calls race with `cmd_status()` and `cmd_async()`.
+        threads = [threading.Thread(target=host.cmd, args=(f"echo {i}",))
+                   for i in range(8)]
+        futures = [host.cmd_async(f"ls {i}") for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            future.result(timeout=5)
+        self.assertEqual(len(containernet_host.commands), 16)
+        self.assertEqual(containernet_host.max_running, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
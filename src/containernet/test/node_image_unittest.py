@@ -0,0 +1,53 @@
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from src.containernet.node_image import (
+    node_image_digest, baked_image_tag, root_fs_archive)
+
+
+class TestNodeImage(unittest.TestCase):
+
+    def setUp(self):
+        self.root_fs = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root_fs, 'usr/bin'))
+        self._write('usr/bin/tool', 'v1')
+        self._write('etc.conf', 'a=1')
+
+    def tearDown(self):
+        shutil.rmtree(self.root_fs)
+
+    def _write(self, rel_path, content):
+        with open(os.path.join(self.root_fs, rel_path), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def test_digest_is_stable(self):
+        digest = node_image_digest('sha256:1', [self.root_fs])
+        self.assertEqual(digest, node_image_digest('sha256:1', [self.root_fs]))
+
+    def test_digest_covers_inputs(self):
+        digest = node_image_digest('sha256:1', [self.root_fs])
+        self.assertNotEqual(digest, node_image_digest('sha256:2', [self.root_fs]))
+        self._write('usr/bin/tool', 'v2')
+        self.assertNotEqual(digest, node_image_digest('sha256:1', [self.root_fs]))
+        digest = node_image_digest('sha256:1', [self.root_fs])
+        os.chmod(os.path.join(self.root_fs, 'usr/bin/tool'), 0o755)
+        self.assertNotEqual(digest, node_image_digest('sha256:1', [self.root_fs]))
+
+    def test_baked_image_tag(self):
+        self.assertEqual(baked_image_tag('0123456789abcdef0123'),
+                         'oasis-node:0123456789abcdef')
+
+    def test_root_fs_archive(self):
+        archive = root_fs_archive(self.root_fs)
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            names = tar.getnames()
+        self.assertIn('usr/bin/tool', names)
+        self.assertIn('etc.conf', names)
+        self.assertNotIn('.', names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import logging
+from abc import abstractmethod
+import numpy as np
+
+from .topology import (ITopology, MatrixType, MatType2LinkAttr, LinkAttr)
+
+max_link_bandwidth = 4000
+max_link_latency = 200
+
+
+class ArrayTopology(ITopology):
+    """ArrayTopology is the base of the topologies generated from
+    `array_description`: the subclass generates the adjacency matrix, and
+    the value matrices of the link attributes are generated, stepped and
+    clamped here.
+
+    The nodes are numbered from the source side, so a link `i -> j` with
+    `i < j` is a forward link and `j -> i` is its backward link.
+    """
+
+    @abstractmethod
+    def description(self) -> str:
+        pass
+
+    @abstractmethod
+    def generate_adj_matrix(self, num_of_nodes: int):
+        pass
+
+    @staticmethod
+    def backward_links(adj_matrix):
+        """The (rows, cols) of the backward links, ordered by the row;
+        `link_bandwidth_backward` is applied to them in this order.
+        """
+        return np.nonzero(np.tril(np.asarray(adj_matrix), -1))
+
+    def link_description(self) -> str:
+        """The attributes of the first link, the backward bandwidth is
+        described if it is different from the forward one.
+        """
+        rows, cols = self.backward_links(self.all_mats[MatrixType.ADJACENCY_MATRIX])
+        if len(rows) == 0:
+            return "no links."
+        # the first forward link and its backward link
+        i, j = cols[0], rows[0]
+        bw_mat = self.all_mats[MatrixType.BW_MATRIX]
+        description = f"loss {self.all_mats[MatrixType.LOSS_MATRIX][i][j]}%,"
+        description += f"latency {self.all_mats[MatrixType.LATENCY_MATRIX][i][j]}ms,"
+        description += f"jitter {self.all_mats[MatrixType.JITTER_MATRIX][i][j]}ms,"
+        description += f"bandwidth {bw_mat[i][j]}Mbps"
+        if bw_mat[j][i] != bw_mat[i][j]:
+            description += f",reverse bandwidth {bw_mat[j][i]}Mbps"
+        return description + "."
+
+    def generate_other_matrices(self, adj_matrix):
+        temp_all_mats = {}
+        for type in MatrixType:
+            if type == MatrixType.ADJACENCY_MATRIX:
+                continue
+            temp_all_mats[type] = self.generate_value_matrix(
+                adj_matrix, type)
+        # combination of all types of matrices, created lazily on access;
+        # the matrices are never modified, so the topologies share them.
+        self.sweep_dims = [
+            (mat_type, temp_all_mats[mat_type])
+            for mat_type in [MatrixType.LOSS_MATRIX, MatrixType.LATENCY_MATRIX,
+                             MatrixType.JITTER_MATRIX, MatrixType.BW_MATRIX]]
+        logging.info("Generated %s linear topologies.", len(self))
+
+    def generate_value_matrix(self, adj_matrix, type: MatrixType):
+        adj_matrix = np.asarray(adj_matrix)
+        value_mat = adj_matrix.copy()
+        if self.top_config.array_description is None:
+            logging.warning("No array_description in the topology config")
+            return value_mat
+        link_bandwidth_backward_dict = None
+        for param in self.top_config.array_description:
+            if not isinstance(param, dict):
+                param = param.__dict__
+            if 'link_bandwidth_backward' in param:
+                link_bandwidth_backward_dict = param
+                break
+        for param in self.top_config.array_description:
+            if not isinstance(param, dict):
+                param = param.__dict__
+            for attr_name in param:
+                if attr_name in LinkAttr.__members__ and \
+                        MatType2LinkAttr[type] == LinkAttr[attr_name]:
+                    init_value = param["init_value"]
+                    can_be_stepped = False
+                    if len(init_value) != self.top_config.nodes:
+                        value_mat = np.where(
+                            adj_matrix != 0, init_value[0], 0)
+                        can_be_stepped = True
+                    elif len(init_value) == self.top_config.nodes:
+                        # the value of column j is taken from init_value[j]
+                        column_values = np.asarray(
+                            [value[0] for value in init_value])
+                        value_mat = np.where(
+                            adj_matrix != 0, column_values[np.newaxis, :], 0)
+                    if attr_name == "link_bandwidth_forward" and link_bandwidth_backward_dict is not None:
+                        logging.debug(
+                            "needs to add link_bandwidth_backward %s", link_bandwidth_backward_dict)
+                        reverse_value = np.asarray(
+                            link_bandwidth_backward_dict["init_value"])
+                        rows, cols = self.backward_links(adj_matrix)
+                        link = np.arange(len(rows))
+                        # links beyond the given values use the first one
+                        reverse_bw = np.where(link < len(reverse_value),
+                                              reverse_value[np.minimum(
+                                                  link, len(reverse_value) - 1)],
+                                              reverse_value[0])
+                        value_mat = value_mat.astype(
+                            np.result_type(value_mat, reverse_bw))
+                        value_mat[rows, cols] = reverse_bw
+                    if attr_name == 'link_latency':
+                        self.limit_max_value(
+                            value_mat, attr_name, max_link_latency)
+                    if 'link_bandwidth' in attr_name:
+                        self.limit_max_value(
+                            value_mat, attr_name, max_link_bandwidth)
+                    step_len = 0
+                    step_num = 0
+                    if can_be_stepped:
+                        # can be stepped only when the init_value is a single value
+                        step_len = param.get("step_len", 0)
+                        step_num = param.get("step_num", 0)
+                    logging.info(
+                        "############## value_matrix: %s, step_len %s, step_num %s", value_mat, step_len, step_num)
+                    if step_len > 0 and step_num > 0:
+                        self.compound_top = True
+                        return self.step_value_matrix(
+                            value_mat, step_len, step_num)
+                    # else
+                    return [value_mat]
+        return [value_mat]
+
+    def step_value_matrix(self, value_mat, step_len, step_num):
+        if self.adj_matrix is None:
+            logging.error("The adjacency matrix is None")
+            return None
+        value_mat = np.asarray(value_mat)
+        # only the values of the links are stepped.
+        step_mask = (np.asarray(self.adj_matrix) == 1) * step_len
+        return [value_mat + step * step_mask for step in range(step_num + 1)]
+
+    def limit_max_value(self, value_mat, attr_name, max_value):
+        """Clamp the values of `value_mat` to `max_value` in place,
+        the diagonal is not changed.
+        """
+        off_diagonal = ~np.eye(len(value_mat), dtype=bool)
+        too_large = off_diagonal & (value_mat > max_value)
+        if too_large.any():
+            logging.error(
+                "The %s value is too large, "
+                "it should be less than %s "
+                "The current value is %s", attr_name, max_value, value_mat[too_large].max())
+        value_mat[too_large] = max_value
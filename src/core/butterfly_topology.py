@@ -0,0 +1,48 @@
+import logging
+import numpy as np
+
+from .array_topology import ArrayTopology
+
+# the links of the butterfly network:
+#
+#         0
+#        / \
+#       1   2
+#       | \ / |
+#       |  3  |
+#       |  |  |
+#       |  4  |
+#       | / \ |
+#       5     6
+#
+# node 0 is the source, node 5 and 6 are the sinks;
+# link 3 -> 4 is the bottleneck shared by the two paths.
+butterfly_links = [(0, 1), (0, 2), (1, 3), (2, 3), (3, 4),
+                   (1, 5), (2, 6), (4, 5), (4, 6)]
+butterfly_nodes = 7
+
+
+class ButterflyTopology(ArrayTopology):
+    def __init__(self, base_path: str, top_config, init_all_mats=True):
+        super().__init__(base_path, top_config, init_all_mats)
+
+    def description(self) -> str:
+        description = f"Butterfly {butterfly_nodes} nodes \n"
+        return description + self.link_description()
+
+    def generate_adj_matrix(self, num_of_nodes: int):
+        """
+        Generate the adjacency matrix to describe the butterfly network.
+        Args:
+            num_of_nodes (int): The number of nodes in the network, must be 7.
+        """
+        if num_of_nodes != butterfly_nodes:
+            raise ValueError(
+                f"The butterfly topology has {butterfly_nodes} nodes, not {num_of_nodes}.")
+        logging.info("Generate a butterfly topology.")
+        adj_matrix = np.zeros((num_of_nodes, num_of_nodes), dtype=np.int8)
+        rows, cols = np.array(butterfly_links).T
+        adj_matrix[rows, cols] = 1
+        adj_matrix[cols, rows] = 1
+        logging.debug("adj_matrix: %s", adj_matrix)
+        return adj_matrix
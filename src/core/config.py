@@ -9,9 +9,13 @@ import logging
 import os
 import yaml
 
+from .config_cache import load_yaml
 from .topology import (ITopology, TopologyConfig)
 from .linear_topology import LinearTopology
 from .mesh_topology import MeshTopology
+from .star_topology import StarTopology
+from .tree_topology import TreeTopology
+from .butterfly_topology import ButterflyTopology
 
 
 @dataclass
@@ -22,11 +26,26 @@ class NodeConfig:
     img: str
     vols: List[str] = field(default_factory=list)
     bind_port: Optional[bool] = field(default=True)
+    # the first bound port, node i binds `port_base + i`
+    port_base: Optional[int] = field(default=10000)
     name_prefix: Optional[str] = field(default='h')  # h i j k.
     ip_range: Optional[str] = field(default='10.0.0.0/8')
+    # prefix length of the subnet of each link, 30 or 31 for compact subnets
+    link_prefix: Optional[int] = field(default=24)
     # the script to run when the node starts(after routes are set)
     init_script: Optional[str] = field(default="")
     config_base_path: Optional[str] = field(default="")
+    # run the link/tc setup commands of each node as one batched script
+    batch_setup: Optional[bool] = field(default=False)
+    # number of nodes created/initialized concurrently
+    build_workers: Optional[int] = field(default=1)
+    # bind-mount the root fs read-only instead of copying it into the nodes
+    mount_rootfs: Optional[bool] = field(default=False)
+    # start the nodes from an image with the root fs baked in; the init
+    # script still runs after routes are set
+    bake_image: Optional[bool] = field(default=False)
+    # how links/qdiscs/routes are programmed: "shell" or "netlink"
+    net_backend: Optional[str] = field(default="shell")
 
 
 @dataclass
@@ -69,8 +88,7 @@ class IConfig(ABC):
                 full_yaml_config_file)
             return None
         try:
-            with open(full_yaml_config_file, 'r', encoding='utf-8') as stream:
-                loaded_yaml_config = yaml.safe_load(stream)
+            loaded_yaml_config = load_yaml(full_yaml_config_file)
         except FileNotFoundError:
             logging.error(
                 "YAML file '%s' not found.", full_yaml_config_file)
@@ -172,6 +190,12 @@ class Test:
             return LinearTopology(config_base_path, loaded_conf)
         if loaded_conf.topology_type == "mesh":
             return MeshTopology(config_base_path, loaded_conf, True)
+        if loaded_conf.topology_type == "star":
+            return StarTopology(config_base_path, loaded_conf)
+        if loaded_conf.topology_type == "tree":
+            return TreeTopology(config_base_path, loaded_conf)
+        if loaded_conf.topology_type == "butterfly":
+            return ButterflyTopology(config_base_path, loaded_conf)
         logging.error("Error: unsupported topology type.")
         return None
 
@@ -184,8 +208,7 @@ def load_all_tests(test_yaml_file: str, test_name: str = "all") -> List[Test]:
         "########################## Oasis Loading Tests "
         "##########################")
     try:
-        with open(test_yaml_file, 'r', encoding='utf-8') as stream:
-            yaml_content = yaml.safe_load(stream)
+        yaml_content = load_yaml(test_yaml_file)
     except FileNotFoundError:
         logging.error("Test YAML file '%s' not found.", test_yaml_file)
         return []
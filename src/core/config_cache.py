@@ -0,0 +1,134 @@
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import yaml
+
+
+class ConfigCache:
+    """ConfigCache keeps the objects parsed from the config files, so that a
+    file is parsed once no matter how many times it is loaded.
+
+    An entry is keyed by the kind of the object and the path of the file,
+    and is valid as long as the mtime and the size of the file are the same.
+    The cached objects are never handed out, every load returns a copy, so
+    the callers are free to modify what they get.
+
+    With a `cache_dir`, the `persistent` entries are also pickled to it and
+    reused by later runs.
+    """
+    # bump it when the format of the persistent entries changes.
+    version = 1
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = None
+        # (kind, path) -> (file stamp, object)
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            self.enable_disk_cache(cache_dir)
+
+    def enable_disk_cache(self, cache_dir: str) -> bool:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            logging.warning("ConfigCache: disk cache %s is disabled: %s",
+                            cache_dir, e)
+            return False
+        self.cache_dir = cache_dir
+        return True
+
+    @staticmethod
+    def file_stamp(path: str):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, path: str, parse, kind: str, persistent: bool = False):
+        """Returns a copy of `parse(path)`, `parse` is only called when the
+        file is not cached or has changed since it was cached.
+
+        A file that can not be stat'ed is not cached, it is left to `parse` to
+        report. The errors of `parse` are raised to the caller, and nothing
+        is cached for them.
+        """
+        abs_path = os.path.abspath(path)
+        try:
+            stamp = self.file_stamp(abs_path)
+        except OSError:
+            return parse(path)
+        key = (kind, abs_path)
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+        self.misses += 1
+        disk_path = self._disk_path(kind, abs_path, stamp) if persistent else None
+        found, obj = self._load_from_disk(disk_path)
+        if not found:
+            obj = parse(path)
+            self._save_to_disk(disk_path, obj)
+        with self.lock:
+            self.entries[key] = (stamp, obj)
+        return copy.deepcopy(obj)
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+
+    def _disk_path(self, kind, path, stamp):
+        if not self.cache_dir:
+            return None
+        name = f"{self.version}:{kind}:{path}:{stamp[0]}:{stamp[1]}"
+        return os.path.join(self.cache_dir,
+                            hashlib.sha256(name.encode()).hexdigest() + '.pickle')
+
+    @staticmethod
+    def _load_from_disk(disk_path):
+        if disk_path is None or not os.path.exists(disk_path):
+            return False, None
+        try:
+            with open(disk_path, 'rb') as f:
+                return True, pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError) as e:
+            logging.debug("ConfigCache: ignore the broken entry %s: %s",
+                          disk_path, e)
+            return False, None
+
+    def _save_to_disk(self, disk_path, obj):
+        if disk_path is None:
+            return
+        tmp_path = None
+        try:
+            # written to a temporary file first, so that the concurrent
+            # readers never see a partial entry.
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, disk_path)
+        except (OSError, pickle.PicklingError) as e:
+            logging.debug("ConfigCache: failed to save %s: %s", disk_path, e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def parse_yaml(path: str):
+    with open(path, 'r', encoding='utf-8') as stream:
+        return yaml.safe_load(stream)
+
+
+g_config_cache = ConfigCache()
+
+
+def load_yaml(path: str):
+    """The content of the yaml file `path`, parsed once per change of the file.
+
+    Raises the errors of `open` and `yaml.safe_load` like they are used directly.
+    """
+    return g_config_cache.load(path, parse_yaml, 'yaml', persistent=True)
@@ -1,6 +1,8 @@
 import logging
-import copy
+import os
+import numpy as np
 from .topology import (ITopology, MatrixType)
+from .random_mesh import (generate_random_mesh, save_all_mats)
 
 
 class MeshTopology(ITopology):
@@ -9,8 +11,25 @@ class MeshTopology(ITopology):
         if init_all_mats is True:
             self.__init_topologies()
 
+    def init_all_mats(self):
+        random_description = self.top_config.random_description
+        if random_description is None:
+            super().init_all_mats()
+            return
+        logging.info('Generate the matrix from random_description')
+        self.all_mats = generate_random_mesh(
+            self.top_config.nodes, random_description)
+        self.adj_matrix = self.all_mats[MatrixType.ADJACENCY_MATRIX]
+        json_file_path = random_description.get('export_json', None)
+        if json_file_path:
+            if not os.path.isabs(json_file_path):
+                json_file_path = os.path.join(self.conf_base_path, json_file_path)
+            save_all_mats(self.all_mats, json_file_path)
+
     def description(self) -> str:
         nodes_num = len(self.all_mats[MatrixType.ADJACENCY_MATRIX][0])
+        if self.top_config.random_description is not None:
+            return self.__random_description(nodes_num)
         description = f"Mesh {nodes_num} nodes \n"
         latency = self.all_mats[MatrixType.LATENCY_MATRIX][0][1]
         bandwidth = self.all_mats[MatrixType.BW_MATRIX][0][1]
@@ -24,6 +43,18 @@ class MeshTopology(ITopology):
         description += f"bandwidth {bandwidth}Mbps."
         return description
 
+    def __random_description(self, nodes_num) -> str:
+        model = self.top_config.random_description.get('model', 'erdos_renyi')
+        adj = np.asarray(self.all_mats[MatrixType.ADJACENCY_MATRIX])
+        description = f"Random mesh({model}) {nodes_num} nodes " \
+            f"{int(np.triu(adj, 1).sum())} links \n"
+        links = adj != 0
+        for mat_type, name, unit in [(MatrixType.LATENCY_MATRIX, 'latency', 'ms'),
+                                     (MatrixType.BW_MATRIX, 'bandwidth', 'Mbps')]:
+            values = np.asarray(self.all_mats[mat_type])[links]
+            description += f"{name} {values.min()}-{values.max()}{unit},"
+        return description[:-1] + "."
+
     def generate_adj_matrix(self, num_of_nodes: int):
         pass
 
@@ -35,16 +66,9 @@ class MeshTopology(ITopology):
         # purpose: for iterating through multiple topologies
         the_unique_topology = MeshTopology(self.conf_base_path,
                                            self.top_config, False)  # don't init all mats
-        the_unique_topology.all_mats[MatrixType.ADJACENCY_MATRIX] = copy.deepcopy(
-            self.all_mats[MatrixType.ADJACENCY_MATRIX])
-        the_unique_topology.all_mats[MatrixType.LOSS_MATRIX] = copy.deepcopy(
-            self.all_mats[MatrixType.LOSS_MATRIX])
-        the_unique_topology.all_mats[MatrixType.LATENCY_MATRIX] = copy.deepcopy(
-            self.all_mats[MatrixType.LATENCY_MATRIX])
-        the_unique_topology.all_mats[MatrixType.JITTER_MATRIX] = copy.deepcopy(
-            self.all_mats[MatrixType.JITTER_MATRIX])
-        the_unique_topology.all_mats[MatrixType.BW_MATRIX] = copy.deepcopy(
-            self.all_mats[MatrixType.BW_MATRIX])
+        for mat_type in MatrixType:
+            the_unique_topology.all_mats[mat_type] = \
+                self.all_mats[mat_type].copy()
         logging.info(
             "Added MeshTopology %s", the_unique_topology.all_mats)
         self.topologies.append(the_unique_topology)
@@ -1,19 +1,26 @@
+import copy
 import logging
 import time
 
 from core.config import NodeConfig
-from core.topology import ITopology
+from core.topology import (ITopology, MatrixType)
+from core.network_pool import (NetworkPool, free_slot, instance_name_prefix)
 from containernet.containernet_network import ContainerizedNetwork
-from routing.routing_factory import RoutingFactory, route_string_to_enum
+from routing.routing_factory import (
+    RoutingFactory, route_string_to_enum, split_route_string)
 from interfaces.network_mgr import (INetworkManager, NetworkType)
 
-# alphabet table
-alphabet = ['h', 'i', 'j', 'k', 'l', 'm',
-            'n', 'o', 'p', 'q', 'r', 's', 't']
+# size of the range of bound ports of each network instance
+ports_per_network = 1000
 
 
 class NetworkManager(INetworkManager):
     """NetworkManager manages multiple network instances.
+
+    Started networks are kept in a pool keyed by the number of nodes,
+    the node image and the routing strategy. When a later test case asks
+    for networks of the same key, the warm networks are reused and only
+    reloaded with the new topology instead of being rebuilt.
     """
 
     def __init__(self):
@@ -21,6 +28,8 @@ class NetworkManager(INetworkManager):
         self.networks = []
         self.net_num = 0
         self.cur_top = None
+        self.cur_key = None
+        self.pool = NetworkPool()
         self.enabled_halt = False
         self.type = NetworkType.containernet
 
@@ -47,36 +56,25 @@ class NetworkManager(INetworkManager):
         Returns:
             bool: True if the networks are built successfully, False otherwise.
         """
-        if net_num > len(alphabet):
-            logging.error("Error: number of networks exceeds the limit.")
-            return False
-        org_name_prefix = node_config.name_prefix
-        cur_net_num = len(self.networks)
-        if cur_net_num < net_num:
-            for i in range(cur_net_num, net_num):
-                if net_num > 1:
-                    logging.info(
-                        "####################################################")
-                    logging.info(
-                        "########## Oasis Parallel Execution Mode. ##########")
-                    logging.info(
-                        "########## network instance %s             ##########", i)
-                    logging.info(
-                        "####################################################")
-                    node_config.name_prefix = f"{org_name_prefix}{alphabet[i]}"
-                    node_config.bind_port = False
-                route_strategy = RoutingFactory().create_routing(
-                    route_string_to_enum[route])
-                net = ContainerizedNetwork(
-                    node_config, topology, route_strategy)
-                net.id = i
-                self.networks.append(net)
-        elif cur_net_num > net_num:
-            # stop the extra networks
-            for i in range(net_num, cur_net_num):
-                self.networks[i].stop()
-                logging.info("########## Oasis stop the network %s.", i)
+        key = self._pool_key(node_config, topology, route)
+        if self.cur_key != key:
+            # the current networks can be reused by later test cases.
+            self.pool.park(self.cur_key, self.networks)
+            self.networks = []
+        elif len(self.networks) > net_num:
+            self.pool.park(self.cur_key, self.networks[net_num:])
             self.networks = self.networks[:net_num]
+        self.cur_key = key
+        for i in range(len(self.networks), net_num):
+            net = self.pool.take(key)
+            if net is not None:
+                logging.info(
+                    "########## Oasis reuse the warm network %s.", net.node_name_prefix)
+            else:
+                net = self._create_network(node_config, topology, route,
+                                           is_parallel=net_num > 1)
+            net.id = i
+            self.networks.append(net)
         logging.info(
             "######################################################")
         logging.info("########## Oasis build %d network with top: \n %s .", net_num,
@@ -113,7 +111,9 @@ class NetworkManager(INetworkManager):
         for i in range(self.net_num):
             logging.info("########## Oasis stop the network %s.", i)
             self.networks[i].stop()
+        self.pool.stop_all()
         self.networks = []
+        self.cur_key = None
         self.net_num = 0
 
     def reset_networks(self):
@@ -128,3 +128,35 @@ class NetworkManager(INetworkManager):
 
     def enable_halt(self):
         self.enabled_halt = True
+
+    @staticmethod
+    def _pool_key(node_config: NodeConfig, topology: ITopology, route: str):
+        adj_matrix = topology.get_matrix(MatrixType.ADJACENCY_MATRIX)
+        nodes_num = len(adj_matrix) if adj_matrix is not None else 0
+        return (nodes_num, node_config.img, route)
+
+    def _create_network(self, node_config: NodeConfig, topology: ITopology,
+                        route: str, is_parallel: bool):
+        slot = free_slot(self.networks + self.pool.networks())
+        net_node_config = copy.copy(node_config)
+        # each network instance binds the ports from its own range.
+        net_node_config.port_base = (node_config.port_base or 10000) + \
+            slot * ports_per_network
+        if is_parallel or slot > 0:
+            # the node names must not clash with the other running networks.
+            logging.info(
+                "####################################################")
+            logging.info(
+                "########## Oasis Parallel Execution Mode. ##########")
+            logging.info(
+                "########## network instance %s             ##########", slot)
+            logging.info(
+                "####################################################")
+            net_node_config.name_prefix = f"{node_config.name_prefix}{instance_name_prefix(slot)}"
+        route_name, route_options = split_route_string(route)
+        route_strategy = RoutingFactory().create_routing(
+            route_string_to_enum[route_name], route_options)
+        net = ContainerizedNetwork(
+            net_node_config, topology, route_strategy)
+        net.slot = slot
+        return net
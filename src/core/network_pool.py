@@ -0,0 +1,81 @@
+import logging
+
+# alphabet table
+alphabet = ['h', 'i', 'j', 'k', 'l', 'm',
+            'n', 'o', 'p', 'q', 'r', 's', 't']
+
+# maximum number of idle networks kept warm in the pool
+max_idle_networks = 4
+
+
+def instance_name_prefix(slot: int) -> str:
+    """Name of the network instance `slot` spelled with the alphabet table
+    in bijective numeration: h, i, ..., t, hh, hi, ..., tt, hhh, ...
+    """
+    name = ''
+    slot += 1
+    while slot > 0:
+        slot, digit = divmod(slot - 1, len(alphabet))
+        name = alphabet[digit] + name
+    return name
+
+
+def free_slot(networks) -> int:
+    """The lowest slot which is not used by `networks`.
+    """
+    used_slots = {net.slot for net in networks}
+    slot = 0
+    while slot in used_slots:
+        slot += 1
+    return slot
+
+
+class NetworkPool:
+    """NetworkPool keeps the started networks which the current test case
+    does not use, keyed by the number of nodes, the node image and the
+    routing strategy, so that a later test case of the same key reuses
+    them instead of building new ones.
+
+    When more than `max_idle` networks are idle, the oldest ones are stopped.
+    """
+
+    def __init__(self, max_idle: int = max_idle_networks):
+        self.max_idle = max_idle
+        # pool key -> list of idle networks, the oldest key first
+        self.idle_networks = {}
+
+    def park(self, key, networks):
+        for net in networks:
+            self.idle_networks.setdefault(key, []).append(net)
+            logging.info("########## Oasis keep the network %s warm.",
+                         net.node_name_prefix)
+        # stop the oldest idle networks when the pool is full.
+        while len(self.networks()) > self.max_idle:
+            oldest_key = next(iter(self.idle_networks))
+            net = self.idle_networks[oldest_key].pop(0)
+            if not self.idle_networks[oldest_key]:
+                del self.idle_networks[oldest_key]
+            logging.info("########## Oasis stop the idle network %s.",
+                         net.node_name_prefix)
+            net.stop()
+
+    def take(self, key):
+        """An idle network of `key`, or None.
+        """
+        networks = self.idle_networks.get(key)
+        if not networks:
+            return None
+        net = networks.pop(0)
+        if not networks:
+            del self.idle_networks[key]
+        return net
+
+    def networks(self):
+        return [net for networks in self.idle_networks.values() for net in networks]
+
+    def stop_all(self):
+        for net in self.networks():
+            logging.info(
+                "########## Oasis stop the idle network %s.", net.node_name_prefix)
+            net.stop()
+        self.idle_networks = {}
@@ -0,0 +1,216 @@
+import json
+import logging
+import numpy as np
+
+from .topology import MatrixType
+from .array_topology import (max_link_bandwidth, max_link_latency)
+
+supported_mesh_models = ['erdos_renyi', 'barabasi_albert', 'geometric']
+
+# link attribute of `random_description` -> (matrix type, min, max, decimals)
+random_link_attrs = {
+    'link_loss': (MatrixType.LOSS_MATRIX, 0, 100, 2),
+    'link_latency': (MatrixType.LATENCY_MATRIX, 0, max_link_latency, 0),
+    'link_jitter': (MatrixType.JITTER_MATRIX, 0, max_link_latency, 0),
+    'link_bandwidth': (MatrixType.BW_MATRIX, 1, max_link_bandwidth, 0),
+}
+
+# the value of the attributes which are not in `random_description`
+default_link_attrs = {
+    'link_loss': 0,
+    'link_latency': 10,
+    'link_jitter': 0,
+    'link_bandwidth': 100,
+}
+
+
+def erdos_renyi_adjacency(nodes: int, degree: float, rng):
+    """Every pair of nodes is linked with the probability `degree / (nodes - 1)`.
+    """
+    prob = min(1.0, degree / (nodes - 1))
+    upper = np.triu(rng.random((nodes, nodes)) < prob, 1)
+    return (upper | upper.T).astype(np.int8), None
+
+
+def barabasi_albert_adjacency(nodes: int, degree: float, rng):
+    """Preferential attachment: every new node links to `degree / 2` of the
+    existing nodes, chosen with a probability proportional to their degree.
+    """
+    links_per_node = min(nodes - 1, max(1, int(round(degree / 2))))
+    adj = np.zeros((nodes, nodes), dtype=np.int8)
+    # the initial nodes are fully connected.
+    seed_nodes = links_per_node + 1
+    adj[:seed_nodes, :seed_nodes] = 1
+    np.fill_diagonal(adj, 0)
+    node_degree = adj.sum(axis=1).astype(float)
+    for node in range(seed_nodes, nodes):
+        weights = node_degree[:node] / node_degree[:node].sum()
+        peers = rng.choice(node, size=links_per_node, replace=False, p=weights)
+        adj[node, peers] = 1
+        adj[peers, node] = 1
+        node_degree[peers] += 1
+        node_degree[node] = links_per_node
+    return adj, None
+
+
+def geometric_adjacency(nodes: int, degree: float, rng):
+    """The nodes are placed in the unit square and linked to the nodes
+    within the radius that gives an average degree of `degree`.
+    """
+    positions = rng.random((nodes, 2))
+    radius = np.sqrt(degree / ((nodes - 1) * np.pi))
+    distance = np.linalg.norm(
+        positions[:, np.newaxis, :] - positions[np.newaxis, :, :], axis=-1)
+    adj = (distance <= radius).astype(np.int8)
+    np.fill_diagonal(adj, 0)
+    return adj, positions
+
+
+mesh_model_generators = {
+    'erdos_renyi': erdos_renyi_adjacency,
+    'barabasi_albert': barabasi_albert_adjacency,
+    'geometric': geometric_adjacency,
+}
+
+
+def connected_components(adj):
+    """The components of the undirected graph `adj`, as lists of node ids.
+    """
+    adj = np.asarray(adj)
+    unvisited = np.ones(len(adj), dtype=bool)
+    components = []
+    for root in range(len(adj)):
+        if not unvisited[root]:
+            continue
+        unvisited[root] = False
+        component = [root]
+        frontier = [root]
+        while frontier:
+            reached = np.nonzero(adj[frontier].any(axis=0) & unvisited)[0]
+            unvisited[reached] = False
+            frontier = reached.tolist()
+            component.extend(frontier)
+        components.append(sorted(component))
+    return components
+
+
+def connect_components(adj, rng, positions=None):
+    """Link every component of `adj` to the ones before it in place, so
+    that the graph is connected.
+
+    With `positions`, the closest pair of nodes is linked; otherwise a
+    random pair is linked.
+    """
+    components = connected_components(adj)
+    connected = list(components[0])
+    for component in components[1:]:
+        if positions is None:
+            i = rng.choice(connected)
+            j = rng.choice(component)
+        else:
+            distance = np.linalg.norm(
+                positions[connected][:, np.newaxis, :] -
+                positions[component][np.newaxis, :, :], axis=-1)
+            index = np.unravel_index(np.argmin(distance), distance.shape)
+            i, j = connected[int(index[0])], component[int(index[1])]
+        adj[i, j] = 1
+        adj[j, i] = 1
+        connected.extend(component)
+    return len(components) - 1
+
+
+def random_link_values(adj, distribution, rng, limits):
+    """A symmetric value matrix of the links of `adj`, the value of every link
+    is drawn from `distribution`:
+        a number: all links have the same value.
+        {distribution: uniform, low: a, high: b}
+        {distribution: normal, mean: m, std: s}
+        {distribution: choice, values: [v1, v2, ...]}
+    The values are clamped to [min value, max value] of `limits` and
+    rounded to its decimals.
+    """
+    min_value, max_value, decimals = limits
+    rows, cols = np.nonzero(np.triu(adj, 1))
+    num_of_links = len(rows)
+    if isinstance(distribution, (int, float)):
+        values = np.full(num_of_links, float(distribution))
+    elif not isinstance(distribution, dict):
+        raise ValueError(f"Invalid link distribution {distribution}.")
+    else:
+        kind = distribution.get('distribution', 'uniform')
+        if kind == 'uniform':
+            values = rng.uniform(distribution['low'], distribution['high'],
+                                 num_of_links)
+        elif kind == 'normal':
+            values = rng.normal(distribution['mean'],
+                                distribution.get('std', 0), num_of_links)
+        elif kind == 'choice':
+            values = rng.choice(np.asarray(distribution['values'], dtype=float),
+                                num_of_links)
+        else:
+            raise ValueError(f"Unsupported link distribution {kind}.")
+    values = np.clip(values, min_value, max_value).round(decimals)
+    value_mat = np.zeros(adj.shape, dtype=float if decimals > 0 else int)
+    value_mat[rows, cols] = values
+    value_mat[cols, rows] = values
+    return value_mat
+
+
+def generate_random_mesh(nodes: int, random_description):
+    """Generate the matrices of a random connected mesh.
+
+    Args:
+        nodes (int): The number of nodes.
+        random_description (dict): The model of the mesh:
+            model: erdos_renyi, barabasi_albert or geometric.
+            degree: the target average degree of the nodes.
+            seed: the seed of the generator, the same seed generates the
+                same mesh.
+            link_loss, link_latency, link_jitter, link_bandwidth: the
+                distributions of the link attributes,
+                see `random_link_values`.
+    Returns:
+        all_mats, keyed by MatrixType.
+    """
+    if nodes < 2:
+        raise ValueError(f"A random mesh needs at least 2 nodes, got {nodes}.")
+    model = random_description.get('model', 'erdos_renyi')
+    if model not in mesh_model_generators:
+        raise ValueError(f"Unsupported mesh model {model}, "
+                         f"supported models are {supported_mesh_models}.")
+    degree = random_description.get('degree', 3)
+    if degree <= 0:
+        raise ValueError(f"The degree of a random mesh must be positive, got {degree}.")
+    seed = random_description.get('seed', None)
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (1 << 32))
+        logging.info("The random mesh has no seed, use seed %s.", seed)
+    rng = np.random.default_rng(seed)
+    adj, positions = mesh_model_generators[model](nodes, degree, rng)
+    added = connect_components(adj, rng, positions)
+    logging.info("Generated a %s mesh of %s nodes and %s links, "
+                 "%s links are added to connect it.", model, nodes,
+                 int(np.triu(adj, 1).sum()), added)
+    all_mats = {MatrixType.ADJACENCY_MATRIX: adj}
+    for attr_name, (mat_type, *limits) in random_link_attrs.items():
+        distribution = random_description.get(
+            attr_name, default_link_attrs[attr_name])
+        all_mats[mat_type] = random_link_values(
+            adj, distribution, rng, limits)
+    return all_mats
+
+
+def save_all_mats(all_mats, json_file_path: str):
+    """Save `all_mats` in the format of `json_description`.
+    """
+    data = []
+    for mat_type in MatrixType:
+        if mat_type not in all_mats:
+            continue
+        data.append({
+            "matrix_type": int(mat_type),
+            "description": f"This is the {mat_type.name.lower()} of a random mesh",
+            "matrix_data": np.asarray(all_mats[mat_type]).tolist()})
+    with open(json_file_path, 'w', encoding='utf-8') as f:
+        json.dump({"data": data}, f, indent=2)
+    logging.info("Saved the matrices to %s", json_file_path)
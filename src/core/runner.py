@@ -1,6 +1,7 @@
 import os
 import sys
 import copy
+import json
 import logging
 import multiprocessing
 from multiprocessing import Manager
@@ -9,6 +10,7 @@ import yaml
 from interfaces.network_mgr import INetworkManager
 from interfaces.network import INetwork
 from core.topology import ITopology
+from core.config_cache import (g_config_cache, load_yaml)
 from testsuites.test import (
     ITestSuite, TestType, TestConfig, test_type_str_mapping)
 from testsuites.test_iperf import IperfTest
@@ -30,6 +32,8 @@ from protosuites.bats.bats_brtp_proxy import BRTPProxy
 from data_analyzer.analyzer import AnalyzerConfig
 from data_analyzer.analyzer_factory import AnalyzerFactory
 from var.global_var import g_root_path
+from tools.tracer import g_tracer
+from tools.link_trace import (LinkTraceScheduler, load_link_traces)
 
 supported_execution_mode = ["serial", "parallel"]
 
@@ -68,22 +72,25 @@ def diagnostic_test_results(test_results, top_des):
             result_files.append(result.record)
         # analyze those results files according to the test type
         analyzer_name = test_type_str_mapping[test_type]
+        # the results of parallel network instances are saved in their own
+        # sub-directories, the diagrams are saved in the test directory.
+        output_dir = f"{g_root_path}test_results/{test_config.test_name}/"
         config = AnalyzerConfig(
             input=result_files,
-            output=f"{test_result['results'][0].result_dir}",
+            output=output_dir,
             subtitle=top_des)
         if test_type == TestType.throughput:
             if 'bats_iperf' in test_config.name:
                 test_config.packet_type = 'bats'
             if test_config.packet_type == 'tcp':
-                config.output = f"{test_result['results'][0].result_dir}iperf3_throughput.svg"
+                config.output = f"{output_dir}iperf3_throughput.svg"
             else:
-                config.output = f"{test_result['results'][0].result_dir}iperf3_{test_config.packet_type}_statistics.svg"
+                config.output = f"{output_dir}iperf3_{test_config.packet_type}_statistics.svg"
             config.data_type = f"{test_config.packet_type}"
         if test_type == TestType.rtt:
             if test_config.packet_count == 1:
                 analyzer_name = "first_rtt"
-                config.output = f"{test_result['results'][0].result_dir}first_rtt.svg"
+                config.output = f"{output_dir}first_rtt.svg"
         analyzer = AnalyzerFactory.get_analyzer(analyzer_name, config)
         analyzer.visualize()
         if analyzer.analyze() is False:
@@ -128,10 +135,14 @@ def load_test_tool(tool, test_name) -> ITestSuite:
 def load_predefined_protocols(config_base_path):
     """
     Load predefined protocols from the yaml file.
+    The protocols are built once per change of the file, see `ConfigCache`.
     """
+    yaml_file = f'{config_base_path}/predefined.protocols.yaml'
     try:
-        with open(f'{config_base_path}/predefined.protocols.yaml', 'r', encoding='utf-8') as stream:
-            yaml_content = yaml.safe_load(stream)
+        return g_config_cache.load(
+            yaml_file,
+            lambda path: build_predefined_protocols(path, config_base_path),
+            f'protocols:{config_base_path}')
     except FileNotFoundError:
         logging.error(
             "YAML file '%s'/predefined.protocols.yaml not found.", config_base_path)
@@ -139,6 +150,10 @@ def load_predefined_protocols(config_base_path):
     except yaml.YAMLError as exc:
         logging.error("Error parsing YAML file: %s", exc)
         return None
+
+
+def build_predefined_protocols(yaml_file, config_base_path):
+    yaml_content = load_yaml(yaml_file)
     if not yaml_content or 'protocols' not in yaml_content:
         logging.error("No protocols found in the YAML file.")
         return None
@@ -224,8 +239,9 @@ def load_target_protocols_config(config_base_path, test_case_yaml):
     return None
 
 
-def setup_test(test_case_yaml, internal_target_protocols, network: INetwork):
+def setup_test(test_case_yaml, internal_target_protocols, network: INetwork, result_dir=None):
     """setup the test case configuration.
+    `result_dir` overrides the directory of the test results if it is set.
     """
     # read the strategy matrix
     test_case_name = test_case_yaml['name']
@@ -317,10 +333,14 @@ def setup_test(test_case_yaml, internal_target_protocols, network: INetwork):
     for name in test_tools.keys():
         test_tools[name]['name'] = name
         loaded_test_tool = load_test_tool(test_tools[name], test_case_name)
+        if result_dir:
+            loaded_test_tool.set_result_dir(result_dir)
         if flow_competition_config and 'iperf' in loaded_test_tool.name():
             competition_test = FlowCompetitionTest(
                 config=flow_competition_config,
                 test=loaded_test_tool)
+            if result_dir:
+                competition_test.set_result_dir(result_dir)
             network.add_test_suite(competition_test)
             logging.info("Added %s test with flow competition to %s.",
                          loaded_test_tool.name(), test_case_name)
@@ -339,8 +359,16 @@ class TestRunner:
         self.results_dict = None
         self.network_mgr = network_mgr
         self.net_num = 0
+        # the target protocols tested in each round, one protocol per network
+        # in parallel mode; all protocols on one network in serial mode.
+        self.protocol_rounds = []
+        self.run_num = 0
         self.top_description = ''
         self.is_ready_flag = False
+        # the link trace replayed while the tests are running, see `tools/link_trace.py`
+        self.link_trace_events = []
+        # run index -> timing accuracy of the link trace replay
+        self.link_trace_timing = {}
         self._load_protocols()
 
     def init(self, node_config, topology: ITopology):
@@ -349,6 +377,8 @@ class TestRunner:
         if exec_mode not in supported_execution_mode:
             logging.warning("Error: unsupported execution mode.")
             return
+        if not self._load_link_traces():
+            return
         if not is_parallel_execution(exec_mode):
             # serial execution only needs one network instance.
             required_network_ins = 1
@@ -361,12 +391,19 @@ class TestRunner:
             if required_network_ins <= 1:
                 logging.warning(
                     "parallel execution mode is enabled, but only one protocol target is specified")
+            # the protocols beyond `max_parallel_networks` are tested in later rounds.
+            max_parallel = self.test_yml_config.get('max_parallel_networks', 0)
+            if max_parallel and required_network_ins > max_parallel:
+                logging.info("%s target protocols are tested on %s networks in rounds.",
+                             required_network_ins, max_parallel)
+                required_network_ins = max_parallel
         setattr(node_config, 'config_base_path', self.config_path)
         # 1.2 Build multiple network instances.
-        self.is_ready_flag = self.network_mgr.build_networks(node_config,
-                                                             topology,
-                                                             required_network_ins,
-                                                             self.test_yml_config['route'])
+        with g_tracer.span("build_networks", networks=required_network_ins):
+            self.is_ready_flag = self.network_mgr.build_networks(node_config,
+                                                                 topology,
+                                                                 required_network_ins,
+                                                                 self.test_yml_config['route'])
 
     def is_ready(self):
         return self.is_ready_flag
@@ -395,15 +432,31 @@ class TestRunner:
             logging.error("Error: no protocols.")
             return False
         # 3. setup the test for each target protocol
-        for i in range(self.net_num):
-            selected_protocols = []
-            if self.net_num == pro_num:
-                selected_protocols = [self.target_protocols[i]]
+        if self.net_num == 1:
+            self.protocol_rounds = [self.target_protocols]
+            self.run_num = 1
+        else:
+            self.protocol_rounds = [self.target_protocols[i:i + self.net_num]
+                                    for i in range(0, pro_num, self.net_num)]
+            self.run_num = pro_num
+        return self._setup_round(0)
+
+    def _setup_round(self, round_index):
+        networks = self.network_mgr.get_networks()
+        protocols = self.protocol_rounds[round_index]
+        test_name = self.test_yml_config['name']
+        for i in range(self.__networks_of_round(round_index)):
+            if self.net_num == 1:
+                selected_protocols = protocols
+                result_dir = None
             else:
-                selected_protocols = self.target_protocols
+                # each network instance saves its results separately.
+                selected_protocols = [protocols[i]]
+                result_dir = f"{g_root_path}test_results/{test_name}/" \
+                    f"instance-{self.__run_index(round_index, i)}/"
             if setup_test(self.test_yml_config,
                           selected_protocols,
-                          networks[i]) is False:
+                          networks[i], result_dir) is False:
                 logging.error("Error: failed to setup the test.")
                 return False
         return True
@@ -415,26 +468,43 @@ class TestRunner:
         if self.target_protocols is None:
             logging.error("Error: no target protocols.")
             return False
-        self.network_mgr.start_networks()
-        networks = self.network_mgr.get_networks()
-        self.top_description = self.network_mgr.get_top_description()
         if self.net_num == 0:
             logging.error("Error: no networks.")
             return False
+        self.results_dict = {}
+        for round_index in range(len(self.protocol_rounds)):
+            if round_index > 0 and not self._setup_round(round_index):
+                return False
+            logging.info("########## Oasis test round %s/%s.",
+                         round_index + 1, len(self.protocol_rounds))
+            self._execute_round(round_index)
+        return True
+
+    def _execute_round(self, round_index):
+        with g_tracer.span("start_networks"):
+            self.network_mgr.start_networks()
+        networks = self.network_mgr.get_networks()
+        self.top_description = self.network_mgr.get_top_description()
         process_manager = Manager()
         process_shared_dict = process_manager.dict()
+        # spans recorded by the test processes
+        process_trace_events = process_manager.list()
         processes = []
         test_name = self.test_yml_config['name']
         # 4. perform the test for each target protocol in parallel with different processes
-        for i in range(self.net_num):
+        for i in range(self.__networks_of_round(round_index)):
             p = multiprocessing.Process(target=self._perform_test_in_process,
                                         args=(networks[i],
-                                              test_name, process_shared_dict))
+                                              test_name, process_shared_dict,
+                                              process_trace_events,
+                                              self.__run_index(round_index, i)))
             processes.append(p)
             p.start()
+        trace_schedulers = self._start_link_traces(networks, round_index)
 
         # 4.1 Wait for all processes to complete
-        for i, p in enumerate(processes):
+        for p_index, p in enumerate(processes):
+            i = self.__run_index(round_index, p_index)
             max_wait_time = self.__get_test_time()
             logging.info(
                 "########################## Oasis process execute ########################## ")
@@ -457,12 +527,15 @@ class TestRunner:
                     logging.info(f"Process %s for test %s is completed successfully.",
                                  i, test_name)
 
+        self._stop_link_traces(trace_schedulers)
         # save results from different process.
-        self.results_dict = copy.deepcopy(process_shared_dict)
+        self.results_dict.update(copy.deepcopy(process_shared_dict))
+        g_tracer.extend(list(process_trace_events))
         if process_manager:
             process_manager.shutdown()
             process_manager = None
             process_shared_dict = None
+            process_trace_events = None
             processes = []
         self.network_mgr.reset_networks()
         return True
@@ -474,7 +547,7 @@ class TestRunner:
             return False
         test_name = self.test_yml_config['name']
         merged_results = {}
-        for i in range(self.net_num):
+        for i in range(self.run_num):
             if i not in self.results_dict:
                 logging.error(f"No results found for process %s.", i)
                 return False
@@ -493,8 +566,9 @@ class TestRunner:
         logging.info(
             "########## Oasis merge parallel test results. %s", merged_results)
         allow_failure = self.test_yml_config.get('allow_failure', False)
-        diag_suc = diagnostic_test_results(
-            merged_results, self.top_description)
+        with g_tracer.span("diagnostic_test_results"):
+            diag_suc = diagnostic_test_results(
+                merged_results, self.top_description)
         # 5.1 diagnostic the test results
         if not diag_suc and not allow_failure:
             logging.error("Test %s results analysis not passed.",
@@ -512,25 +586,44 @@ class TestRunner:
             logging.info("Create archive directory %s", archive_dir)
             os.makedirs(archive_dir)
         # move all files and folders to the archive directory except folder which start with "topology-*"
-        for root, dirs, files in os.walk(cur_results_path):
-            if root != cur_results_path:
-                # no iteration
-                continue
-            for dir_name in dirs:
-                if dir_name.startswith("topology-"):
+        with g_tracer.span("archive_results", archive_dir=archive_dir):
+            for root, dirs, files in os.walk(cur_results_path):
+                if root != cur_results_path:
+                    # no iteration
                     continue
-                os.system(f"mv {root}/{dir_name} {archive_dir}")
-                logging.info("Move %s to %s", dir_name, archive_dir)
-            for file_name in files:
-                os.system(f"mv {root}/{file_name} {archive_dir}")
-                logging.info("Move %s to %s", file_name, archive_dir)
+                for dir_name in dirs:
+                    if dir_name.startswith("topology-"):
+                        continue
+                    os.system(f"mv {root}/{dir_name} {archive_dir}")
+                    logging.info("Move %s to %s", dir_name, archive_dir)
+                for file_name in files:
+                    os.system(f"mv {root}/{file_name} {archive_dir}")
+                    logging.info("Move %s to %s", file_name, archive_dir)
         # 5.3 save top_description
         with open(f"{archive_dir}/topology_description.txt", 'w', encoding='utf-8') as f:
             f.write(f"{self.top_description}")
             logging.debug("Save topology description to %s",
                           f"{archive_dir}/topology_description.txt")
+        # 5.4 save the phase spans of this test
+        g_tracer.dump(f"{archive_dir}/oasis_trace.json")
+        g_tracer.reset()
+        # 5.5 save the measurements of the routing, e.g. the convergence time
+        self._save_routing_metrics(archive_dir)
         return True
 
+    def _save_routing_metrics(self, archive_dir):
+        routing_metrics = {}
+        for i, network in enumerate(self.network_mgr.get_networks()):
+            metrics = network.get_routing_strategy().routing_metrics()
+            if metrics:
+                routing_metrics[i] = metrics
+        if not routing_metrics:
+            return
+        with open(f"{archive_dir}/routing_metrics.json", 'w', encoding='utf-8') as f:
+            json.dump(routing_metrics, f, indent=2)
+        logging.info("Save the routing metrics to %s",
+                     f"{archive_dir}/routing_metrics.json")
+
     def cleanup(self):
         # 6. clean up the network instance
         if self.network_mgr:
@@ -553,14 +646,64 @@ class TestRunner:
             return False
         return True
 
-    def _perform_test_in_process(self, network, test_name, result_dict):
+    def _load_link_traces(self):
+        traces_yaml = self.test_yml_config.get('link_traces', None)
+        if not traces_yaml:
+            return True
+        events = load_link_traces(self.config_path, traces_yaml)
+        if events is None:
+            logging.error("Error: failed to load the link traces.")
+            return False
+        logging.info("Loaded %s link trace events.", len(events))
+        self.link_trace_events = events
+        return True
+
+    def _start_link_traces(self, networks, round_index):
+        """Replay the link trace on every network of the round, the time of
+        the trace starts when the test processes are started.
+        """
+        schedulers = []
+        if not self.link_trace_events:
+            return schedulers
+        for i in range(self.__networks_of_round(round_index)):
+            run_index = self.__run_index(round_index, i)
+            scheduler = LinkTraceScheduler(
+                self.link_trace_events,
+                lambda event, network=networks[i]: network.update_link(
+                    event.src, event.dst, event.attrs),
+                name=f"link-trace-{run_index}")
+            scheduler.start()
+            schedulers.append((run_index, networks[i], scheduler))
+        return schedulers
+
+    def _stop_link_traces(self, schedulers):
+        if not schedulers:
+            return
+        for run_index, network, scheduler in schedulers:
+            scheduler.stop()
+            network.restore_links()
+            self.link_trace_timing[run_index] = scheduler.timing_report()
+            logging.info("Link trace timing of run %s: %s",
+                         run_index, self.link_trace_timing[run_index])
+        result_dir = f"{g_root_path}test_results/{self.test_yml_config['name']}/"
+        os.makedirs(result_dir, exist_ok=True)
+        with open(f"{result_dir}link_trace_timing.json", 'w', encoding='utf-8') as f:
+            json.dump(self.link_trace_timing, f, indent=2)
+
+    def _perform_test_in_process(self, network, test_name, result_dict, trace_events, run_index):
         """Execute the test in a separate process,
-            then store the results in the shared dictionary.
+            then store the results in the shared dictionary with key `run_index`.
         """
-        id = network.get_id()
+        id = run_index
         logging.info(
-            "########## Oasis process %d Performing the test for %s", id, test_name)
-        success = network.perform_test()
+            "########## Oasis process %d Performing the test for %s on network %d",
+            id, test_name, network.get_id())
+        # the spans inherited from the parent process are already recorded there.
+        g_tracer.reset()
+        try:
+            success = network.perform_test()
+        finally:
+            trace_events.extend(g_tracer.get_events())
         if not success:
             result_dict[id] = {"error": "perform_test_failed"}
         else:
@@ -576,6 +719,14 @@ class TestRunner:
             f_failed.write(f"{test_name}")
         sys.exit(1)
 
+    def __networks_of_round(self, round_index):
+        if self.net_num == 1:
+            return 1
+        return len(self.protocol_rounds[round_index])
+
+    def __run_index(self, round_index, network_index):
+        return round_index * self.net_num + network_index
+
     def __get_test_time(self):
         test_tools = self.test_yml_config['test_tools']
         execution_mode = self.test_yml_config.get(
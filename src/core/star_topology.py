@@ -0,0 +1,30 @@
+import logging
+import numpy as np
+
+from .topology import MatrixType
+from .array_topology import ArrayTopology
+
+
+class StarTopology(ArrayTopology):
+    def __init__(self, base_path: str, top_config, init_all_mats=True):
+        super().__init__(base_path, top_config, init_all_mats)
+
+    def description(self) -> str:
+        nodes_num = len(self.all_mats[MatrixType.ADJACENCY_MATRIX][0])
+        description = f"Star {nodes_num - 1} leaves \n"
+        return description + self.link_description()
+
+    def generate_adj_matrix(self, num_of_nodes: int):
+        """
+        Generate the adjacency matrix to describe a star topology.
+        Args:
+            num_of_nodes (int): The number of nodes in the network.
+                Node 0 is the center, the other nodes are the leaves.
+        """
+        logging.info("Generate a star topology with %d leaves.",
+                     num_of_nodes - 1)
+        adj_matrix = np.zeros((num_of_nodes, num_of_nodes), dtype=np.int8)
+        adj_matrix[0, 1:] = 1
+        adj_matrix[1:, 0] = 1
+        logging.debug("adj_matrix: %s", adj_matrix)
+        return adj_matrix
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.core.config_cache import (ConfigCache, parse_yaml)
+from src.core.topology import (MatrixType, parse_all_mats)
+
+
+class TestConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+        self.yaml_file = os.path.join(self.base_path, 'tests.yaml')
+        self._write(self.yaml_file, 'tests:\n  test1:\n    if: true\n')
+        self.parsed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    @staticmethod
+    def _write(path, content, mtime_ns=None):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def _parse(self, path):
+        self.parsed.append(path)
+        return parse_yaml(path)
+
+    def test_parsed_once(self):
+        cache = ConfigCache()
+        first = cache.load(self.yaml_file, self._parse, 'yaml')
+        second = cache.load(self.yaml_file, self._parse, 'yaml')
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.parsed), 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_returns_copies(self):
+        cache = ConfigCache()
+        first = cache.load(self.yaml_file, self._parse, 'yaml')
+        first['tests']['test1']['name'] = 'test1'
+        second = cache.load(self.yaml_file, self._parse, 'yaml')
+        self.assertNotIn('name', second['tests']['test1'])
+
+    def test_file_change(self):
+        cache = ConfigCache()
+        self._write(self.yaml_file, 'tests: {}\n', 1_000_000_000)
+        cache.load(self.yaml_file, self._parse, 'yaml')
+        # same size, different mtime
+        self._write(self.yaml_file, 'tests: []\n', 2_000_000_000)
+        self.assertEqual(cache.load(self.yaml_file, self._parse, 'yaml'),
+                         {'tests': []})
+        self.assertEqual(len(self.parsed), 2)
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            ConfigCache().load(os.path.join(self.base_path, 'none.yaml'),
+                               self._parse, 'yaml')
+
+    def test_disk_cache(self):
+        cache_dir = os.path.join(self.base_path, 'cache')
+        ConfigCache(cache_dir).load(self.yaml_file, self._parse, 'yaml', True)
+        # a new run reuses the entry saved by the former one.
+        content = ConfigCache(cache_dir).load(
+            self.yaml_file, self._parse, 'yaml', True)
+        self.assertEqual(content, {'tests': {'test1': {'if': True}}})
+        self.assertEqual(len(self.parsed), 1)
+
+    def test_matrices(self):
+        json_file = os.path.join(self.base_path, 'mesh.json')
+        self._write(json_file, '{"data": [{"matrix_type": 0, '
+                    '"matrix_data": [[0, 1], [1, 0]]}]}')
+        cache = ConfigCache(os.path.join(self.base_path, 'cache'))
+        all_mats = cache.load(json_file, parse_all_mats, 'matrices', True)
+        all_mats[MatrixType.ADJACENCY_MATRIX][0][1] = 0
+        all_mats = cache.load(json_file, parse_all_mats, 'matrices', True)
+        self.assertTrue(np.array_equal(
+            all_mats[MatrixType.ADJACENCY_MATRIX], [[0, 1], [1, 0]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from src.core.network_pool import (NetworkPool, free_slot, instance_name_prefix)
+
+
+class FakeNetwork:
+    def __init__(self, slot):
+        self.slot = slot
+        self.node_name_prefix = f"h{instance_name_prefix(slot)}"
+        self.is_stopped = False
+
+    def stop(self):
+        self.is_stopped = True
+
+
+class TestNetworkPool(unittest.TestCase):
+
+    def test_reuse_by_key(self):
+        pool = NetworkPool()
+        nets = [FakeNetwork(0), FakeNetwork(1)]
+        pool.park((4, 'ubuntu', 'static_bfs'), nets)
+        # another key gets nothing
+        self.assertIsNone(pool.take((5, 'ubuntu', 'static_bfs')))
+        self.assertIsNone(pool.take((4, 'ubuntu', 'olsr_route')))
+        self.assertIs(pool.take((4, 'ubuntu', 'static_bfs')), nets[0])
+        self.assertIs(pool.take((4, 'ubuntu', 'static_bfs')), nets[1])
+        self.assertIsNone(pool.take((4, 'ubuntu', 'static_bfs')))
+        self.assertEqual(pool.networks(), [])
+        self.assertFalse(any(net.is_stopped for net in nets))
+
+    def test_stop_the_oldest_when_full(self):
+        pool = NetworkPool(max_idle=2)
+        old = FakeNetwork(0)
+        pool.park('a', [old])
+        newer = [FakeNetwork(1), FakeNetwork(2)]
+        pool.park('b', newer)
+        self.assertTrue(old.is_stopped)
+        self.assertIsNone(pool.take('a'))
+        self.assertEqual(pool.networks(), newer)
+        pool.stop_all()
+        self.assertTrue(all(net.is_stopped for net in newer))
+        self.assertEqual(pool.networks(), [])
+
+    def test_slots(self):
+        self.assertEqual(free_slot([]), 0)
+        self.assertEqual(free_slot([FakeNetwork(0), FakeNetwork(2)]), 1)
+        self.assertEqual(instance_name_prefix(0), 'h')
+        self.assertEqual(instance_name_prefix(12), 't')
+        self.assertEqual(instance_name_prefix(13), 'hh')
+        self.assertEqual(instance_name_prefix(14), 'hi')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+import tempfile
+import unittest
+import numpy as np
+from src.core.topology import (MatrixType, TopologyConfig, TopologyType,
+                               changed_links, is_same_matrix, to_matrix,
+                               gray_sweep_order)
+from src.core.linear_topology import LinearTopology
+from src.core.star_topology import StarTopology
+from src.core.tree_topology import TreeTopology
+from src.core.butterfly_topology import ButterflyTopology
+from src.core.mesh_topology import MeshTopology
+from src.core.random_mesh import (connected_components, generate_random_mesh)
+
+
+class TestChangedLinks(unittest.TestCase):
+
+    def setUp(self):
+        self.adj = [[0, 1, 0],
+                    [1, 0, 1],
+                    [0, 1, 0]]
+        self.loss = [[0, 5, 0],
+                     [5, 0, 5],
+                     [0, 5, 0]]
+        self.bw = [[0, 100, 0],
+                   [100, 0, 100],
+                   [0, 100, 0]]
+
+    def test_changed_links_no_change(self):
+        old_mats = {MatrixType.LOSS_MATRIX: self.loss,
+                    MatrixType.BW_MATRIX: self.bw}
+        self.assertEqual(changed_links(self.adj, old_mats, old_mats), {})
+
+    def test_changed_links_single_link(self):
+        new_bw = [[0, 100, 0],
+                  [100, 0, 50],
+                  [0, 100, 0]]
+        old_mats = {MatrixType.LOSS_MATRIX: self.loss,
+                    MatrixType.BW_MATRIX: self.bw}
+        new_mats = {MatrixType.LOSS_MATRIX: self.loss,
+                    MatrixType.BW_MATRIX: new_bw}
+        self.assertEqual(changed_links(self.adj, old_mats, new_mats),
+                         {(1, 2): [MatrixType.BW_MATRIX]})
+
+    def test_changed_links_multiple_attributes(self):
+        new_loss = [[0, 2, 0],
+                    [2, 0, 5],
+                    [0, 5, 0]]
+        new_bw = [[0, 10, 0],
+                  [100, 0, 100],
+                  [0, 100, 0]]
+        old_mats = {MatrixType.LOSS_MATRIX: self.loss,
+                    MatrixType.BW_MATRIX: self.bw}
+        new_mats = {MatrixType.LOSS_MATRIX: new_loss,
+                    MatrixType.BW_MATRIX: new_bw}
+        changes = changed_links(self.adj, old_mats, new_mats)
+        self.assertEqual(changes[(0, 1)], [
+                         MatrixType.LOSS_MATRIX, MatrixType.BW_MATRIX])
+        self.assertEqual(changes[(1, 0)], [MatrixType.LOSS_MATRIX])
+        self.assertEqual(len(changes), 2)
+
+    def test_changed_links_ignores_missing_matrix(self):
+        old_mats = {MatrixType.LOSS_MATRIX: None}
+        new_mats = {MatrixType.LOSS_MATRIX: self.loss}
+        self.assertEqual(changed_links(self.adj, old_mats, new_mats), {})
+
+
+class TestTopologyMatrix(unittest.TestCase):
+
+    def test_to_matrix(self):
+        adj = to_matrix([[0, 1], [1, 0]], MatrixType.ADJACENCY_MATRIX)
+        self.assertEqual(adj.dtype, np.int8)
+        self.assertEqual(to_matrix([[0, 1], [1, 0]]).dtype.kind, 'i')
+        self.assertEqual(to_matrix([[0, 0.5], [1, 0]]).dtype.kind, 'f')
+        self.assertIsNone(to_matrix(None))
+
+    def test_is_same_matrix(self):
+        mat = to_matrix([[0, 5], [5, 0]])
+        self.assertTrue(is_same_matrix(mat, [[0, 5], [5, 0]]))
+        self.assertFalse(is_same_matrix(mat, [[0, 5], [6, 0]]))
+        self.assertFalse(is_same_matrix(mat, None))
+        self.assertTrue(is_same_matrix(None, None))
+
+    def test_linear_topology_steps(self):
+        config = TopologyConfig(
+            name='linear', nodes=3, topology_type=TopologyType.linear,
+            array_description=[
+                {'link_loss': None, 'init_value': [1], 'step_len': 2, 'step_num': 2},
+                {'link_latency': None, 'init_value': [300]},
+                {'link_jitter': None, 'init_value': [0]},
+                {'link_bandwidth_forward': None, 'init_value': [100]},
+                {'link_bandwidth_backward': None, 'init_value': [10, 20]}])
+        top = LinearTopology('', config)
+        self.assertEqual(len(top), 3)
+        adj = top[0].get_matrix(MatrixType.ADJACENCY_MATRIX)
+        self.assertEqual(adj.tolist(), [[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+        last = top[-1]
+        self.assertEqual(last.get_matrix(MatrixType.LOSS_MATRIX).tolist(),
+                         [[0, 5, 0], [5, 0, 5], [0, 5, 0]])
+        # the latency is clamped to the max link latency.
+        self.assertEqual(last.get_matrix(MatrixType.LATENCY_MATRIX)[0][1], 200)
+        self.assertEqual(last.get_matrix(MatrixType.BW_MATRIX).tolist(),
+                         [[0, 100, 0], [10, 0, 100], [0, 20, 0]])
+
+
+    def test_linear_topology_lazy_sweep(self):
+        config = TopologyConfig(
+            name='linear', nodes=2, topology_type=TopologyType.linear,
+            array_description=[
+                {'link_loss': None, 'init_value': [0], 'step_len': 1, 'step_num': 9},
+                {'link_latency': None, 'init_value': [10], 'step_len': 10, 'step_num': 9},
+                {'link_jitter': None, 'init_value': [0], 'step_len': 1, 'step_num': 9},
+                {'link_bandwidth_forward': None, 'init_value': [100],
+                 'step_len': 100, 'step_num': 9}])
+        top = LinearTopology('', config)
+        self.assertEqual(top.topologies, [])
+        self.assertEqual(len(top), 10 ** 4)
+        # the bandwidth changes fastest, the loss slowest.
+        sub = top[1234]
+        self.assertEqual(sub.get_matrix(MatrixType.LOSS_MATRIX)[0][1], 1)
+        self.assertEqual(sub.get_matrix(MatrixType.LATENCY_MATRIX)[0][1], 30)
+        self.assertEqual(sub.get_matrix(MatrixType.JITTER_MATRIX)[0][1], 3)
+        self.assertEqual(sub.get_matrix(MatrixType.BW_MATRIX)[0][1], 500)
+        with self.assertRaises(IndexError):
+            _ = top[10 ** 4]
+        loss_values = [sub.get_matrix(MatrixType.LOSS_MATRIX)[0][1]
+                       for _, sub in zip(range(3), top)]
+        self.assertEqual(loss_values, [0, 0, 0])
+        self.assertEqual(top.get_next_top().get_matrix(
+            MatrixType.BW_MATRIX)[0][1], 100)
+
+
+    def test_gray_sweep_order(self):
+        radices = [3, 2, 4]
+        order = list(gray_sweep_order(radices))
+        self.assertEqual(sorted(order), list(range(24)))
+        grid = np.array(np.unravel_index(order, radices)).T
+        steps = np.abs(np.diff(grid, axis=0))
+        # exactly one dimension steps by one between consecutive points.
+        self.assertTrue((steps.sum(axis=1) == 1).all())
+
+    def test_linear_topology_sweep_keeps_index(self):
+        config = TopologyConfig(
+            name='linear', nodes=2, topology_type=TopologyType.linear,
+            array_description=[
+                {'link_loss': None, 'init_value': [0], 'step_len': 1, 'step_num': 2},
+                {'link_latency': None, 'init_value': [10], 'step_len': 10, 'step_num': 2}])
+        top = LinearTopology('', config)
+        swept = list(top.sweep())
+        self.assertEqual(sorted(index for index, _ in swept), list(range(9)))
+        for index, sub in swept:
+            self.assertTrue(is_same_matrix(
+                sub.get_matrix(MatrixType.LATENCY_MATRIX),
+                top[index].get_matrix(MatrixType.LATENCY_MATRIX)))
+
+
+
+class TestArrayTopology(unittest.TestCase):
+
+    @staticmethod
+    def _config(topology_type, nodes, loss_steps=0):
+        return TopologyConfig(
+            name='array', nodes=nodes, topology_type=topology_type,
+            array_description=[
+                {'link_loss': None, 'init_value': [1], 'step_len': 1, 'step_num': loss_steps},
+                {'link_latency': None, 'init_value': [10]},
+                {'link_jitter': None, 'init_value': [0]},
+                {'link_bandwidth_forward': None, 'init_value': [100]},
+                {'link_bandwidth_backward': None, 'init_value': [10]}])
+
+    def test_star_topology(self):
+        top = StarTopology('', self._config(TopologyType.star, 5))
+        adj = top[0].get_matrix(MatrixType.ADJACENCY_MATRIX)
+        self.assertEqual(adj.sum(axis=1).tolist(), [4, 1, 1, 1, 1])
+        bw = top[0].get_matrix(MatrixType.BW_MATRIX)
+        # leaves -> center is the backward direction
+        self.assertEqual(bw[0].tolist(), [0, 100, 100, 100, 100])
+        self.assertEqual(bw[:, 0].tolist(), [0, 10, 10, 10, 10])
+
+    def test_tree_topology_sweep(self):
+        top = TreeTopology('', self._config(TopologyType.tree, 63, 3))
+        self.assertEqual(len(top), 4)
+        adj = top[0].get_matrix(MatrixType.ADJACENCY_MATRIX)
+        self.assertEqual(int(adj.sum()), 2 * 62)
+        # 32 leaves, each with one link to its parent.
+        self.assertEqual(int((adj.sum(axis=1) == 1).sum()), 32)
+        self.assertEqual(adj[30][62], 1)
+        loss = top[3].get_matrix(MatrixType.LOSS_MATRIX)
+        self.assertEqual(loss[0][1], 4)
+        self.assertEqual(loss[0][3], 0)
+
+    def test_butterfly_topology(self):
+        top = ButterflyTopology('', self._config(TopologyType.butterfly, 7))
+        adj = top[0].get_matrix(MatrixType.ADJACENCY_MATRIX)
+        self.assertTrue((adj == adj.T).all())
+        self.assertEqual(int(adj.sum()), 18)
+        self.assertIn("Butterfly", top[0].description())
+        with self.assertRaises(ValueError):
+            ButterflyTopology('', self._config(TopologyType.butterfly, 8))
+
+
+class TestRandomMesh(unittest.TestCase):
+
+    @staticmethod
+    def _description(model, seed=7):
+        return {'model': model, 'degree': 4, 'seed': seed,
+                'link_loss': {'distribution': 'uniform', 'low': 0, 'high': 2},
+                'link_latency': {'distribution': 'choice', 'values': [5, 10]},
+                'link_bandwidth': 100}
+
+    def test_models_are_connected(self):
+        for model in ['erdos_renyi', 'barabasi_albert', 'geometric']:
+            all_mats = generate_random_mesh(200, self._description(model))
+            adj = all_mats[MatrixType.ADJACENCY_MATRIX]
+            self.assertEqual(len(connected_components(adj)), 1, model)
+            self.assertTrue((adj == adj.T).all())
+            self.assertEqual(int(np.trace(adj)), 0)
+            loss = all_mats[MatrixType.LOSS_MATRIX]
+            self.assertTrue((loss == loss.T).all())
+            self.assertTrue(((loss >= 0) & (loss <= 2)).all())
+            latency = all_mats[MatrixType.LATENCY_MATRIX]
+            self.assertEqual(set(latency[adj != 0].tolist()), {5, 10})
+            self.assertTrue((latency[adj == 0] == 0).all())
+
+    def test_seed(self):
+        mats = generate_random_mesh(50, self._description('erdos_renyi'))
+        same = generate_random_mesh(50, self._description('erdos_renyi'))
+        other = generate_random_mesh(50, self._description('erdos_renyi', 8))
+        for mat_type in MatrixType:
+            self.assertTrue(is_same_matrix(mats[mat_type], same[mat_type]))
+        self.assertFalse(is_same_matrix(mats[MatrixType.ADJACENCY_MATRIX],
+                                        other[MatrixType.ADJACENCY_MATRIX]))
+
+    def test_invalid_description(self):
+        with self.assertRaises(ValueError):
+            generate_random_mesh(10, {'model': 'unknown'})
+        with self.assertRaises(ValueError):
+            generate_random_mesh(1, {})
+
+    def test_mesh_topology_export(self):
+        config = TopologyConfig(
+            name='random', nodes=20, topology_type=TopologyType.mesh,
+            random_description=dict(self._description('barabasi_albert'),
+                                    export_json='random-mesh.json'))
+        with tempfile.TemporaryDirectory() as base_path:
+            top = MeshTopology(base_path, config)
+            self.assertIn("barabasi_albert", top[0].description())
+            exported = MeshTopology(base_path, TopologyConfig(
+                name='json', nodes=20, topology_type=TopologyType.mesh,
+                json_description='random-mesh.json'))
+        for mat_type in MatrixType:
+            self.assertTrue(is_same_matrix(
+                top[0].get_matrix(mat_type), exported[0].get_matrix(mat_type)))
+
+
+if __name__ == '__main__':
+    unittest.main()
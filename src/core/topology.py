@@ -2,10 +2,14 @@ from abc import ABC, abstractmethod
 from enum import IntEnum
 
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 import logging
+import math
 import os
 import json
+import numpy as np
+
+from .config_cache import g_config_cache
 
 
 class LinkAttr(IntEnum):
@@ -46,6 +50,74 @@ class TopologyType(IntEnum):
     mesh = 5        # Random Mesh topology
 
 
+def to_matrix(data, mat_type: Optional[MatrixType] = None):
+    """Convert the nested lists of a matrix to a numpy array.
+
+    The adjacency matrix is stored as int8; the value matrices keep the
+    integer type unless one of the values is a float.
+    """
+    if data is None:
+        return None
+    mat = np.asarray(data)
+    if mat_type == MatrixType.ADJACENCY_MATRIX:
+        return mat.astype(np.int8)
+    if not np.issubdtype(mat.dtype, np.number):
+        return mat.astype(np.float64)
+    return mat
+
+
+def is_same_matrix(mat1, mat2) -> bool:
+    """Whether two matrices(numpy arrays or nested lists) are equal;
+    None only equals None.
+    """
+    if mat1 is None or mat2 is None:
+        return mat1 is None and mat2 is None
+    return bool(np.array_equal(np.asarray(mat1), np.asarray(mat2)))
+
+
+def changed_links(adj_matrix, old_mats, new_mats):
+    """Compare the link attribute matrices link by link.
+    Args:
+        adj_matrix: the adjacency matrix shared by the old and new matrices.
+        old_mats (dict): MatrixType -> old value matrix.
+        new_mats (dict): MatrixType -> new value matrix.
+    Returns:
+        dict: (i, j) -> list of MatrixType changed on the directed link i->j.
+    """
+    connected = np.asarray(adj_matrix) != 0
+    changes = {}
+    for mat_type, old_mat in old_mats.items():
+        new_mat = new_mats.get(mat_type)
+        if old_mat is None or new_mat is None:
+            continue
+        changed = connected & (np.asarray(old_mat) != np.asarray(new_mat))
+        for i, j in zip(*np.nonzero(changed)):
+            changes.setdefault((int(i), int(j)), []).append(mat_type)
+    return changes
+
+
+def gray_sweep_order(radices):
+    """The indexes of a parameter grid in reflected mixed-radix Gray code order.
+
+    The grid index is row-major: the last dimension changes fastest.
+    Consecutive indexes differ in exactly one dimension by one step, so
+    only one link attribute changes between two consecutive topologies.
+    """
+    total = math.prod(radices)
+    for n in range(total):
+        index = 0
+        stride = total
+        for radix in radices:
+            stride //= radix
+            # `steps` is the number of steps of the slower dimensions; the
+            # direction of this dimension flips every time they step.
+            steps, digit = divmod(n // stride, radix)
+            if steps % 2 == 1:
+                digit = radix - 1 - digit
+            index += digit * stride
+        yield index
+
+
 @dataclass
 class Parameter:
     name: str
@@ -63,6 +135,25 @@ class TopologyConfig:
     array_description: Optional[List[Parameter]] = field(default=None)
     # @json_description: the json description of the topology
     json_description: Optional[str] = field(default=None)
+    # @random_description: the model of a random mesh, see `random_mesh.py`
+    random_description: Optional[Dict[str, Any]] = field(default=None)
+
+
+def parse_all_mats(json_file_path):
+    """Parse the matrices of the Json file, keyed by the matrix type.
+    """
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        json_content = json.load(f)
+    if json_content is None:
+        raise ValueError("The content of the Json file is None.")
+    all_mats = {}
+    for mat_desc in json_content['data']:
+        if 'matrix_type' not in mat_desc or 'matrix_data' not in mat_desc:
+            continue
+        logging.info(f"Matrix data: %s", mat_desc['matrix_data'])
+        mat_type = mat_desc['matrix_type']
+        all_mats[mat_type] = to_matrix(mat_desc['matrix_data'], mat_type)
+    return all_mats
 
 
 class ITopology(ABC):
@@ -76,11 +167,65 @@ class ITopology(ABC):
         # when compound_top is True, the topologies is a list of ITopology;
         # otherwise, it is empty.
         self.topologies = []
+        # the value matrices swept by a generated topology:
+        #   [(MatrixType, [value matrix, ...]), ...]
+        # the topologies of the sweep are created on access instead of being
+        # stored in `topologies`; the last dimension changes fastest.
+        self.sweep_dims = []
         if init_all_mat is True:
             self.init_all_mats()
 
+    def __bool__(self):
+        # `__len__` counts the sub-topologies, a topology without them is still valid.
+        return True
+
+    def __len__(self):
+        if self.sweep_dims:
+            return math.prod(len(values) for _, values in self.sweep_dims)
+        return len(self.topologies)
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(f"topology index {index} out of range.")
+        if not self.sweep_dims:
+            return self.topologies[index]
+        value_indexes = []
+        for _, values in reversed(self.sweep_dims):
+            index, value_index = divmod(index, len(values))
+            value_indexes.append(value_index)
+        all_mats = {MatrixType.ADJACENCY_MATRIX: self.adj_matrix}
+        for (mat_type, values), value_index in zip(self.sweep_dims,
+                                                   reversed(value_indexes)):
+            all_mats[mat_type] = values[value_index]
+        return self._create_sub_topology(all_mats)
+
     def __iter__(self):
-        return iter(self.topologies)
+        for index in range(len(self)):
+            yield self[index]
+
+    def sweep(self):
+        """Iterate the sub-topologies as (index, topology) in the order that
+        changes the fewest link attributes between consecutive topologies.
+
+        `index` is the position of the topology in the natural order, so the
+        results of a topology are archived under the same name in any order.
+        """
+        if not self.sweep_dims:
+            yield from enumerate(self)
+            return
+        radices = [len(values) for _, values in self.sweep_dims]
+        for index in gray_sweep_order(radices):
+            yield index, self[index]
+
+    def _create_sub_topology(self, all_mats):
+        # don't init all mats, they are taken from the sweep.
+        top = self.__class__(self.conf_base_path, self.top_config, False)
+        top.all_mats = all_mats
+        top.adj_matrix = all_mats.get(MatrixType.ADJACENCY_MATRIX)
+        logging.debug("Created sub topology %s", all_mats)
+        return top
 
     @abstractmethod
     def description(self) -> str:
@@ -90,10 +235,10 @@ class ITopology(ABC):
         if not self.is_compound():
             logging.error("get_next_top() called on a non-compound topology.")
             return None
-        if self._current_top_index >= len(self.topologies):
+        if self._current_top_index >= len(self):
             logging.info("No more compound topologies available.")
             return None
-        top = self.topologies[self._current_top_index]
+        top = self[self._current_top_index]
         logging.info("########## Use Oasis compound topology %s.",
                      self._current_top_index)
         self._current_top_index += 1
@@ -114,6 +259,8 @@ class ITopology(ABC):
         return self.top_config.topology_type
 
     def get_matrix(self, mat_type: MatrixType):
+        """The matrix of `mat_type` as a numpy array, or None.
+        """
         # when invoked, compound_top is expected to be False
         if self.is_compound():
             logging.error("Incorrect usage of compound topology get_matrix()")
@@ -131,7 +278,8 @@ class ITopology(ABC):
         elif self.top_config.array_description is not None:
             logging.info(
                 'Load the matrix from array_description')
-            self.adj_matrix = self.generate_adj_matrix(self.top_config.nodes)
+            self.adj_matrix = to_matrix(self.generate_adj_matrix(
+                self.top_config.nodes), MatrixType.ADJACENCY_MATRIX)
             self.all_mats[MatrixType.ADJACENCY_MATRIX] = self.adj_matrix
             self.generate_other_matrices(self.adj_matrix)
 
@@ -148,12 +296,7 @@ class ITopology(ABC):
         logging.info(f"Loading matrix from Json file: %s", json_file_path)
         if not os.path.exists(json_file_path):
             raise ValueError(f"Json File {json_file_path} does not exist.")
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            json_content = json.load(f)
-        if json_content is None:
-            raise ValueError("The content of the Json file is None.")
-        for mat_desc in json_content['data']:
-            if 'matrix_type' not in mat_desc or 'matrix_data' not in mat_desc:
-                continue
-            logging.info(f"Matrix data: %s", mat_desc['matrix_data'])
-            self.all_mats[mat_desc['matrix_type']] = mat_desc['matrix_data']
+        # the matrices of a file are parsed once, see `ConfigCache`.
+        self.all_mats.update(g_config_cache.load(
+            json_file_path, parse_all_mats, 'matrices', persistent=True))
+        self.adj_matrix = self.all_mats.get(MatrixType.ADJACENCY_MATRIX)
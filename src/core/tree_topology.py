@@ -0,0 +1,34 @@
+import logging
+import numpy as np
+
+from .topology import MatrixType
+from .array_topology import ArrayTopology
+
+
+class TreeTopology(ArrayTopology):
+    def __init__(self, base_path: str, top_config, init_all_mats=True):
+        super().__init__(base_path, top_config, init_all_mats)
+
+    def description(self) -> str:
+        nodes_num = len(self.all_mats[MatrixType.ADJACENCY_MATRIX][0])
+        leaves_num = nodes_num - nodes_num // 2
+        description = f"Binary tree {nodes_num} nodes, {leaves_num} leaves \n"
+        return description + self.link_description()
+
+    def generate_adj_matrix(self, num_of_nodes: int):
+        """
+        Generate the adjacency matrix to describe a complete binary tree.
+        Args:
+            num_of_nodes (int): The number of nodes in the network.
+                Node 0 is the root, the parent of node i is node (i - 1) // 2;
+                `2^k - 1` nodes make a full tree with `2^(k-1)` leaves.
+        """
+        logging.info("Generate a binary tree topology with %d nodes.",
+                     num_of_nodes)
+        adj_matrix = np.zeros((num_of_nodes, num_of_nodes), dtype=np.int8)
+        child = np.arange(1, num_of_nodes)
+        parent = (child - 1) // 2
+        adj_matrix[parent, child] = 1
+        adj_matrix[child, parent] = 1
+        logging.debug("adj_matrix: %s", adj_matrix)
+        return adj_matrix
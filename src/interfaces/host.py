@@ -1,9 +1,35 @@
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import (Future, ThreadPoolExecutor)
+from dataclasses import dataclass
+
+# appended to a command to read back its exit code from the host shell.
+exit_code_marker = "__oasis_exit_code="
+
+# the commands of `cmd_async` of all the hosts share a bounded pool of
+# threads; a command waits in the queue when all of them are busy.
+max_host_cmd_workers = 64
+g_host_cmd_executor = ThreadPoolExecutor(max_workers=max_host_cmd_workers,
+                                         thread_name_prefix="oasis-host-cmd")
+
+
+@dataclass
+class HostCmdResult:
+    """The output and the exit code of a command executed on a host.
+    """
+    host: 'IHost'
+    output: str
+    exit_code: int
+
+    def is_succeed(self) -> bool:
+        return self.exit_code == 0
 
 
 class IHost(ABC):
     def __init__(self):
-        pass
+        # the shell of a host runs one command at a time; the `cmd()` of a
+        # host with one shell takes it too, so it is reentrant.
+        self.cmd_lock = threading.RLock()
 
     @abstractmethod
     def cmd(self, command: str) -> str:
@@ -18,6 +44,30 @@ class IHost(ABC):
         """Execute a command on the host using popen.
         """
 
+    def cmd_status(self, command: str) -> HostCmdResult:
+        """Execute a command on the host, return its output and exit code.
+
+        The exit code of a background command(ending with `&`) is 0.
+        """
+        with self.cmd_lock:
+            if command.rstrip().endswith('&'):
+                return HostCmdResult(self, self.cmd(command), 0)
+            output = self.cmd(f"{command}; echo {exit_code_marker}$?")
+        output, marker, exit_code = (output or "").rpartition(exit_code_marker)
+        if not marker:
+            return HostCmdResult(self, exit_code, -1)
+        try:
+            return HostCmdResult(self, output, int(exit_code.strip()))
+        except ValueError:
+            return HostCmdResult(self, output, -1)
+
+    def cmd_async(self, command: str) -> Future:
+        """Execute a command on the host in the background, through
+        `g_host_cmd_executor`; the returned future resolves to the
+        `HostCmdResult`. A command still in the queue can be cancelled.
+        """
+        return g_host_cmd_executor.submit(self.cmd_status, command)
+
     def name(self) -> str:
         """Get the name of the host.
         """
@@ -35,6 +85,11 @@ class IHost(ABC):
     def getIntfs(self):
         pass
 
+    def netns(self) -> str:
+        """Get the path of the network namespace of the host.
+        """
+        return ""
+
     def cleanup(self):
         """Cleanup the host.
         """
@@ -0,0 +1,144 @@
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Optional
+from interfaces.host import IHost
+
+
+class NetBackendType(IntEnum):
+    shell = 0     # `ip`/`tc` commands executed by the node shell
+    netlink = 1   # netlink requests sent into the node network namespace
+
+
+@dataclass
+class NetemParams:
+    """Parameters of the netem queueing discipline of one link direction.
+    """
+    loss: Optional[float] = None     # percent
+    delay: Optional[int] = None      # ms
+    jitter: Optional[int] = None     # ms, normal distribution
+    limit: int = 250000              # packets that can be queued
+
+
+class INetBackend(ABC):
+    """INetBackend programs the links, qdiscs and routes of the network nodes.
+
+    Every operation returns True on success. A failed operation is logged
+    and recorded with `report_failure()`, so that failures are not lost
+    in the output of the node shell.
+    """
+
+    def __init__(self):
+        # (host name, operation, error message)
+        self.failed_ops = []
+        # host name -> the destinations of the routes installed by `set_routes`
+        self.installed_routes = {}
+
+    def type(self) -> NetBackendType:
+        return NetBackendType.shell
+
+    def report_failure(self, host: IHost, operation: str, error) -> bool:
+        logging.error("%s backend: `%s` failed on %s: %s",
+                      self.type().name, operation, host.name(), error)
+        self.failed_ops.append((host.name(), operation, str(error)))
+        return False
+
+    def get_failed_ops(self):
+        return self.failed_ops
+
+    def clear_failed_ops(self):
+        self.failed_ops = []
+
+    @abstractmethod
+    def add_ifb(self, host: IHost, ifb: str) -> bool:
+        """Create the ifb device `ifb` and bring it up.
+        """
+
+    @abstractmethod
+    def redirect_ingress(self, host: IHost, intf: str, ifb: str) -> bool:
+        """Redirect the ingress traffic of `intf` to the egress of `ifb`.
+        """
+
+    @abstractmethod
+    def set_bandwidth(self, host: IHost, intf: str, bw: Optional[int],
+                      change: bool = False) -> bool:
+        """Set the root qdisc of `intf` to tbf of `bw` Mbit/s, or pfifo if `bw` is None.
+        """
+
+    @abstractmethod
+    def set_netem(self, host: IHost, intf: str, params: NetemParams,
+                  change: bool = False) -> bool:
+        """Set the root qdisc of `intf` to netem.
+        """
+
+    @abstractmethod
+    def del_root_qdisc(self, host: IHost, intf: str) -> bool:
+        """Delete the root qdisc of `intf` if it is configured.
+        """
+
+    @abstractmethod
+    def del_link(self, host: IHost, intf: str) -> bool:
+        """Delete the link device `intf`.
+        """
+
+    @abstractmethod
+    def add_route(self, host: IHost, dst: str, gateway: str) -> bool:
+        """Add the route to `dst` via `gateway`; `dst` without a prefix is a host route.
+        """
+
+    @abstractmethod
+    def flush_routes(self, host: IHost) -> bool:
+        """Remove all the routes of the main routing table.
+        """
+
+    def set_routes(self, host: IHost, routes) -> bool:
+        """Install the complete route set of `host` in one request.
+
+        `routes` is a list of (dst, gateway); `dst` without a prefix is a
+        host route, a list of gateways is a multipath(ECMP) route. The routes
+        are replaced in place, and the routes of the former set which are not
+        in `routes` are deleted, so a reload swaps the route table without a
+        window of missing routes.
+        """
+        routes = [(dst if '/' in dst else f"{dst}/32", gateway)
+                  for dst, gateway in routes]
+        dsts = {dst for dst, _ in routes}
+        stale_dsts = sorted(self.installed_routes.get(host.name(), set()) - dsts)
+        self.installed_routes[host.name()] = dsts
+        return self.replace_routes(host, routes, stale_dsts)
+
+    def clear_routes(self, host: IHost) -> bool:
+        """Delete the routes installed by `set_routes` in one request.
+        """
+        return self.set_routes(host, [])
+
+    def forget_routes(self, host: IHost):
+        """Drop the record of the routes of `host`, e.g. they are flushed.
+        """
+        self.installed_routes.pop(host.name(), None)
+
+    @abstractmethod
+    def replace_routes(self, host: IHost, routes, stale_dsts) -> bool:
+        """Replace(or add) `routes` and delete the routes to `stale_dsts` in one request.
+        """
+
+    @abstractmethod
+    def enable_ip_forward(self, host: IHost) -> bool:
+        """Enable the ipv4 forwarding.
+        """
+
+    @abstractmethod
+    def set_multipath_hash_policy(self, host: IHost, policy: int) -> bool:
+        """Set how the flows are hashed to the next hops of a multipath route,
+        the value of `net.ipv4.fib_multipath_hash_policy`.
+        """
+
+    def flush(self) -> bool:
+        """Apply the queued operations, if the backend queues them.
+        """
+        return len(self.failed_ops) == 0
+
+    def close(self):
+        """Release the resources held by the backend.
+        """
@@ -7,10 +7,13 @@ from core.topology import (ITopology)
 from protosuites.proto import IProtoSuite
 from interfaces.routing import IRoutingStrategy
 from interfaces.host import IHost
+from interfaces.net_backend import INetBackend
+from netbackend.shell_backend import ShellBackend
 from testsuites.test import (ITestSuite)
+from tools.tracer import g_tracer
 
 
-class INetwork(ABC):
+class INetwork(ABC):  # pylint: disable=too-many-public-methods
     def __init__(self):
         self.id = 0
         self.test_suites = []
@@ -19,6 +22,7 @@ class INetwork(ABC):
         self.is_started_flag = False
         self.is_accessible_flag = True
         self.config_base_path = None
+        self.net_backend = ShellBackend()
 
     def is_accessible(self):
         return self.is_accessible_flag
@@ -46,10 +50,20 @@ class INetwork(ABC):
     def get_host_ip_range(self) -> str:
         pass
 
+    def get_link_prefix(self) -> int:
+        """The prefix length of the subnet of each link.
+        """
+        return 24
+
     @abstractmethod
     def get_link_table(self):
         pass
 
+    def get_link_intfs(self):
+        """(id1, id2) -> the interface of host `id1` on the link to host `id2`.
+        """
+        return {}
+
     @abstractmethod
     def get_routing_strategy(self) -> IRoutingStrategy:
         pass
@@ -58,9 +72,26 @@ class INetwork(ABC):
     def reload(self, top: ITopology):
         pass
 
+    def update_link(self, id1: int, id2: int, attrs) -> bool:
+        """Change the attributes of the link from host `id1` to host `id2`
+        while the network is running; `attrs` is keyed by the names of
+        `tools.link_trace.trace_attrs`.
+        """
+        logging.error("%s does not support changing the links at runtime.",
+                      type(self).__name__)
+        return False
+
+    def restore_links(self) -> bool:
+        """Restore the link attributes changed by `update_link()`.
+        """
+        return True
+
     def is_started(self):
         return self.is_started_flag
 
+    def get_net_backend(self) -> INetBackend:
+        return self.net_backend
+
     def get_topology_description(self):
         return ""
 
@@ -85,7 +116,10 @@ class INetwork(ABC):
             # start the protocol
             logging.info("Starting protocol %s on network %s",
                          proto.get_config().name, self.get_id())
-            if proto.start(self) is False:
+            with g_tracer.span("proto.start", network=self.get_id(),
+                               proto=proto.get_config().name):
+                proto_started = proto.start(self)
+            if proto_started is False:
                 logging.error("Protocol %s failed to start",
                               proto.get_config().name)
                 return False
@@ -96,7 +130,9 @@ class INetwork(ABC):
                 # run `test` on `network`(self) specified by `proto`
                 logging.info("Running test protocol %s %s",  proto.get_config().name,
                              test.type())
-                result = test.run(self, proto)
+                with g_tracer.span("test.run", network=self.get_id(),
+                                   proto=proto.get_config().name, test=test.type()):
+                    result = test.run(self, proto)
                 if result.is_success is False:
                     logging.error(
                         "Test %s failed, please check the log file %s",
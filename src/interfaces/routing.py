@@ -7,6 +7,8 @@ class RouteType(IntEnum):
     olsr = 1
     openr = 2
     static_bfs = 3
+    static_dijkstra = 4
+    static_ecmp = 5
 
 
 class IRoutingStrategy(ABC):
@@ -17,5 +19,18 @@ class IRoutingStrategy(ABC):
     def teardown_routes(self, network):
         pass
 
+    def depends_on_link_quality(self) -> bool:
+        """Whether the routes are computed from the link attributes(loss,
+        latency, bandwidth), so they are set up again when only the link
+        attributes change.
+        """
+        return False
+
+    def routing_metrics(self):
+        """The measurements of the last `setup_routes`, e.g. the convergence
+        time of a dynamic routing protocol; saved with the test results.
+        """
+        return {}
+
     def routing_type(self):
         return self.__class__.__name__
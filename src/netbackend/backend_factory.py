@@ -0,0 +1,25 @@
+import logging
+from interfaces.net_backend import (INetBackend, NetBackendType)
+from netbackend.shell_backend import ShellBackend
+from netbackend.netlink_backend import (NetlinkBackend, is_netlink_available)
+
+# map string to type
+net_backend_string_to_enum = {
+    'shell': NetBackendType.shell,
+    'netlink': NetBackendType.netlink}
+
+
+def create_net_backend(backend: str, batch_setup: bool = False,
+                       detached: bool = False) -> INetBackend:
+    """Create the net backend of `backend`, a detached backend never uses
+    the node shell, see `ShellBackend`.
+    """
+    backend_type = net_backend_string_to_enum.get(backend)
+    if backend_type is None:
+        logging.error("Unsupported net backend %s, use shell instead.", backend)
+        return ShellBackend(batch_setup, detached)
+    if backend_type == NetBackendType.netlink:
+        if is_netlink_available():
+            return NetlinkBackend(detached)
+        logging.error("pyroute2 is not installed, use shell net backend instead.")
+    return ShellBackend(batch_setup, detached)
@@ -0,0 +1,200 @@
+import logging
+import threading
+from typing import Optional
+from interfaces.host import IHost
+from interfaces.net_backend import (INetBackend, NetBackendType, NetemParams)
+from netbackend.shell_backend import ShellBackend
+
+try:
+    from pyroute2 import NetNS  # type: ignore
+    from pyroute2.netlink.exceptions import NetlinkError  # type: ignore
+except ImportError:
+    NetNS = None
+    NetlinkError = OSError
+
+ETH_P_IP = 0x0800
+INGRESS_HANDLE = 0xffff0000
+
+
+def is_netlink_available() -> bool:
+    return NetNS is not None
+
+
+class NetlinkBackend(INetBackend):
+    """NetlinkBackend sends netlink requests into the network namespace of
+    each node (`/proc/{pid}/ns/net`) instead of spawning `ip`/`tc` processes.
+
+    Operations that have no netlink equivalent here (sysctl, netem with a
+    jitter distribution table) fall back to the shell backend.
+    """
+
+    def __init__(self, detached: bool = False):
+        super().__init__()
+        self.shell = ShellBackend(detached=detached)
+        # netns path -> NetNS socket; the path changes when a node is recreated.
+        self.netns_sockets = {}
+        self.lock = threading.Lock()
+
+    def type(self) -> NetBackendType:
+        return NetBackendType.netlink
+
+    def add_ifb(self, host: IHost, ifb: str) -> bool:
+        def __add(ns):
+            ns.link('add', ifname=ifb, kind='ifb')
+            ns.link('set', index=self._index(ns, ifb), state='up')
+        return self._request(host, f"add ifb {ifb}", __add)
+
+    def redirect_ingress(self, host: IHost, intf: str, ifb: str) -> bool:
+        def __redirect(ns):
+            index = self._index(ns, intf)
+            ns.tc('add', 'ingress', index, INGRESS_HANDLE)
+            ns.tc('add-filter', 'u32', index,
+                  parent=INGRESS_HANDLE,
+                  protocol=ETH_P_IP,
+                  keys=['0x0/0x0+0'],
+                  action={'kind': 'mirred',
+                          'direction': 'egress',
+                          'action': 'redirect',
+                          'ifindex': self._index(ns, ifb)})
+        return self._request(host, f"redirect ingress {intf} to {ifb}", __redirect)
+
+    def set_bandwidth(self, host: IHost, intf: str, bw: Optional[int],
+                      change: bool = False) -> bool:
+        action = "change" if change else "add"
+
+        def __set(ns):
+            index = self._index(ns, intf)
+            if bw is None:
+                ns.tc(action, 'pfifo', index, 0x10000)
+            else:
+                ns.tc(action, 'tbf', index, 0x10000,
+                      rate=f"{bw}mbit",
+                      # same as `burst {bw*1.25}kb` of tc
+                      burst=int(bw * 1.25 * 1024),
+                      latency='1ms')
+        return self._request(host, f"{action} bandwidth {bw} on {intf}", __set)
+
+    def set_netem(self, host: IHost, intf: str, params: NetemParams,
+                  change: bool = False) -> bool:
+        if params.delay and params.jitter:
+            # pyroute2 can not load the `normal` distribution table of tc.
+            is_set = self.shell.set_netem(host, intf, params, change)
+            self._collect_shell_failures()
+            return is_set
+        action = "change" if change else "add"
+        netem = {'limit': params.limit}
+        if params.loss is not None:
+            netem['loss'] = params.loss
+        if params.delay:
+            # in microseconds
+            netem['delay'] = params.delay * 1000
+
+        def __set(ns):
+            ns.tc(action, 'netem', self._index(ns, intf), 0, **netem)
+        return self._request(host, f"{action} netem {netem} on {intf}", __set)
+
+    def del_root_qdisc(self, host: IHost, intf: str) -> bool:
+        def __del(ns):
+            indexes = ns.link_lookup(ifname=intf)
+            if not indexes:
+                return
+            try:
+                ns.tc('del', index=indexes[0])
+            except NetlinkError as e:
+                # ENOENT/EINVAL: only the default qdisc is attached.
+                if e.code not in (2, 22):
+                    raise
+        return self._request(host, f"del root qdisc on {intf}", __del)
+
+    def del_link(self, host: IHost, intf: str) -> bool:
+        def __del(ns):
+            ns.link('del', index=self._index(ns, intf))
+        return self._request(host, f"del link {intf}", __del)
+
+    def add_route(self, host: IHost, dst: str, gateway: str) -> bool:
+        if '/' not in dst:
+            dst = f"{dst}/32"
+
+        def __add(ns):
+            ns.route('add', dst=dst, gateway=gateway)
+        return self._request(host, f"add route {dst} via {gateway}", __add)
+
+    def flush_routes(self, host: IHost) -> bool:
+        self.forget_routes(host)
+
+        def __flush(ns):
+            ns.flush_routes(table=254)
+        return self._request(host, "flush routes of table main", __flush)
+
+    def replace_routes(self, host: IHost, routes, stale_dsts) -> bool:
+        def __replace(ns):
+            # all the routes are sent over the same netlink socket, a failed
+            # route does not stop the others.
+            errors = []
+            for dst, gateway in routes:
+                try:
+                    if isinstance(gateway, (list, tuple)):
+                        ns.route('replace', dst=dst,
+                                 multipath=[{'gateway': hop} for hop in gateway])
+                    else:
+                        ns.route('replace', dst=dst, gateway=gateway)
+                except NetlinkError as e:
+                    errors.append(f"{dst} via {gateway}: {e}")
+            for dst in stale_dsts:
+                try:
+                    ns.route('del', dst=dst)
+                except NetlinkError as e:
+                    errors.append(f"del {dst}: {e}")
+            if errors:
+                raise NetlinkError(0, "; ".join(errors))
+        return self._request(
+            host, f"replace {len(routes)} routes, delete {len(stale_dsts)} routes",
+            __replace)
+
+    def enable_ip_forward(self, host: IHost) -> bool:
+        return self.shell.enable_ip_forward(host)
+
+    def set_multipath_hash_policy(self, host: IHost, policy: int) -> bool:
+        return self.shell.set_multipath_hash_policy(host, policy)
+
+    def flush(self) -> bool:
+        self.shell.flush()
+        self._collect_shell_failures()
+        return super().flush()
+
+    def close(self):
+        with self.lock:
+            for ns in self.netns_sockets.values():
+                ns.close()
+            self.netns_sockets = {}
+
+    @staticmethod
+    def _index(ns, intf):
+        indexes = ns.link_lookup(ifname=intf)
+        if not indexes:
+            raise NetlinkError(19, f"no such device {intf}")
+        return indexes[0]
+
+    def _netns_of(self, host: IHost):
+        netns_path = host.netns()
+        with self.lock:
+            if netns_path not in self.netns_sockets:
+                # flags=0: never create the namespace, it belongs to the node.
+                self.netns_sockets[netns_path] = NetNS(netns_path, flags=0)
+            return self.netns_sockets[netns_path]
+
+    def _request(self, host: IHost, operation: str, func) -> bool:
+        if NetNS is None:
+            return self.report_failure(host, operation, "pyroute2 is not installed")
+        try:
+            func(self._netns_of(host))
+        except (NetlinkError, OSError) as e:
+            return self.report_failure(host, operation, e)
+        logging.debug("%s: %s", host.name(), operation)
+        return True
+
+    def _collect_shell_failures(self) -> bool:
+        failed_ops = self.shell.get_failed_ops()
+        self.failed_ops.extend(failed_ops)
+        self.shell.clear_failed_ops()
+        return len(failed_ops) == 0
@@ -0,0 +1,146 @@
+import logging
+from typing import Optional
+from interfaces.host import IHost
+from interfaces.net_backend import (INetBackend, NetBackendType, NetemParams)
+from containernet.cmd_batch import HostCmdBatch
+
+
+class ShellBackend(INetBackend):
+    """ShellBackend formats `ip`/`tc` commands and runs them in the node shell.
+
+    With `batch_setup` enabled, the commands are queued per host and
+    executed as one script on `flush()`.
+
+    With `detached` enabled, every command runs in its own process(`popen`)
+    instead of the node shell, so it can be used while the node shell is
+    busy with the tests, e.g. from another process.
+    """
+
+    def __init__(self, batch_setup: bool = False, detached: bool = False):
+        super().__init__()
+        self.cmd_batch = HostCmdBatch(batch_setup and not detached)
+        self.detached = detached
+
+    def type(self) -> NetBackendType:
+        return NetBackendType.shell
+
+    def add_ifb(self, host: IHost, ifb: str) -> bool:
+        return self._run(host, f"ip link add name {ifb} type ifb") and \
+            self._run(host, f"ip link set {ifb} up")
+
+    def redirect_ingress(self, host: IHost, intf: str, ifb: str) -> bool:
+        return self._run(host, f"tc qdisc add dev {intf} ingress") and \
+            self._run(host, f"tc filter add dev {intf} parent ffff: protocol ip u32 "
+                      f"match u32 0 0 action mirred egress redirect dev {ifb}")
+
+    def set_bandwidth(self, host: IHost, intf: str, bw: Optional[int],
+                      change: bool = False) -> bool:
+        action = "change" if change else "add"
+        return self._run(
+            host, f"tc qdisc {action} dev {intf} root handle 1: {self.tbf_qdisc(bw)}")
+
+    def set_netem(self, host: IHost, intf: str, params: NetemParams,
+                  change: bool = False) -> bool:
+        action = "change" if change else "add"
+        return self._run(
+            host, f"tc qdisc {action} dev {intf} root {self.netem_qdisc(params)}")
+
+    def del_root_qdisc(self, host: IHost, intf: str) -> bool:
+        # the qdisc must be checked first, so it is never batched.
+        tc_output = host.cmd(f'tc qdisc show dev {intf}')
+        if "priomap" in tc_output or "noqueue" in tc_output:
+            return True
+        host.cmd(f'tc qdisc del dev {intf} root')
+        return True
+
+    def del_link(self, host: IHost, intf: str) -> bool:
+        return self._run(host, f"ip link del {intf}")
+
+    def add_route(self, host: IHost, dst: str, gateway: str) -> bool:
+        return self._run(host, f"ip r a {dst} via {gateway}")
+
+    def flush_routes(self, host: IHost) -> bool:
+        self.forget_routes(host)
+        return self._run(host, "ip route flush table main")
+
+    def replace_routes(self, host: IHost, routes, stale_dsts) -> bool:
+        lines = [f"route replace {dst} {self.route_via(gateway)}"
+                 for dst, gateway in routes]
+        lines += [f"route del {dst}" for dst in stale_dsts]
+        if not lines:
+            return True
+        # one `ip` process for all the routes; -force runs the lines after a
+        # failed one. The lines are piped in, so the host does not need to
+        # see any local file, e.g. a remote testbed host.
+        quoted_lines = " ".join(f"'{line}'" for line in lines)
+        command = f"printf '%s\\n' {quoted_lines} | ip -force -batch -"
+        output = self._popen(host, command) if self.detached \
+            else host.cmd(command)
+        if output and output.strip():
+            return self.report_failure(host, command, output.strip())
+        logging.debug("%s: installed %s routes, deleted %s routes", host.name(),
+                      len(routes), len(stale_dsts))
+        return True
+
+    def enable_ip_forward(self, host: IHost) -> bool:
+        self.cmd_batch.cmd(host, "echo 1 > /proc/sys/net/ipv4/ip_forward", check=False)
+        self.cmd_batch.cmd(host, 'sysctl -p', check=False)
+        return True
+
+    def set_multipath_hash_policy(self, host: IHost, policy: int) -> bool:
+        return self._run(host, f"sysctl -q -w net.ipv4.fib_multipath_hash_policy={policy}")
+
+    def flush(self) -> bool:
+        if not self.cmd_batch.flush():
+            for host, command, output in self.cmd_batch.failed_cmds:
+                self.report_failure(host, command, output)
+        return super().flush()
+
+    @staticmethod
+    def route_via(gateway) -> str:
+        """The gateway part of a route, a list of gateways is a multipath route.
+        """
+        if isinstance(gateway, (list, tuple)):
+            return " ".join(f"nexthop via {hop}" for hop in gateway)
+        return f"via {gateway}"
+
+    @staticmethod
+    def tbf_qdisc(bw: Optional[int]) -> str:
+        if bw is None:
+            return "pfifo"
+        return f"tbf rate {bw}mbit burst {bw*1.25}kb latency 1ms"
+
+    @staticmethod
+    def netem_qdisc(params: NetemParams) -> str:
+        shaping_parameters = ""
+        if params.loss is not None:
+            shaping_parameters += f" loss {params.loss}%"
+        if params.delay:
+            shaping_parameters += f" delay {params.delay}ms"
+            if params.jitter:
+                shaping_parameters += f" {params.jitter}ms distribution normal"
+        return f"netem{shaping_parameters} limit {params.limit}"
+
+    def _run(self, host: IHost, command: str) -> bool:
+        if self.detached:
+            output = self._popen(host, command)
+        else:
+            output = self.cmd_batch.cmd(host, command)
+        # `ip` and `tc` are silent on success; batched commands are checked
+        # by their exit codes on `flush()`.
+        if output and output.strip():
+            return self.report_failure(host, command, output.strip())
+        logging.debug("%s: %s", host.name(), command)
+        return True
+
+    @staticmethod
+    def _popen(host: IHost, command: str) -> str:
+        """Run `command` in a new process of the node, returns its error output.
+        """
+        proc = host.popen(command)
+        _, error = proc.communicate()
+        if proc.returncode == 0:
+            return ""
+        if isinstance(error, bytes):
+            error = error.decode(errors='replace')
+        return error or f"exit code {proc.returncode}"
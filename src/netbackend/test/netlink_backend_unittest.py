@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import patch
+from src.interfaces.host import IHost
+from src.interfaces.net_backend import NetemParams
+from src.netbackend import netlink_backend
+from src.netbackend.netlink_backend import NetlinkBackend
+
+
+class FakeNetlinkError(OSError):
+    def __init__(self, code, message=""):
+        super().__init__(code, message)
+        self.code = code
+
+
+class FakeNetNS:
+    """An `IPRoute` of a network namespace which records the requests;
+    the routes via `unreachable_gateway` are rejected.
+    """
+    unreachable_gateway = "10.9.9.9"
+    opened = []
+
+    def __init__(self, netns_path, flags=0):
+        self.netns_path = netns_path
+        self.flags = flags
+        self.links = {'lo': 1, 'h0-eth0': 2}
+        self.requests = []
+        self.closed = False
+        FakeNetNS.opened.append(self)
+
+    def link_lookup(self, ifname):
+        return [self.links[ifname]] if ifname in self.links else []
+
+    def link(self, command, **kwargs):
+        self.requests.append(('link', command, kwargs))
+        if command == 'add':
+            self.links[kwargs['ifname']] = max(self.links.values()) + 1
+        elif command == 'del':
+            self.links = {name: index for name, index in self.links.items()
+                          if index != kwargs['index']}
+
+    def tc(self, command, *args, **kwargs):
+        self.requests.append(('tc', command, args, kwargs))
+        if command == 'del':
+            # only the default qdisc is attached.
+            raise FakeNetlinkError(2, "No such file or directory")
+
+    def route(self, command, **kwargs):
+        if kwargs.get('gateway') == self.unreachable_gateway:
+            raise FakeNetlinkError(101, "Network is unreachable")
+        self.requests.append(('route', command, kwargs))
+
+    def flush_routes(self, **kwargs):
+        self.requests.append(('flush_routes', kwargs))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeHost(IHost):
+    def __init__(self, outputs=None):
+        super().__init__()
+        self.commands = []
+        self.outputs = outputs or {}
+
+    def cmd(self, command: str) -> str:
+        self.commands.append(command)
+        return self.outputs.get(command, "")
+
+    def name(self) -> str:
+        return "h0"
+
+    def netns(self) -> str:
+        return "/proc/42/ns/net"
+
+    def is_connected(self) -> bool:
+        return True
+
+
+class TestNetlinkBackend(unittest.TestCase):
+
+    def setUp(self):
+        FakeNetNS.opened = []
+        for name, fake in [('NetNS', FakeNetNS), ('NetlinkError', FakeNetlinkError)]:
+            patcher = patch.object(netlink_backend, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.host = FakeHost()
+        self.backend = NetlinkBackend()
+
+    def requests(self, kind):
+        return [request[1:] for request in FakeNetNS.opened[0].requests
+                if request[0] == kind]
+
+    def test_add_and_del_link(self):
+        self.assertTrue(self.backend.add_ifb(self.host, "ifb0"))
+        self.assertTrue(self.backend.del_link(self.host, "ifb0"))
+        self.assertEqual(self.requests('link'), [
+            ('add', {'ifname': 'ifb0', 'kind': 'ifb'}),
+            ('set', {'index': 3, 'state': 'up'}),
+            ('del', {'index': 3})])
+        # one socket per namespace, never created by the backend.
+        self.assertEqual(len(FakeNetNS.opened), 1)
+        self.assertEqual(FakeNetNS.opened[0].netns_path, "/proc/42/ns/net")
+        self.assertEqual(FakeNetNS.opened[0].flags, 0)
+        self.assertFalse(self.backend.del_link(self.host, "ifb0"))
+        self.assertEqual(self.backend.get_failed_ops()[0][:2], ("h0", "del link ifb0"))
+        self.backend.close()
+        self.assertTrue(FakeNetNS.opened[0].closed)
+
+    def test_replace_qdisc(self):
+        self.assertTrue(self.backend.set_bandwidth(self.host, "h0-eth0", 100, change=True))
+        self.assertTrue(self.backend.set_bandwidth(self.host, "h0-eth0", None))
+        self.assertTrue(self.backend.set_netem(
+            self.host, "h0-eth0", NetemParams(loss=2, delay=10), change=True))
+        # the default qdisc is not an error.
+        self.assertTrue(self.backend.del_root_qdisc(self.host, "h0-eth0"))
+        self.assertEqual(self.requests('tc'), [
+            ('change', ('tbf', 2, 0x10000),
+             {'rate': '100mbit', 'burst': 128000, 'latency': '1ms'}),
+            ('add', ('pfifo', 2, 0x10000), {}),
+            ('change', ('netem', 2, 0), {'limit': 250000, 'loss': 2, 'delay': 10000}),
+            ('del', (), {'index': 2})])
+        self.assertTrue(self.backend.flush())
+
+    def test_replace_routes(self):
+        self.assertTrue(self.backend.set_routes(self.host, [
+            ("10.0.0.2", "10.0.1.1"), ("10.0.0.3/32", ["10.0.1.1", "10.0.2.1"])]))
+        self.assertTrue(self.backend.set_routes(self.host, [("10.0.0.3", "10.0.2.1")]))
+        self.assertEqual(self.requests('route'), [
+            ('replace', {'dst': '10.0.0.2/32', 'gateway': '10.0.1.1'}),
+            ('replace', {'dst': '10.0.0.3/32',
+                         'multipath': [{'gateway': '10.0.1.1'}, {'gateway': '10.0.2.1'}]}),
+            ('replace', {'dst': '10.0.0.3/32', 'gateway': '10.0.2.1'}),
+            ('del', {'dst': '10.0.0.2/32'})])
+        self.assertTrue(self.backend.flush_routes(self.host))
+        self.assertEqual(self.requests('flush_routes'), [({'table': 254},)])
+
+    def test_failed_route_does_not_stop_the_others(self):
+        self.assertFalse(self.backend.set_routes(self.host, [
+            ("10.0.0.2", FakeNetNS.unreachable_gateway), ("10.0.0.3", "10.0.1.1")]))
+        self.assertEqual(self.requests('route'), [
+            ('replace', {'dst': '10.0.0.3/32', 'gateway': '10.0.1.1'})])
+        failed_ops = self.backend.get_failed_ops()
+        self.assertEqual(len(failed_ops), 1)
+        self.assertIn("10.0.0.2/32 via 10.9.9.9", failed_ops[0][2])
+
+    def test_flush_collects_failures(self):
+        sysctl = "sysctl -q -w net.ipv4.fib_multipath_hash_policy=1"
+        host = FakeHost({sysctl: "sysctl: permission denied"})
+        # sysctl goes through the shell backend.
+        self.assertFalse(self.backend.set_multipath_hash_policy(host, 1))
+        self.assertFalse(self.backend.add_route(host, "10.0.0.2", FakeNetNS.unreachable_gateway))
+        self.assertFalse(self.backend.flush())
+        self.assertEqual([op[1] for op in self.backend.get_failed_ops()], [
+            "add route 10.0.0.2/32 via 10.9.9.9", sysctl])
+        self.backend.clear_failed_ops()
+        self.assertTrue(self.backend.flush())
+
+    def test_netem_jitter_falls_back_to_the_shell(self):
+        params = NetemParams(loss=0, delay=10, jitter=3)
+        self.assertTrue(self.backend.set_netem(self.host, "h0-eth0", params))
+        self.assertEqual(self.host.commands, [
+            "tc qdisc add dev h0-eth0 root netem loss 0% delay 10ms 3ms "
+            "distribution normal limit 250000"])
+        self.assertEqual(FakeNetNS.opened, [])
+
+    def test_pyroute2_missing(self):
+        with patch.object(netlink_backend, 'NetNS', None):
+            self.assertFalse(self.backend.add_route(self.host, "10.0.0.2", "10.0.1.1"))
+        self.assertEqual(self.backend.get_failed_ops(), [
+            ("h0", "add route 10.0.0.2/32 via 10.0.1.1", "pyroute2 is not installed")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import shutil
+import subprocess
+import tempfile
+import unittest
+from src.interfaces.host import IHost
+from src.interfaces.net_backend import NetemParams
+from src.netbackend.shell_backend import ShellBackend
+
+
+class FakeHost(IHost):
+    def __init__(self, outputs=None):
+        super().__init__()
+        self.commands = []
+        self.popen_commands = []
+        self.outputs = outputs or {}
+
+    def cmd(self, command: str) -> str:
+        self.commands.append(command)
+        return self.outputs.get(command, "")
+
+    def popen(self, command: str):
+        self.popen_commands.append(command)
+        error = self.outputs.get(command, "")
+        return subprocess.Popen(
+            ['sh', '-c', 'echo "$0" >&2; exit 2' if error else 'true', error],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def name(self) -> str:
+        return "h0"
+
+    def is_connected(self) -> bool:
+        return True
+
+
+class TestShellBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.host = FakeHost()
+        self.backend = ShellBackend()
+
+    def test_set_bandwidth(self):
+        self.assertTrue(self.backend.set_bandwidth(self.host, "h0-eth0", 100))
+        self.assertTrue(self.backend.set_bandwidth(
+            self.host, "h0-eth0", None, change=True))
+        self.assertEqual(self.host.commands, [
+            "tc qdisc add dev h0-eth0 root handle 1: tbf rate 100mbit burst 125.0kb latency 1ms",
+            "tc qdisc change dev h0-eth0 root handle 1: pfifo"])
+
+    def test_set_netem(self):
+        params = NetemParams(loss=2, delay=10, jitter=3, limit=1000)
+        self.assertTrue(self.backend.set_netem(self.host, "ifb0", params))
+        self.assertEqual(self.host.commands, [
+            "tc qdisc add dev ifb0 root netem loss 2% delay 10ms 3ms distribution normal limit 1000"])
+
+    def test_netem_jitter_requires_delay(self):
+        params = NetemParams(loss=0, delay=0, jitter=3)
+        self.assertEqual(ShellBackend.netem_qdisc(params),
+                         "netem loss 0% limit 250000")
+
+    def test_failed_operation_is_reported(self):
+        route_cmd = "ip r a 10.0.0.2/32 via 10.0.0.1"
+        host = FakeHost({route_cmd: "RTNETLINK answers: File exists\n"})
+        self.assertFalse(self.backend.add_route(
+            host, "10.0.0.2/32", "10.0.0.1"))
+        self.assertEqual(self.backend.get_failed_ops(), [
+            ("h0", route_cmd, "RTNETLINK answers: File exists")])
+        self.assertFalse(self.backend.flush())
+        self.backend.clear_failed_ops()
+        self.assertTrue(self.backend.flush())
+
+    def test_del_root_qdisc_skips_default_qdisc(self):
+        host = FakeHost({"tc qdisc show dev h0-eth0":
+                         "qdisc noqueue 0: root refcnt 2"})
+        self.assertTrue(self.backend.del_root_qdisc(host, "h0-eth0"))
+        self.assertEqual(host.commands, ["tc qdisc show dev h0-eth0"])
+
+    def test_detached_backend_does_not_use_the_shell(self):
+        route_cmd = "ip r a 10.0.0.2/32 via 10.0.0.1"
+        host = FakeHost({route_cmd: "RTNETLINK answers: File exists"})
+        backend = ShellBackend(batch_setup=True, detached=True)
+        self.assertTrue(backend.set_netem(host, "ifb0", NetemParams(loss=1),
+                                          change=True))
+        self.assertFalse(backend.add_route(host, "10.0.0.2/32", "10.0.0.1"))
+        self.assertEqual(host.commands, [])
+        self.assertEqual(host.popen_commands, [
+            "tc qdisc change dev ifb0 root netem loss 1% limit 250000", route_cmd])
+        self.assertEqual(backend.get_failed_ops(), [
+            ("h0", route_cmd, "RTNETLINK answers: File exists")])
+
+    def test_set_routes_in_one_batch(self):
+        batches = []
+
+        def cmd(command):
+            # the lines piped into `ip -batch`, printed by a local shell
+            if command.endswith('| ip -force -batch -'):
+                printf = command[:-len('| ip -force -batch -')]
+                batches.append(subprocess.run(['sh', '-c', printf], check=True,
+                                              capture_output=True, text=True).stdout)
+            return ""
+        self.host.cmd = cmd
+        self.assertTrue(self.backend.set_routes(self.host, [
+            ("10.0.0.2", "10.0.1.1"), ("10.0.0.3/32", "10.0.1.1")]))
+        self.assertTrue(self.backend.set_routes(self.host, [
+            ("10.0.0.3", "10.0.2.1")]))
+        self.assertTrue(self.backend.clear_routes(self.host))
+        self.assertEqual(batches, [
+            "route replace 10.0.0.2/32 via 10.0.1.1\n"
+            "route replace 10.0.0.3/32 via 10.0.1.1\n",
+            "route replace 10.0.0.3/32 via 10.0.2.1\n"
+            "route del 10.0.0.2/32\n",
+            "route del 10.0.0.3/32\n"])
+        # nothing to delete after the routes are flushed.
+        self.assertTrue(self.backend.set_routes(self.host, [
+            ("10.0.0.3", "10.0.2.1")]))
+        self.backend.flush_routes(self.host)
+        self.assertTrue(self.backend.clear_routes(self.host))
+        self.assertEqual(len(batches), 4)
+        self.assertTrue(self.backend.set_routes(self.host, [
+            ("10.0.0.4", ["10.0.1.1", "10.0.2.1"])]))
+        self.assertEqual(batches[-1],
+                         "route replace 10.0.0.4/32 nexthop via 10.0.1.1 "
+                         "nexthop via 10.0.2.1\n")
+
+    def test_set_routes_reports_failure(self):
+        self.host.cmd = lambda command: "Error: Nexthop has invalid gateway.\n"
+        self.assertFalse(self.backend.set_routes(self.host, [("10.0.0.2", "10.9.9.9")]))
+        self.assertEqual(len(self.backend.get_failed_ops()), 1)
+
+    def test_batched_failure_is_reported_on_flush(self):
+        batch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, batch_dir)
+        backend = ShellBackend(batch_setup=True)
+        backend.cmd_batch.script_dir = f"{batch_dir}/"
+        # a node shell where `ip r a` fails and `tc` succeeds.
+        fake_tools = 'ip() { echo "RTNETLINK answers: File exists" >&2; return 2; }; ' \
+                     'tc() { return 0; }; sysctl() { return 255; }; '
+
+        def cmd(command):
+            script = command[len('sh '):]
+            return subprocess.run(['sh', '-c', f'{fake_tools}. {script}'], check=False,
+                                  stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  text=True).stdout
+        self.host.cmd = cmd
+        self.assertTrue(backend.set_bandwidth(self.host, "h0-eth0", 100))
+        self.assertTrue(backend.add_route(self.host, "10.0.0.2/32", "10.0.0.1"))
+        self.assertTrue(backend.enable_ip_forward(self.host))
+        self.assertTrue(backend.set_netem(self.host, "ifb0", NetemParams(loss=1)))
+        self.assertFalse(backend.flush())
+        self.assertEqual(backend.get_failed_ops(), [
+            ("h0", "ip r a 10.0.0.2/32 via 10.0.0.1", "RTNETLINK answers: File exists")])
+        # the commands are run once.
+        backend.clear_failed_ops()
+        self.assertTrue(backend.flush())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ from interfaces.network import INetwork
 from interfaces.host import IHost
 from protosuites.proto import (ProtoConfig, IProtoSuite, ProtoRole)
 from tools.cfg_generator import generate_cfg_files, generate_olsr_cfg_files
+from tools.host_fanout import (fan_out, for_each_host)
 
 
 class BATSProtocol(IProtoSuite):
@@ -104,13 +105,16 @@ class BATSProtocol(IProtoSuite):
             generate_cfg_files(all_hosts_num, hosts_ip_range,
                                self.virtual_ip_prefix, f'{self.log_config_dir}{extend_path}',
                                test_tun_mode,
-                               cfg_template_path)
+                               cfg_template_path,
+                               link_prefix=network.get_link_prefix())
         # generate some error log if the license file is not correct
         self._verify_license()
-        for i in self.config.hosts:
-            all_hosts[i].cmd(f'iptables -F -t nat')
-            self._init_tun(all_hosts[i])
-            self._init_config(all_hosts[i], net_id)
+
+        def __init_host(host):
+            host.cmd(f'iptables -F -t nat')
+            self._init_tun(host)
+            self._init_config(host, net_id)
+        for_each_host([all_hosts[i] for i in self.config.hosts], __init_host)
         return True
 
     def run(self, network: INetwork):
@@ -171,16 +175,12 @@ class BATSProtocol(IProtoSuite):
         all_hosts = network.get_hosts()
         if all_hosts is None:
             return False
-        host_num = len(all_hosts)
-        for i in range(host_num):
-            logging.info(
-                f"############### Oasis stop bats protocol on "
-                "%s ###############",
-                all_hosts[i].name())
-            all_hosts[i].cmd(
-                f'pkill -9 -f {self.process_name}')
-            all_hosts[i].cmd(f'ip tuntap del mode tap tap')
-            all_hosts[i].cmd(f'iptables -F -t nat')
+        logging.info(
+            f"############### Oasis stop bats protocol on "
+            "%s hosts ###############",
+            len(all_hosts))
+        fan_out(all_hosts, f'pkill -9 -f {self.process_name}; '
+                f'ip tuntap del mode tap tap; iptables -F -t nat')
         return True
 
     def _init_tun(self, host: IHost):
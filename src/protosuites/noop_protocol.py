@@ -2,6 +2,7 @@ import logging
 from abc import ABC, abstractmethod
 from interfaces.network import INetwork
 from protosuites.proto import (ProtoConfig, IProtoSuite, ProtoRole)
+from tools.host_fanout import for_each_host
 
 
 def is_next_protocol(proto_name: str) -> bool:
@@ -46,21 +47,22 @@ class TCPConfigInf(ProtocolConfigInf):
                 "TCP version %s is not supported, please check the configuration.", self.version)
             return False
         hosts = network.get_hosts()
-        # read `tcp_congestion_control` before change
-        for host in hosts:
+
+        def __setup(host):
+            # read `tcp_congestion_control` before change
             pf = host.popen(
                 f"sysctl net.ipv4.tcp_congestion_control")
             if pf is None:
                 logging.error(
                     "Failed to get the tcp congestion control on %s", host.name())
-                continue
+                return
             res = pf.stdout.read().decode('utf-8')
             default_version = res.split('=')[-1].strip()
             if default_version == self.version:
                 logging.info(
                     "tcp default version on %s is already %s, skip the setup.",
                     host.name(), default_version)
-                continue
+                return
             self.default_version_dict[host.name()] = default_version
             logging.debug("tcp default version on %s is %s",
                           host.name(), default_version)
@@ -70,6 +72,7 @@ class TCPConfigInf(ProtocolConfigInf):
             logging.info(
                 "############### Oasis set the congestion control"
                 " algorithm to %s on %s ###############", self.version, host.name())
+        for_each_host(hosts, __setup)
         return True
 
     def restore(self, network: 'INetwork') -> bool:  # type: ignore
@@ -3,6 +3,7 @@ import time
 import re
 from protosuites.proto import (ProtoConfig, IProtoSuite, ProtoRole)
 from interfaces.network import INetwork
+from tools.host_fanout import fan_out
 
 
 class StdProtocol(IProtoSuite):
@@ -61,11 +62,10 @@ class StdProtocol(IProtoSuite):
         hosts = network.get_hosts()
         if hosts is None:
             return False
-        for host in hosts:
-            host.cmd(f'pkill -9 -f {self.process_name}')
-            logging.info(
-                f"############### Oasis stop %s protocol on %s ###############",
-                self.config.name, host.name())
+        fan_out(hosts, f'pkill -9 -f {self.process_name}')
+        logging.info(
+            f"############### Oasis stop %s protocol on %s hosts ###############",
+            self.config.name, len(hosts))
         return True
 
     def get_forward_port(self) -> int:
@@ -1,6 +1,33 @@
 import logging
 import time
 from interfaces.routing import IRoutingStrategy
+from tools.host_fanout import (fan_out, for_each_host)
+
+# the originator address of host `i` is `{olsr_originator_prefix}{i + 1}`
+olsr_originator_prefix = "172.23.1."
+
+# the interval between two convergence probes grows from the min to the max.
+min_probe_interval = 0.1
+max_probe_interval = 1.0
+
+
+def originator_ip(host_id: int) -> str:
+    return f"{olsr_originator_prefix}{host_id + 1}"
+
+
+def routed_originators(route_output: str):
+    """The ids of the hosts whose originator address is in the output of
+    `ip route show`.
+    """
+    host_ids = set()
+    for line in (route_output or "").splitlines():
+        dst = line.split(' ', 1)[0].split('/', 1)[0]
+        if dst.startswith(olsr_originator_prefix):
+            try:
+                host_ids.add(int(dst[len(olsr_originator_prefix):]) - 1)
+            except ValueError:
+                continue
+    return host_ids
 
 
 class OLSRRouting(IRoutingStrategy):
@@ -11,6 +38,8 @@ class OLSRRouting(IRoutingStrategy):
     def __init__(self):
         self.binary_path = "olsrd2_static"
         self.cfg_path = "/etc/olsr/olsr.config"
+        # the convergence time of the last start, see `routing_metrics()`
+        self.convergence = {}
 
     def setup_routes(self, network: 'INetwork'):
         self.start(network)
@@ -18,6 +47,27 @@ class OLSRRouting(IRoutingStrategy):
     def teardown_routes(self, network: 'INetwork'):
         self.stop(network)
 
+    def routing_metrics(self):
+        return {'olsr_convergence': self.convergence} if self.convergence else {}
+
+    @staticmethod
+    def _host_intfs(network: 'INetwork'):
+        """The link interfaces of every host, any mesh is supported.
+        """
+        hosts = network.get_hosts()
+        host_intfs = [[] for _ in hosts]
+        link_intfs = network.get_link_intfs()
+        if link_intfs:
+            for (id1, _), intf in sorted(link_intfs.items()):
+                host_intfs[id1].append(intf)
+            return host_intfs
+        # the interfaces are named by the order of the links of a host.
+        host_index = {host: i for i, host in enumerate(hosts)}
+        for host, _ in network.get_link_table():
+            i = host_index[host]
+            host_intfs[i].append(f"{hosts[i].name()}-eth{len(host_intfs[i])}")
+        return host_intfs
+
     def _generate_cfg(self, network: 'INetwork'):
         template = ""
         template += "[olsrv2]\n"
@@ -39,52 +89,76 @@ class OLSRRouting(IRoutingStrategy):
         template += "\n"
 
         hosts = network.get_hosts()
-        host_num = network.get_num_of_host()
-        for i in range(host_num):
-            interface = ""
+        host_intfs = self._host_intfs(network)
+
+        def __generate(i):
+            interface = "".join(f"[interface={intf}]\n" for intf in sorted(set(host_intfs[i])))
+            interface += "\n"
             if i == 0:
-                interface += f"[interface={hosts[i].name()}-eth0]\n\n"
                 interface += "[lan_import=lan]\n"
                 interface += "interface  eth0\n\n"
-            elif i == host_num - 1:
-                interface += f"[interface={hosts[i].name()}-eth0]\n\n"
-            else:
-                interface += f"[interface={hosts[i].name()}-eth0]\n"
-                interface += f"[interface={hosts[i].name()}-eth1]\n\n"
-            hosts[i].cmd(f'mkdir /etc/olsr')
+            hosts[i].cmd(f'mkdir -p /etc/olsr')
             hosts[i].cmd(
                 f'echo "{template.format(interface=interface)}" > {self.cfg_path}')
             hosts[i].cmd(
-                f'ip addr add 172.23.1.{i + 1}/32 dev lo label \"lo:olsr\"')
+                f'ip addr add {originator_ip(i)}/32 dev lo label \"lo:olsr\"')
+        # the hosts are configured concurrently.
+        for_each_host(range(len(hosts)), __generate)
 
     def start(self, network: 'INetwork'):
         self._generate_cfg(network)
         hosts = network.get_hosts()
         host_num = network.get_num_of_host()
-        for host in hosts:
-            host.cmd(f'nohup {self.binary_path} --load={self.cfg_path} &')
-            # host.cmd(
-            #     f'nohup {self.binary_path} --load={self.cfg_path} >
-            #  {g_root_path}test_results/olsr{host.name()}.log &')
+        fan_out(hosts, f'nohup {self.binary_path} --load={self.cfg_path} &')
+        # host.cmd(
+        #     f'nohup {self.binary_path} --load={self.cfg_path} >
+        #  {g_root_path}test_results/olsr{host.name()}.log &')
         max_wait_sec = 20 + host_num * 3
-        wait_sec = 0
-        last_host_ip = f'172.23.1.{host_num}'
-        while wait_sec < max_wait_sec:
-            time.sleep(1)
-            wait_sec += 1
-            route = hosts[0].cmd(
-                f'ip route | grep {last_host_ip} | grep -v grep')
-            if route is not None and route.find(last_host_ip) != -1:
-                break
-        if wait_sec >= max_wait_sec:
-            logging.error("OLSR routing is not setup correctly.")
+        self.convergence = self.wait_for_convergence(hosts, max_wait_sec)
+        if self.convergence['converged_hosts'] < host_num:
+            logging.error("OLSR routing is not setup correctly, %s of %s hosts "
+                          "converged in %s seconds.", self.convergence['converged_hosts'],
+                          host_num, max_wait_sec)
             return False
         logging.info(
-            "OLSR routing is setup correctly at %u seconds.", wait_sec)
+            "OLSR routing is setup correctly at %.3f seconds.",
+            self.convergence['network_sec'])
         return True
 
+    @staticmethod
+    def wait_for_convergence(hosts, max_wait_sec):
+        """Probe the routes of all the hosts concurrently until every host
+        has a route to the originators of all the others.
+
+        Returns the convergence time of every host and of the network in
+        seconds since the probing starts; None for the hosts that do not
+        converge within `max_wait_sec`.
+        """
+        host_num = len(hosts)
+        all_ids = set(range(host_num))
+        host_sec = [None] * host_num
+        start = time.monotonic()
+        interval = min_probe_interval
+        while True:
+            pending = [i for i in range(host_num) if host_sec[i] is None]
+            results = fan_out([hosts[i] for i in pending], 'ip route show',
+                              timeout=max_probe_interval * 5)
+            elapsed = time.monotonic() - start
+            for i, result in zip(pending, results):
+                if all_ids - {i} <= routed_originators(result.output):
+                    host_sec[i] = round(elapsed, 3)
+            if all(sec is not None for sec in host_sec) or elapsed >= max_wait_sec:
+                break
+            time.sleep(interval)
+            interval = min(interval * 2, max_probe_interval)
+        converged = [sec for sec in host_sec if sec is not None]
+        return {
+            'hosts': {hosts[i].name(): host_sec[i] for i in range(host_num)},
+            'converged_hosts': len(converged),
+            'network_sec': max(converged) if len(converged) == host_num else None,
+        }
+
     def stop(self, network: 'INetwork'):
         hosts = network.get_hosts()
-        for host in hosts:
-            host.cmd(f'killall -9 {self.binary_path}')
+        fan_out(hosts, f'killall -9 {self.binary_path}')
         logging.info("OLSR routing is stopped.")
@@ -0,0 +1,180 @@
+import copy
+import hashlib
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# the next hop of a pair without a route
+no_route = -1
+
+
+def chain_adjacency(num_of_nodes: int):
+    """The adjacency matrix of the chain 0 - 1 - ... - `num_of_nodes` - 1.
+    """
+    return np.eye(num_of_nodes, k=1, dtype=np.int8) + np.eye(num_of_nodes, k=-1, dtype=np.int8)
+
+
+def hop_distances(adjacency):
+    """The hop count of the shortest path of all pairs, -1 if unreachable.
+
+    All sources are expanded together, one matrix product per hop.
+    """
+    adjacency = (np.asarray(adjacency) != 0).astype(np.float32)
+    num_of_nodes = len(adjacency)
+    distances = np.full((num_of_nodes, num_of_nodes), -1, dtype=np.int32)
+    np.fill_diagonal(distances, 0)
+    frontier = np.eye(num_of_nodes, dtype=np.float32)
+    for hops in range(1, num_of_nodes):
+        reached = (frontier @ adjacency > 0) & (distances < 0)
+        if not reached.any():
+            break
+        distances[reached] = hops
+        frontier = reached.astype(np.float32)
+    return distances
+
+
+def next_hop_table(adjacency):
+    """The next hop table of all pairs: `table[src][dst]` is the first hop
+    from `src` to `dst`, or `no_route`.
+
+    The first hop is the lowest indexed neighbor of `src` which is one hop
+    closer to `dst`, as a BFS visiting the neighbors in index order finds.
+    """
+    adjacency = np.asarray(adjacency) != 0
+    distances = hop_distances(adjacency)
+    num_of_nodes = len(adjacency)
+    table = np.full((num_of_nodes, num_of_nodes), no_route, dtype=np.int32)
+    for src in range(num_of_nodes):
+        neighbors = np.flatnonzero(adjacency[src])
+        if len(neighbors) == 0:
+            continue
+        # closer[i][dst]: the i-th neighbor is one hop closer to dst.
+        closer = (distances[neighbors] == distances[src] - 1) & \
+            (distances[src] > 0)
+        has_route = closer.any(axis=0)
+        table[src][has_route] = neighbors[np.argmax(closer, axis=0)[has_route]]
+    return table
+
+
+def equal_cost_next_hop_table(adjacency):
+    """All the first hops of the shortest paths of all pairs:
+    `table[src][dst]` is the list of the neighbors of `src` which are one hop
+    closer to `dst` in the order of their index, empty if there is no route.
+
+    The first one of every list is the next hop of `next_hop_table()`.
+    """
+    adjacency = np.asarray(adjacency) != 0
+    distances = hop_distances(adjacency)
+    num_of_nodes = len(adjacency)
+    table = [[[] for _ in range(num_of_nodes)] for _ in range(num_of_nodes)]
+    for src in range(num_of_nodes):
+        neighbors = np.flatnonzero(adjacency[src])
+        closer = (distances[neighbors] == distances[src] - 1) & \
+            (distances[src] > 0)
+        # sorted by dst, then by the index of the neighbor.
+        for dst, i in zip(*np.nonzero(closer.T)):
+            table[src][dst].append(int(neighbors[i]))
+    return table
+
+
+def dijkstra_next_hops(weights, src: int):
+    """The first hop of the least cost path from `src` to every node;
+    `no_route` for `src` itself and the unreachable nodes.
+
+    `weights[i][j]` is the cost of the link `i` -> `j`, `np.inf` if there is
+    no such link. Among the paths of the same cost the one of fewer hops
+    wins, then the one of the lowest indexed first hop, so the unit weights
+    give the same table as `next_hop_table()`.
+    """
+    weights = np.asarray(weights, dtype=float)
+    next_hops = [no_route] * len(weights)
+    done = np.zeros(len(weights), dtype=bool)
+    # (cost, hops, first hop, node); the cost is rounded so that the paths
+    # of the same cost are not told apart by the float errors of the sums.
+    heap = [(0.0, 0, no_route, src)]
+    while heap:
+        cost, hops, first_hop, node = heapq.heappop(heap)
+        if done[node]:
+            continue
+        done[node] = True
+        next_hops[node] = first_hop
+        for neighbor in np.flatnonzero(np.isfinite(weights[node]) & ~done):
+            neighbor = int(neighbor)
+            heapq.heappush(heap, (round(cost + weights[node][neighbor], 9), hops + 1,
+                                  neighbor if node == src else first_hop, neighbor))
+    return next_hops
+
+
+def weighted_next_hop_table(weights):
+    """The next hop table of all pairs by the least cost paths of `weights`,
+    see `dijkstra_next_hops()`.
+    """
+    weights = np.asarray(weights, dtype=float)
+    return np.array([dijkstra_next_hops(weights, src)
+                     for src in range(len(weights))], dtype=np.int32)
+
+
+class RouteTableCache:
+    """RouteTableCache keeps the computed next hop tables, so that the routes
+    of a network are only computed again when its topology changes.
+
+    An entry is keyed by the kind of the table and a hash of the matrices
+    it is computed from: the adjacency matrix, or the link weights of the
+    least cost paths. A change of the link quality which does not change
+    them reuses the table. Every lookup returns a copy.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        # key -> table, the least recently used first
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def matrix_key(kind: str, matrix) -> str:
+        matrix = np.ascontiguousarray(matrix)
+        digest = hashlib.sha256(f"{kind}:{matrix.dtype.str}:{matrix.shape}".encode())
+        digest.update(matrix.tobytes())
+        return digest.hexdigest()
+
+    def get(self, kind: str, compute, matrix):
+        """Returns a copy of `compute(matrix)`, `compute` is only called when
+        no table of `kind` is cached for the same `matrix`.
+        """
+        key = self.matrix_key(kind, matrix)
+        with self.lock:
+            table = self.entries.get(key)
+            if table is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                logging.debug("RouteTableCache: reuse the %s table of %s nodes.",
+                              kind, len(matrix))
+                return copy.deepcopy(table)
+        table = compute(matrix)
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = table
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return copy.deepcopy(table)
+
+    def next_hop_table(self, adjacency):
+        return self.get('hops', next_hop_table, np.asarray(adjacency) != 0)
+
+    def equal_cost_next_hop_table(self, adjacency):
+        return self.get('ecmp', equal_cost_next_hop_table, np.asarray(adjacency) != 0)
+
+    def weighted_next_hop_table(self, weights):
+        return self.get('weighted', weighted_next_hop_table,
+                        np.asarray(weights, dtype=float))
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
+
+
+g_route_table_cache = RouteTableCache()
@@ -1,23 +1,40 @@
 from interfaces.routing import (IRoutingStrategy, RouteType)
 from routing.static_routing import StaticRouting
 from routing.static_routing_bfs import StaticRoutingBfs
+from routing.static_routing_dijkstra import StaticRoutingDijkstra
+from routing.static_routing_ecmp import StaticRoutingEcmp
 from routing.olsr_routing import OLSRRouting
 from routing.openr_routing import OpenrRouting
 
 # map string to type
 route_string_to_enum = {
     'static_bfs': RouteType.static_bfs,
+    'static_dijkstra': RouteType.static_dijkstra,
+    'static_ecmp': RouteType.static_ecmp,
     'static_route': RouteType.static,
     'olsr_route': RouteType.olsr,
     'openr_route': RouteType.openr}
 
 
+def split_route_string(route: str):
+    """Split `route` of the test case into the route strategy and its
+    options, e.g. `static_dijkstra:latency+10*etx`.
+    """
+    name, _, options = route.partition(':')
+    return name, options or None
+
+
 class RoutingFactory:
-    def create_routing(self, routing_type: RouteType) -> IRoutingStrategy:
+    def create_routing(self, routing_type: RouteType,
+                       options: str = None) -> IRoutingStrategy:
         if routing_type == RouteType.static:
             return StaticRouting()
         if routing_type == RouteType.static_bfs:
             return StaticRoutingBfs()
+        if routing_type == RouteType.static_dijkstra:
+            return StaticRoutingDijkstra(options) if options else StaticRoutingDijkstra()
+        if routing_type == RouteType.static_ecmp:
+            return StaticRoutingEcmp(options) if options else StaticRoutingEcmp()
         if routing_type == RouteType.olsr:
             return OLSRRouting()
         if routing_type == RouteType.openr:
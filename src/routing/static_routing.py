@@ -1,4 +1,6 @@
 from interfaces.routing import IRoutingStrategy
+from routing.route_table import (chain_adjacency, g_route_table_cache, no_route)
+from tools.host_fanout import for_each_host
 
 
 class StaticRouting(IRoutingStrategy):
@@ -9,6 +11,8 @@ class StaticRouting(IRoutingStrategy):
     def __init__(self):
         self.pair_to_link_ip = {}
         self.net_routes = []
+        # host -> {dst: gateway}
+        self.host_routes = {}
 
     def setup_routes(self, network: 'INetwork'):
         '''
@@ -17,51 +21,39 @@ class StaticRouting(IRoutingStrategy):
         hosts = network.get_hosts()
         self.pair_to_link_ip = network.get_link_table()
         self.net_routes = [range(network.get_num_of_host())]
+        net_backend = network.get_net_backend()
+        self.host_routes = {host: {} for host in hosts}
         for route in self.net_routes:
             route = [hosts[i] for i in route]
-            self._add_route(route)
-
-    @staticmethod
-    def _add_ip_gateway(host, gateway_ip, dst_ip):
-        host.cmd(f'ip r a {dst_ip} via {gateway_ip}')
-
-    def _add_route(self, route):
-        for i in range(len(route) - 1):
-            for j in range(i + 1, len(route)):
-                host = route[i]
-                gateway = route[i + 1]
-                dst_prev = route[j - 1]
-                dst = route[j]
-                if j < len(route) - 1:
-                    dst_next = route[j + 1]
-
-                # gateway ip is the ip of the second (right) interface
-                # of the link (route_i, route_{i+1})
-                gateway_ip = self.pair_to_link_ip[(host, gateway)]
-
-                # dst ip is the ip of the second (right) interface in the link
-                # (route_{j-1}, route_j)
-                dst_ip = self.pair_to_link_ip[(dst_prev, dst)]
-                if j < len(route) - 1:
-                    dst_ip_right = self.pair_to_link_ip[(dst_next, dst)]
-                self._add_ip_gateway(host, gateway_ip, dst_ip)
-                if j < len(route) - 1:
-                    self._add_ip_gateway(host, gateway_ip, dst_ip_right)
-
-        for i in range(1, len(route)):
-            for j in range(0, i):
-                host = route[i]
-                gateway = route[i - 1]
-                dst_prev = route[j + 1]
-                dst = route[j]
-
-                if j >= 1:
-                    dst_next = route[j - 1]
-
-                gateway_ip = self.pair_to_link_ip[(host, gateway)]
-                dst_ip = self.pair_to_link_ip[(dst_prev, dst)]
-                if j >= 1:
-                    dst_ip_left = self.pair_to_link_ip[(dst_next, dst)]
-                self._add_ip_gateway(host, gateway_ip, dst_ip)
-                if j >= 1:
-                    self._add_ip_gateway(host, gateway_ip, dst_ip_left)
+            self._add_route(net_backend, route)
+        # the route set of each host is installed in one request.
+        for_each_host(hosts, lambda host: net_backend.set_routes(
+            host, list(self.host_routes[host].items())))
+
+    def teardown_routes(self, network: 'INetwork'):
+        net_backend = network.get_net_backend()
+        for_each_host(network.get_hosts(), net_backend.clear_routes)
+
+    def _add_ip_gateway(self, net_backend, host, gateway_ip, dst_ip):
+        self.host_routes[host][dst_ip] = gateway_ip
+
+    def _add_route(self, net_backend, route):
+        """Add the routes of the chain `route`: a host reaches every interface
+        of the other hosts via its neighbor towards them.
+        """
+        # the next hops of the chain, reused by the chains of the same length.
+        next_hops = g_route_table_cache.next_hop_table(chain_adjacency(len(route)))
+        for i, host in enumerate(route):
+            for j, dst in enumerate(route):
+                next_hop = next_hops[i][j]
+                if next_hop == no_route:
+                    continue
+                # gateway ip is the ip of the interface of the neighbor
+                # on the link (route_i, route_{next_hop})
+                gateway_ip = self.pair_to_link_ip[(host, route[next_hop])]
+                # dst ips are the ips of the interfaces of route_j on the
+                # links to its neighbors
+                for peer in (j - 1, j + 1):
+                    if 0 <= peer < len(route):
+                        self._add_ip_gateway(net_backend, host, gateway_ip,
+                                             self.pair_to_link_ip[(route[peer], dst)])
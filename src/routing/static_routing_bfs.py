@@ -1,12 +1,13 @@
 
 import logging
-from collections import deque
 from interfaces.routing import IRoutingStrategy
+from routing.route_table import (g_route_table_cache, no_route)
+from tools.host_fanout import for_each_host
 
 
 class StaticRoutingBfs(IRoutingStrategy):
     """Summary:
-    Configure static routing for the network using BFS to find the shortest path.
+    Configure static routing for the network by the shortest paths(hop count).
     StaticRoutingBfs is the replacement for StaticRouting which only works with the chain network.
     """
 
@@ -18,50 +19,55 @@ class StaticRoutingBfs(IRoutingStrategy):
         '''
         Setup the routing by ip route.
         '''
-        hosts = network.get_hosts()
         self.pair_to_link_ip = network.get_link_table()
-        adjacency = network.net_mat  # adjacency matrix
-        num_hosts = len(hosts)
+        self._install_next_hops(network, self.compute_next_hops(network))
 
-        # Compute next hops for all pairs using BFS
+    def compute_next_hops(self, network: 'INetwork'):
+        """The next hop table of all pairs, see `route_table.next_hop_table()`.
+        """
+        # the next hops of all pairs, computed in one pass; reused until
+        # the adjacency changes.
+        return g_route_table_cache.next_hop_table(network.net_mat)
+
+    def _install_next_hops(self, network: 'INetwork', next_hops):
+        hosts = network.get_hosts()
+        num_hosts = len(hosts)
+        net_backend = network.get_net_backend()
+        host_routes = [[] for _ in range(num_hosts)]
         for src in range(num_hosts):
             for dst in range(num_hosts):
-                if src == dst:
-                    continue
-                path = self._bfs_shortest_path(adjacency, src, dst)
-                if not path or len(path) < 2:
+                gateways = self._gateways_of(hosts, src, dst, next_hops[src][dst])
+                if not gateways:
                     # No path or already at destination
                     continue
-                next_hop = path[1]
-                # Find the IP of the next hop interface
-                gateway_ip = self.pair_to_link_ip.get(
-                    (hosts[src], hosts[next_hop]))
-                dst_ip = hosts[dst].IP()
-                if gateway_ip:
-                    self._add_ip_gateway(hosts[src], gateway_ip, dst_ip)
-                    logging.debug(
-                        "Static route: %s -> %s via %s (%s)",
-                        hosts[src].name(), hosts[dst].name(), hosts[next_hop].name(), gateway_ip)
-                else:
-                    logging.warning(
-                        f"No link IP for %s to %s", hosts[src].name(), hosts[next_hop].name())
+                # a list of gateways is a multipath route.
+                host_routes[src].append((f'{hosts[dst].IP()}/32',
+                                         gateways[0] if len(gateways) == 1 else gateways))
+        # the route set of each host is installed in one request.
+        for_each_host(range(num_hosts), lambda i: net_backend.set_routes(
+            hosts[i], host_routes[i]))
 
-    @staticmethod
-    def _add_ip_gateway(host, gateway_ip, dst_ip):
-        host.cmd(f'ip r a {dst_ip}/32 via {gateway_ip}')
-
-    def _bfs_shortest_path(self, adjacency, start, goal):
-        queue = deque([[start]])
-        visited = set()
-        while queue:
-            path = queue.popleft()
-            node = path[-1]
-            if node == goal:
-                return path
-            if node in visited:
+    def _gateways_of(self, hosts, src, dst, next_hop):
+        """The IPs of the next hop interfaces from `src` to `dst`, `next_hop`
+        is a next hop or a list of the equal cost next hops.
+        """
+        next_hops = next_hop if isinstance(next_hop, list) else [next_hop]
+        gateways = []
+        for hop in next_hops:
+            if hop == no_route:
                 continue
-            visited.add(node)
-            for neighbor, connected in enumerate(adjacency[node]):
-                if connected and neighbor not in visited:
-                    queue.append(path + [neighbor])
-        return None
+            # Find the IP of the next hop interface
+            gateway_ip = self.pair_to_link_ip.get((hosts[src], hosts[hop]))
+            if gateway_ip:
+                gateways.append(gateway_ip)
+                logging.debug(
+                    "Static route: %s -> %s via %s (%s)",
+                    hosts[src].name(), hosts[dst].name(), hosts[hop].name(), gateway_ip)
+            else:
+                logging.warning(
+                    "No link IP for %s to %s", hosts[src].name(), hosts[hop].name())
+        return gateways
+
+    def teardown_routes(self, network: 'INetwork'):
+        net_backend = network.get_net_backend()
+        for_each_host(network.get_hosts(), net_backend.clear_routes)
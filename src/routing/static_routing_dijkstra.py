@@ -0,0 +1,94 @@
+import logging
+from typing import Dict
+import numpy as np
+from routing.static_routing_bfs import StaticRoutingBfs
+from routing.route_table import g_route_table_cache
+
+# the terms of a link cost
+link_cost_terms = ['hops', 'latency', 'bandwidth', 'etx']
+
+# the bandwidth(Mbit/s) of the unit cost of the `bandwidth` term, like the
+# reference bandwidth of OSPF.
+reference_bandwidth = 1000
+
+
+def parse_link_cost(cost: str) -> Dict[str, float]:
+    """Parse a link cost, a weighted sum of the terms of `link_cost_terms`:
+        latency
+        latency+10*etx
+    Returns {term: weight}.
+    """
+    cost_weights = {}
+    for item in cost.replace(' ', '').split('+'):
+        weight, _, term = item.rpartition('*')
+        if term not in link_cost_terms:
+            raise ValueError(f"Unsupported link cost term {term} of {cost}, "
+                             f"supported terms are {link_cost_terms}.")
+        try:
+            weight = float(weight) if weight else 1.0
+        except ValueError as e:
+            raise ValueError(f"Invalid weight of the link cost {cost}.") from e
+        if weight < 0:
+            raise ValueError(f"The weight of the link cost {cost} is negative.")
+        cost_weights[term] = cost_weights.get(term, 0.0) + weight
+    return cost_weights
+
+
+def link_cost_matrix(adjacency, cost_weights, latency=None, bandwidth=None, loss=None):
+    """The cost of every link, `np.inf` if there is no link.
+
+    The terms of a link `i` -> `j` are:
+        hops: 1.
+        latency: the latency of the link in ms.
+        bandwidth: `reference_bandwidth` / the bandwidth of the link; a
+            link without a bandwidth limit costs 0.
+        etx: the expected transmission count 1 / ((1 - loss of i -> j) *
+            (1 - loss of j -> i)), the link with a loss of 100% is unusable.
+    A term whose matrix is missing costs 0.
+    """
+    adjacency = np.asarray(adjacency) != 0
+    cost = np.zeros(adjacency.shape, dtype=float)
+    for term, weight in cost_weights.items():
+        if term == 'hops':
+            term_cost = np.ones(adjacency.shape, dtype=float)
+        elif term == 'latency' and latency is not None:
+            term_cost = np.asarray(latency, dtype=float)
+        elif term == 'bandwidth' and bandwidth is not None:
+            bandwidth = np.asarray(bandwidth, dtype=float)
+            term_cost = np.divide(reference_bandwidth, bandwidth,
+                                  out=np.zeros(bandwidth.shape), where=bandwidth > 0)
+        elif term == 'etx' and loss is not None:
+            delivery = (1 - np.asarray(loss, dtype=float) / 100).clip(0, 1)
+            delivery = delivery * delivery.T
+            term_cost = np.divide(1.0, delivery, out=np.full(delivery.shape, np.inf),
+                                  where=delivery > 0)
+        else:
+            logging.warning("The network has no matrix of the link cost term %s.", term)
+            continue
+        cost = cost + weight * term_cost
+    cost[~adjacency] = np.inf
+    return cost
+
+
+class StaticRoutingDijkstra(StaticRoutingBfs):
+    """Summary:
+    Configure static routing for the network by the least cost paths, the cost
+    of a link is computed from the latency, bandwidth and loss matrices of the
+    network, see `link_cost_matrix()`.
+    """
+
+    def __init__(self, cost: str = 'latency'):
+        super().__init__()
+        self.cost = cost
+        self.cost_weights = parse_link_cost(cost)
+
+    def depends_on_link_quality(self) -> bool:
+        return set(self.cost_weights) != {'hops'}
+
+    def compute_next_hops(self, network: 'INetwork'):
+        weights = link_cost_matrix(network.net_mat, self.cost_weights,
+                                   latency=network.net_latency_mat,
+                                   bandwidth=network.net_bw_mat,
+                                   loss=network.net_loss_mat)
+        logging.info("Static routing by the link cost %s.", self.cost)
+        return g_route_table_cache.weighted_next_hop_table(weights)
@@ -0,0 +1,38 @@
+import logging
+from routing.static_routing_bfs import StaticRoutingBfs
+from routing.route_table import g_route_table_cache
+from tools.host_fanout import for_each_host
+
+# hash policy -> the value of `net.ipv4.fib_multipath_hash_policy`
+multipath_hash_policies = {
+    'l3': 0,        # source and destination address
+    'l4': 1,        # the 5-tuple, the flows of a host pair take different paths
+    'l3_inner': 2,  # the inner addresses of the encapsulated packets
+}
+
+
+class StaticRoutingEcmp(StaticRoutingBfs):
+    """Summary:
+    Configure static multipath routing for the network: the route to every
+    destination goes through all the next hops of the shortest paths(hop count),
+    and the flows are spread over them by `hash_policy`.
+    """
+
+    def __init__(self, hash_policy: str = 'l4'):
+        super().__init__()
+        if hash_policy not in multipath_hash_policies:
+            raise ValueError(f"Unsupported multipath hash policy {hash_policy}, "
+                             f"supported policies are {list(multipath_hash_policies)}.")
+        self.hash_policy = hash_policy
+
+    def setup_routes(self, network: 'INetwork'):
+        net_backend = network.get_net_backend()
+        policy = multipath_hash_policies[self.hash_policy]
+        for_each_host(network.get_hosts(), lambda host:
+                      net_backend.set_multipath_hash_policy(host, policy))
+        logging.info("Static multipath routing with the hash policy %s.",
+                     self.hash_policy)
+        super().setup_routes(network)
+
+    def compute_next_hops(self, network: 'INetwork'):
+        return g_route_table_cache.equal_cost_next_hop_table(network.net_mat)
@@ -0,0 +1,68 @@
+import time
+import unittest
+from src.interfaces.host import (IHost, exit_code_marker)
+from src.routing.olsr_routing import (OLSRRouting, routed_originators)
+
+
+class FakeOlsrHost(IHost):
+    """A host which learns the route to one more originator every
+    `learn_interval` seconds.
+    """
+
+    def __init__(self, host_id, num_of_hosts, learn_interval):
+        super().__init__()
+        self.host_id = host_id
+        self.num_of_hosts = num_of_hosts
+        self.learn_interval = learn_interval
+        self.start = time.monotonic()
+        self.commands = []
+
+    def cmd(self, command: str) -> str:
+        self.commands.append(command)
+        learned = int((time.monotonic() - self.start) / self.learn_interval)
+        peers = [i for i in range(self.num_of_hosts) if i != self.host_id][:learned]
+        routes = "".join(f"172.23.1.{i + 1} via 10.0.0.{i + 1} dev eth0 proto 100\n"
+                         for i in peers)
+        return f"10.0.0.0/24 dev eth0 scope link\n{routes}{exit_code_marker}0\n"
+
+    def name(self) -> str:
+        return f"h{self.host_id}"
+
+    def is_connected(self) -> bool:
+        return True
+
+
+class TestOLSRRouting(unittest.TestCase):
+
+    def test_routed_originators(self):
+        output = "172.23.1.2 via 10.0.0.2 dev h0-eth0\n" \
+                 "172.23.1.13/32 via 10.0.0.2 dev h0-eth0\n" \
+                 "10.0.0.0/24 dev h0-eth0\n"
+        self.assertEqual(routed_originators(output), {1, 12})
+        self.assertEqual(routed_originators(None), set())
+
+    def test_wait_for_convergence(self):
+        # h2 learns the routes two times slower than the others.
+        hosts = [FakeOlsrHost(i, 4, 0.1 if i != 2 else 0.2) for i in range(4)]
+        start = time.monotonic()
+        convergence = OLSRRouting.wait_for_convergence(hosts, 5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(convergence['converged_hosts'], 4)
+        host_sec = convergence['hosts']
+        self.assertGreater(host_sec['h2'], host_sec['h0'])
+        self.assertEqual(convergence['network_sec'], host_sec['h2'])
+        # the converged hosts are not probed any more.
+        self.assertLess(len(hosts[0].commands), len(hosts[2].commands))
+
+    def test_not_converged(self):
+        # h1 never learns the route to h0.
+        hosts = [FakeOlsrHost(0, 2, 0.1), FakeOlsrHost(1, 2, 100)]
+        convergence = OLSRRouting.wait_for_convergence(hosts, 0.3)
+        self.assertEqual(convergence['converged_hosts'], 1)
+        self.assertIsNone(convergence['network_sec'])
+        self.assertIsNotNone(convergence['hosts']['h0'])
+        self.assertIsNone(convergence['hosts']['h1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,312 @@
+import time
+import unittest
+from collections import deque
+import numpy as np
+from src.core.random_mesh import generate_random_mesh
+from src.core.topology import MatrixType
+from src.routing.route_table import (
+    RouteTableCache, chain_adjacency,
+    equal_cost_next_hop_table, hop_distances, next_hop_table, no_route,
+    weighted_next_hop_table)
+from src.routing.static_routing_bfs import StaticRoutingBfs
+from src.routing.static_routing_dijkstra import (
+    StaticRoutingDijkstra, link_cost_matrix, parse_link_cost)
+from src.routing.static_routing_ecmp import StaticRoutingEcmp
+
+
+def path_bfs_next_hop(adjacency, start, goal):
+    """The first hop of the path found by the former path-copying BFS.
+    """
+    queue = deque([[start]])
+    visited = set()
+    while queue:
+        path = queue.popleft()
+        node = path[-1]
+        if node == goal:
+            return path[1] if len(path) > 1 else no_route
+        if node in visited:
+            continue
+        visited.add(node)
+        for neighbor, connected in enumerate(adjacency[node]):
+            if connected and neighbor not in visited:
+                queue.append(path + [neighbor])
+    return no_route
+
+
+def bfs_next_hops(adjacency, src: int):
+    """The first hop of the shortest path from `src` to every node, found by
+    one BFS from `src`; `no_route` for `src` itself and the unreachable nodes.
+    The reference of `next_hop_table()`.
+
+    The neighbors are visited in the order of their index, so the first hop
+    is the lowest indexed neighbor on a shortest path.
+    """
+    adjacency = np.asarray(adjacency)
+    next_hops = [no_route] * len(adjacency)
+    visited = np.zeros(len(adjacency), dtype=bool)
+    visited[src] = True
+    queue = deque()
+    for neighbor in np.flatnonzero(adjacency[src]):
+        visited[neighbor] = True
+        next_hops[neighbor] = int(neighbor)
+        queue.append(neighbor)
+    while queue:
+        node = queue.popleft()
+        for neighbor in np.flatnonzero(adjacency[node] & ~visited):
+            visited[neighbor] = True
+            # a node inherits the first hop of the node it is reached from.
+            next_hops[neighbor] = next_hops[node]
+            queue.append(neighbor)
+    return next_hops
+
+
+def bfs_next_hop_table(adjacency):
+    """The next hop table of all pairs, one BFS per source.
+    """
+    adjacency = np.asarray(adjacency) != 0
+    return np.array([bfs_next_hops(adjacency, src)
+                     for src in range(len(adjacency))], dtype=np.int32)
+
+
+class FakeHost:
+    def __init__(self, index):
+        self.index = index
+
+    def name(self):
+        return f"h{self.index}"
+
+    def IP(self):
+        return f"10.0.{self.index}.1"
+
+
+class FakeBackend:
+    def __init__(self):
+        self.routes = []
+        self.requests = 0
+        self.hash_policies = {}
+
+    def set_routes(self, host, routes):
+        self.requests += 1
+        self.routes.extend((host.name(), dst, gateway) for dst, gateway in routes)
+        return True
+
+    def set_multipath_hash_policy(self, host, policy):
+        self.hash_policies[host.name()] = policy
+        return True
+
+
+class FakeNetwork:
+    def __init__(self, adjacency):
+        self.net_mat = np.asarray(adjacency)
+        self.net_latency_mat = None
+        self.net_bw_mat = None
+        self.net_loss_mat = None
+        self.hosts = [FakeHost(i) for i in range(len(adjacency))]
+        self.backend = FakeBackend()
+
+    def get_hosts(self):
+        return self.hosts
+
+    def get_link_table(self):
+        rows, cols = np.nonzero(self.net_mat)
+        return {(self.hosts[i], self.hosts[j]): f"10.{i}.{j}.2"
+                for i, j in zip(rows, cols)}
+
+    def get_net_backend(self):
+        return self.backend
+
+
+class TestRouteTable(unittest.TestCase):
+
+    def setUp(self):
+        # 0 - 1 - 3, 0 - 2 - 3, 4 is isolated
+        self.adjacency = np.zeros((5, 5), dtype=np.int8)
+        for i, j in [(0, 1), (0, 2), (1, 3), (2, 3)]:
+            self.adjacency[i][j] = self.adjacency[j][i] = 1
+
+    def test_hop_distances(self):
+        distances = hop_distances(self.adjacency)
+        self.assertEqual(distances[0].tolist(), [0, 1, 1, 2, -1])
+        self.assertEqual(distances[4].tolist(), [-1, -1, -1, -1, 0])
+
+    def test_next_hop_table(self):
+        table = next_hop_table(self.adjacency)
+        self.assertEqual(table[0].tolist(), [no_route, 1, 2, 1, no_route])
+        self.assertEqual(table[3].tolist(), [1, 1, 2, no_route, no_route])
+        self.assertTrue((table[4] == no_route).all())
+        self.assertTrue((bfs_next_hop_table(self.adjacency) == table).all())
+
+    def test_same_as_path_bfs(self):
+        for model in ['erdos_renyi', 'barabasi_albert', 'geometric']:
+            adjacency = generate_random_mesh(
+                30, {'model': model, 'degree': 3, 'seed': 5})[MatrixType.ADJACENCY_MATRIX]
+            table = next_hop_table(adjacency)
+            self.assertTrue((bfs_next_hop_table(adjacency) == table).all())
+            for src in range(30):
+                for dst in range(30):
+                    self.assertEqual(table[src][dst],
+                                     path_bfs_next_hop(adjacency, src, dst))
+
+    def test_large_mesh(self):
+        adjacency = generate_random_mesh(
+            200, {'model': 'geometric', 'degree': 4, 'seed': 1})[MatrixType.ADJACENCY_MATRIX]
+        start = time.time()
+        table = next_hop_table(adjacency)
+        self.assertLess(time.time() - start, 1.0)
+        self.assertTrue((table[~np.eye(200, dtype=bool)] != no_route).all())
+
+    def test_static_routing_bfs(self):
+        network = FakeNetwork(self.adjacency)
+        StaticRoutingBfs().setup_routes(network)
+        routes = network.backend.routes
+        self.assertIn(("h0", "10.0.3.1/32", "10.0.1.2"), routes)
+        self.assertIn(("h3", "10.0.0.1/32", "10.3.1.2"), routes)
+        # 4 connected hosts, 3 routes each.
+        self.assertEqual(len(routes), 12)
+        # one request per host
+        self.assertEqual(network.backend.requests, 5)
+
+    def test_equal_cost_next_hop_table(self):
+        table = equal_cost_next_hop_table(self.adjacency)
+        self.assertEqual(table[0], [[], [1], [2], [1, 2], []])
+        self.assertEqual(table[3][0], [1, 2])
+        adjacency = generate_random_mesh(
+            40, {'model': 'geometric', 'degree': 5, 'seed': 3})[MatrixType.ADJACENCY_MATRIX]
+        table = equal_cost_next_hop_table(adjacency)
+        distances = hop_distances(adjacency)
+        first_hops = next_hop_table(adjacency)
+        for src in range(40):
+            for dst in range(40):
+                next_hops = table[src][dst]
+                self.assertEqual(next_hops[0] if next_hops else no_route,
+                                 first_hops[src][dst])
+                for hop in next_hops:
+                    self.assertEqual(distances[hop][dst], distances[src][dst] - 1)
+
+    def test_static_routing_ecmp(self):
+        network = FakeNetwork(self.adjacency)
+        StaticRoutingEcmp().setup_routes(network)
+        routes = network.backend.routes
+        self.assertIn(("h0", "10.0.3.1/32", ["10.0.1.2", "10.0.2.2"]), routes)
+        self.assertIn(("h0", "10.0.1.1/32", "10.0.1.2"), routes)
+        self.assertEqual(len(routes), 12)
+        self.assertEqual(network.backend.hash_policies["h0"], 1)
+        with self.assertRaises(ValueError):
+            StaticRoutingEcmp('l5')
+
+
+class TestRouteTableCache(unittest.TestCase):
+
+    def test_reuse_the_same_adjacency(self):
+        cache = RouteTableCache()
+        adjacency = chain_adjacency(4)
+        table = cache.next_hop_table(adjacency)
+        self.assertEqual(table[0].tolist(), [no_route, 1, 1, 1])
+        # a copy of the same matrix, of another dtype
+        self.assertTrue((cache.next_hop_table(adjacency.astype(int) * 5) == table).all())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # the cached table is not changed by the callers.
+        table[0][1] = 3
+        self.assertEqual(cache.next_hop_table(adjacency)[0][1], 1)
+        # the kinds of tables are cached apart.
+        self.assertEqual(cache.equal_cost_next_hop_table(adjacency)[0][3], [1])
+        self.assertEqual(cache.misses, 2)
+
+    def test_changed_matrix(self):
+        cache = RouteTableCache(max_entries=2)
+        weights = np.where(chain_adjacency(3) != 0, 1.0, np.inf)
+        cache.weighted_next_hop_table(weights)
+        weights[0][1] = 2.0
+        cache.weighted_next_hop_table(weights)
+        cache.next_hop_table(chain_adjacency(3))
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        # the least recently used entry is dropped.
+        self.assertEqual(len(cache.entries), 2)
+        cache.next_hop_table(chain_adjacency(3))
+        self.assertEqual(cache.hits, 1)
+
+
+class TestWeightedRouteTable(unittest.TestCase):
+
+    def setUp(self):
+        # 0 - 1 - 2 - 3 and the shortcut 0 - 3
+        self.adjacency = np.zeros((4, 4), dtype=np.int8)
+        for i, j in [(0, 1), (1, 2), (2, 3), (0, 3)]:
+            self.adjacency[i][j] = self.adjacency[j][i] = 1
+        self.latency = self.adjacency * 10
+        self.latency[0][3] = self.latency[3][0] = 50
+
+    def test_unit_weights_same_as_bfs(self):
+        for model in ['erdos_renyi', 'geometric']:
+            adjacency = generate_random_mesh(
+                30, {'model': model, 'degree': 3, 'seed': 7})[MatrixType.ADJACENCY_MATRIX]
+            weights = link_cost_matrix(adjacency, {'hops': 1})
+            self.assertTrue(
+                (weighted_next_hop_table(weights) == next_hop_table(adjacency)).all())
+
+    def test_latency_cost(self):
+        weights = link_cost_matrix(self.adjacency, parse_link_cost('latency'),
+                                   latency=self.latency)
+        table = weighted_next_hop_table(weights)
+        # 3 links of 10ms are better than the shortcut of 50ms
+        self.assertEqual(table[0].tolist(), [no_route, 1, 1, 1])
+        self.assertEqual(table[3].tolist(), [2, 2, 2, no_route])
+        # hop count prefers the shortcut
+        self.assertEqual(next_hop_table(self.adjacency)[0][3], 3)
+
+    def test_etx_and_bandwidth_cost(self):
+        loss = np.zeros((4, 4))
+        loss[0][1] = 50
+        etx = link_cost_matrix(self.adjacency, parse_link_cost('etx'), loss=loss)
+        self.assertEqual(etx[0][1], 2.0)
+        self.assertEqual(etx[1][0], 2.0)
+        self.assertEqual(etx[0][2], np.inf)
+        loss[0][1] = 100
+        etx = link_cost_matrix(self.adjacency, parse_link_cost('etx'), loss=loss)
+        self.assertEqual(weighted_next_hop_table(etx)[0][1], 3)
+        bandwidth = self.adjacency * 100
+        bandwidth[0][1] = 0
+        cost = link_cost_matrix(self.adjacency, parse_link_cost('bandwidth'),
+                                bandwidth=bandwidth)
+        self.assertEqual(cost[1][0], 10.0)
+        self.assertEqual(cost[0][1], 0.0)
+
+    def test_parse_link_cost(self):
+        self.assertEqual(parse_link_cost('latency'), {'latency': 1.0})
+        self.assertEqual(parse_link_cost('latency + 10*etx'),
+                         {'latency': 1.0, 'etx': 10.0})
+        for cost in ['distance', 'x*etx', '-1*latency']:
+            with self.assertRaises(ValueError):
+                parse_link_cost(cost)
+
+    def test_static_routing_dijkstra(self):
+        network = FakeNetwork(self.adjacency)
+        network.net_latency_mat = self.latency
+        StaticRoutingDijkstra('latency').setup_routes(network)
+        routes = network.backend.routes
+        self.assertIn(("h0", "10.0.3.1/32", "10.0.1.2"), routes)
+        self.assertIn(("h3", "10.0.0.1/32", "10.3.2.2"), routes)
+        self.assertEqual(len(routes), 12)
+
+    def test_link_quality_sweep(self):
+        self.assertFalse(StaticRoutingBfs().depends_on_link_quality())
+        self.assertFalse(StaticRoutingDijkstra('hops').depends_on_link_quality())
+        strategy = StaticRoutingDijkstra('latency')
+        self.assertTrue(strategy.depends_on_link_quality())
+        network = FakeNetwork(self.adjacency)
+        network.net_latency_mat = self.latency
+        strategy.setup_routes(network)
+        self.assertIn(("h0", "10.0.3.1/32", "10.0.1.2"), network.backend.routes)
+        # the shortcut becomes the least latency path, like a shaping-only
+        # reload of the next topology of a sweep.
+        for latency in [25, 15]:
+            network.net_latency_mat = self.latency.copy()
+            network.net_latency_mat[0][3] = network.net_latency_mat[3][0] = latency
+            network.backend.routes = []
+            strategy.setup_routes(network)
+            self.assertIn(("h0", "10.0.3.1/32", "10.0.3.2"), network.backend.routes)
+            self.assertIn(("h3", "10.0.0.1/32", "10.3.0.2"), network.backend.routes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,8 +8,11 @@ from mininet.log import setLogLevel
 
 from interfaces.network_mgr import NetworkType
 from tools.util import (is_same_path, is_base_path, parse_test_file_name)
-from var.global_var import g_root_path
+from tools.tracer import g_tracer
+from var.global_var import (
+    g_root_path, g_nested_start_trace, g_oasis_config_cache_path)
 from core.config import (IConfig, NodeConfig, load_all_tests)
+from core.config_cache import (g_config_cache, load_yaml)
 from core.network_factory import (create_network_mgr)
 from core.runner import TestRunner
 
@@ -18,8 +21,7 @@ def containernet_node_config(config_base_path, file_path) -> NodeConfig:
     """Load node related configuration from the yaml file.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as stream:
-            yaml_content = yaml.safe_load(stream)
+        yaml_content = load_yaml(file_path)
     except FileNotFoundError:
         logging.error(
             "YAML file '%s' not found.", file_path)
@@ -63,12 +65,11 @@ def load_testbed_config(name, yaml_base_path_input):
                      absolute_path_of_testbed_config_file})
         return None
     all_testbeds = None
-    with open(absolute_path_of_testbed_config_file, 'r', encoding='utf-8') as stream:
-        try:
-            all_testbeds = yaml.safe_load(stream)
-        except yaml.YAMLError as exc:
-            logging.error(exc)
-            return None
+    try:
+        all_testbeds = load_yaml(absolute_path_of_testbed_config_file)
+    except yaml.YAMLError as exc:
+        logging.error(exc)
+        return None
     logging.debug("all_testbeds: %s", all_testbeds)
     for testbed in all_testbeds.keys():
         if name == testbed:
@@ -137,6 +138,8 @@ if __name__ == '__main__':
         logging.info(f"Error: %s does not exist.", yaml_test_file_path)
         sys.exit(1)
 
+    # the config files are parsed once, and reused by later runs until they change.
+    g_config_cache.enable_disk_cache(g_oasis_config_cache_path)
     is_using_testbed = False
     cur_hosts_config = None
     network_manager = None
@@ -163,6 +166,9 @@ if __name__ == '__main__':
     if loaded_tests is None or len(loaded_tests) == 0:
         logging.error("Error: no test case found.")
         sys.exit(1)
+    nested_start_trace = f"{g_root_path}{g_nested_start_trace}"
+    if g_tracer.load(nested_start_trace):
+        os.remove(nested_start_trace)
     for test in loaded_tests:
         cur_topology = test.load_topology(config_path)
         if not cur_topology:
@@ -170,8 +176,9 @@ if __name__ == '__main__':
                 "Error: failed to load topology for test %s", test.name)
             continue
         # 1.1 The topology in one case can be composed of multiple topologies:
-        #      Traverse all the topologies in the test case.
-        for index, cur_top_ins in enumerate(cur_topology):
+        #      Traverse all the topologies in the test case, one link attribute
+        #      changes at a time so that the networks are reloaded in place.
+        for index, cur_top_ins in cur_topology.sweep():
             test_runner = TestRunner(test.yaml(), config_path, network_manager)
             test_runner.init(cur_hosts_config, cur_top_ins)
             if not test_runner.is_ready():
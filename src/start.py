@@ -3,7 +3,8 @@ import sys
 import argparse
 import logging
 
-from var.global_var import g_root_path
+from var.global_var import (g_root_path, g_nested_start_trace)
+from tools.tracer import g_tracer
 from tools.util import parse_test_file_name
 from containernet.containernet import (
     NestedContainernet, load_nested_config)
@@ -134,7 +135,10 @@ if __name__ == '__main__':
     if not nested_env:
         logging.info("Error: failed to build the nested containernet.")
         sys.exit(1)
-    nested_env.start()
+    with g_tracer.span("nested_containernet.start"):
+        nested_env.start()
+    # run_test.py picks up this span and adds it to the trace of the first test.
+    g_tracer.dump(os.path.join(oasis_workspace, g_nested_start_trace))
     nested_env.execute(
         f"python3 {g_root_path}src/run_test.py {yaml_base_path} {oasis_workspace} "
         f"{ns.tests_config_file} {debug_log} {halt}")
@@ -2,7 +2,7 @@ import logging
 import subprocess
 import os
 
-from interfaces.host import IHost
+from interfaces.host import (IHost, HostCmdResult)
 from var.global_var import g_root_path
 from .config import HostConfig
 
@@ -14,6 +14,7 @@ class LinuxHost(IHost):
     """
 
     def __init__(self, config: HostConfig):
+        super().__init__()
         self.host_config = config
         if self.host_config.ip is None:
             raise ValueError("The host IP is None.")
@@ -40,6 +41,14 @@ class LinuxHost(IHost):
         return self.is_connected_flag
 
     def cmd(self, command):
+        return self._run(command).stdout
+
+    def cmd_status(self, command: str) -> HostCmdResult:
+        # every command has its own ssh session, no need to serialize them.
+        result = self._run(command)
+        return HostCmdResult(self, result.stdout, result.returncode)
+
+    def _run(self, command):
         cmd_str = f"{self.ssh_cmd_prefix} \"{command}\""
         result = subprocess.run(
             [cmd_str], shell=True, capture_output=True, text=True, check=False)
@@ -48,7 +57,7 @@ class LinuxHost(IHost):
         if result.returncode != 0:
             logging.error("Command failed with return code %d: %s",
                           result.returncode, result.stderr)
-        return result.stdout
+        return result
 
     def cmdPrint(self, command: str) -> str:
         """Execute a command on the host and print the output.
@@ -1,9 +1,10 @@
 import logging
 from typing import List
-from core.topology import (ITopology, MatrixType)
+from core.topology import (ITopology, MatrixType, is_same_matrix)
 from interfaces.network import INetwork
 from interfaces.routing import IRoutingStrategy
 from testbed.linux_host import LinuxHost
+from tools.tracer import g_tracer
 from .config import (HostConfig)
 
 
@@ -74,16 +75,16 @@ class TestbedNetwork (INetwork):
 
     def _check_topology_change(self, top: ITopology):
         is_changed = False
-        if self.net_loss_mat != top.get_matrix(MatrixType.LOSS_MATRIX):
+        if not is_same_matrix(self.net_loss_mat, top.get_matrix(MatrixType.LOSS_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the loss matrix change.")
-        if self.net_bw_mat != top.get_matrix(MatrixType.BW_MATRIX):
+        if not is_same_matrix(self.net_bw_mat, top.get_matrix(MatrixType.BW_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the bandwidth matrix change.")
-        if self.net_latency_mat != top.get_matrix(MatrixType.LATENCY_MATRIX):
+        if not is_same_matrix(self.net_latency_mat, top.get_matrix(MatrixType.LATENCY_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the latency matrix change.")
-        if self.net_jitter_mat != top.get_matrix(MatrixType.JITTER_MATRIX):
+        if not is_same_matrix(self.net_jitter_mat, top.get_matrix(MatrixType.JITTER_MATRIX)):
             is_changed = True
             logging.info("Oasis detected the jitter matrix change.")
         if is_changed is False:
@@ -117,7 +118,8 @@ class TestbedNetwork (INetwork):
             if not host.is_connected():
                 self.is_accessible_flag = False
                 break
-        self.routing_strategy.setup_routes(self)
+        with g_tracer.span("setup_routes"):
+            self.routing_strategy.setup_routes(self)
 
         def __set_bw_limit_on(host, attached_inf, bw_limit):
             host.cmd(
@@ -98,6 +98,14 @@ class ITestSuite(ABC):
     def name(self) -> str:
         return self.config.name
 
+    def set_result_dir(self, result_dir: str):
+        """Save the results to `result_dir` instead of the test directory.
+        """
+        if not os.path.exists(result_dir):
+            os.makedirs(result_dir)
+        self.result_dir = result_dir
+        self.result.result_dir = result_dir
+
     @abstractmethod
     def post_process(self) -> bool:
         pass
@@ -45,6 +45,10 @@ class FlowCompetitionTest(ITestSuite):
         self.min_duration = 10
         self.max_duration = 20
 
+    def set_result_dir(self, result_dir: str):
+        super().set_result_dir(result_dir)
+        self.test.set_result_dir(result_dir)
+
     def is_competition_test(self) -> bool:
         return True
 
@@ -1,12 +1,15 @@
 import os
 import argparse
 import logging
-from mininet.util import ipStr, netParse
+from routing.route_table import (chain_adjacency, g_route_table_cache, no_route)
+from tools.ipam import LinkIPAM
 
 
 class ConfigGenerator:
-    def __init__(self, node_ip_range="10.0.0.0/8", path="/tmp", tun_mode="BTP", config_file_template=None):
+    def __init__(self, node_ip_range="10.0.0.0/8", path="/tmp", tun_mode="BTP",
+                 config_file_template=None, *, link_prefix=24):
         self.node_ip_range = node_ip_range
+        self.link_prefix = link_prefix
         self.path = path
         self.template = ""
         self.tun_mode = tun_mode
@@ -46,15 +49,6 @@ class ConfigGenerator:
             self.template += "tun.mapping.cnt = {tun_mapping_cnt}\n"
             self.template += "{tun_mappings}\n"
 
-    def _subnets(self, base_ip, parent_ip):
-        """Find all sibling subnets of `base_ip` in `parent_ip`."""
-        parent, parent_prefix_len = netParse(parent_ip)
-        base, prefix_len = netParse(base_ip)
-
-        max_ip = (0xffffffff >> parent_prefix_len) | parent
-        step = 1 << (32 - prefix_len)
-        yield from range(base, max_ip, step)
-
     def _generate_link_item(self, index, local_ip, remote_ip):
         return f"link.item{index}.local = {local_ip}\nlink.item{index}.remote = {remote_ip}\n"
 
@@ -120,50 +114,37 @@ class ConfigGenerator:
     def _generate_route_cfg(self, node_ips, index):
         cnt = 0
         cfg = ""
-        src_left = node_ips[index][0]
-        src_right = node_ips[index][-1]
-        for i in range(index):
-            gw = node_ips[index - 1][-1]
-            cfg += self._generate_route_item(cnt, src_left, node_ips[i][0], gw)
-            cnt += 1
-            if len(node_ips[i]) > 1:
-                cfg += self._generate_route_item(cnt,
-                                                 src_left, node_ips[i][-1], gw)
-                cnt += 1
-        for i in range(index + 1, len(node_ips)):
-            gw = node_ips[index + 1][0]
-            cfg += self._generate_route_item(cnt,
-                                             src_right, node_ips[i][0], gw)
+        # the next hops of the chain, shared with the static routing.
+        next_hops = g_route_table_cache.next_hop_table(
+            chain_adjacency(len(node_ips)))[index]
+        for i, next_hop in enumerate(next_hops):
+            if next_hop == no_route:
+                continue
+            if next_hop < index:
+                src, gw = node_ips[index][0], node_ips[next_hop][-1]
+            else:
+                src, gw = node_ips[index][-1], node_ips[next_hop][0]
+            cfg += self._generate_route_item(cnt, src, node_ips[i][0], gw)
             cnt += 1
             if len(node_ips[i]) > 1:
-                cfg += self._generate_route_item(cnt,
-                                                 src_right, node_ips[i][-1], gw)
+                cfg += self._generate_route_item(cnt, src, node_ips[i][-1], gw)
                 cnt += 1
         return cnt, cfg
 
     def _generate_node_ips(self, num_nodes):
-        base, _ = netParse(self.node_ip_range)
-        node_ip_prefix = 24
-        node_ip_start = ipStr(base) + f'/{node_ip_prefix}'
-
-        link_subnets = self._subnets(node_ip_start, self.node_ip_range)
-
-        all_ips = []
-        for _ in range(num_nodes):
-            link_ip = next(link_subnets)
-            left_ip = ipStr(link_ip + 1)
-            right_ip = ipStr(link_ip + 2)
-            all_ips.append(left_ip)
-            all_ips.append(right_ip)
+        # the links of the chain get the same subnets as in the network.
+        ipam = LinkIPAM(self.node_ip_range, self.link_prefix)
+        for i in range(num_nodes - 1):
+            ipam.allocate(i, i + 1)
 
         node_ips = []
         for i in range(num_nodes):
             if i == 0:
-                node_ips.append([all_ips[i]])
+                node_ips.append([ipam.ip_of(i, i + 1)])
             elif i == num_nodes - 1:
-                node_ips.append([all_ips[i * 2 - 1]])
+                node_ips.append([ipam.ip_of(i, i - 1)])
             else:
-                node_ips.append([all_ips[i * 2 - 1], all_ips[i * 2]])
+                node_ips.append([ipam.ip_of(i, i - 1), ipam.ip_of(i, i + 1)])
         return node_ips
 
     def _generate_oslr_node_ips(self, num_nodes, virtual_ip_prefix):
@@ -228,11 +209,13 @@ def generate_cfg_files(num_nodes, node_ip_range="10.0.0.0/8",
                        virtual_ip_prefix="1.0.0.",
                        output_dir="/tmp",
                        tun_mode="BTP",
-                       config_file_template=None):
+                       config_file_template=None,
+                       *, link_prefix=24):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     generator = ConfigGenerator(
-        node_ip_range, output_dir, tun_mode, config_file_template)
+        node_ip_range, output_dir, tun_mode, config_file_template,
+        link_prefix=link_prefix)
     generator.generate_cfg(num_nodes, virtual_ip_prefix)
 
 
@@ -0,0 +1,56 @@
+import logging
+from concurrent.futures import (ThreadPoolExecutor, wait)
+from interfaces.host import HostCmdResult
+
+
+def fan_out(hosts, command, timeout=None):
+    """Execute `command` on all `hosts` concurrently.
+
+    `command` is either a string or a function that returns the command of
+    a host. The results are returned in the order of `hosts`. `timeout` is
+    one deadline for all the hosts: a host that does not finish within
+    `timeout` seconds gets the exit code -1, and its command is cancelled
+    if it has not started yet.
+    """
+    futures = []
+    for host in hosts:
+        host_cmd = command(host) if callable(command) else command
+        futures.append(host.cmd_async(host_cmd))
+    done, _ = wait(futures, timeout=timeout)
+    results = []
+    timed_out_hosts = []
+    for host, future in zip(hosts, futures):
+        if future in done:
+            results.append(future.result())
+            continue
+        future.cancel()
+        timed_out_hosts.append(host.name())
+        results.append(HostCmdResult(host, "", -1))
+    if timed_out_hosts:
+        logging.error("fan_out: command timed out after %s seconds on %s",
+                      timeout, ", ".join(timed_out_hosts))
+    return results
+
+
+def for_each_host(hosts, func, max_workers=None):
+    """Run `func(host)` for all `hosts` concurrently, return the results
+    in the order of `hosts`.
+
+    `func` may execute several commands on its host; the commands of
+    different hosts do not wait for each other.
+    """
+    hosts = list(hosts)
+    if len(hosts) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers or len(hosts)) as pool:
+        return list(pool.map(func, hosts))
+
+
+def failed_hosts(results):
+    """The hosts of `results` whose command failed.
+    """
+    return [result.host for result in results if not result.is_succeed()]
+
+
+def is_all_succeed(results) -> bool:
+    return len(failed_hosts(results)) == 0
@@ -0,0 +1,93 @@
+import heapq
+import ipaddress
+import logging
+
+
+class LinkIPAM:
+    """LinkIPAM allocates one subnet of `link_prefix` bits per link from `ip_range`.
+
+    Released subnets are reused before new ones are taken, lowest first,
+    so a rebuilt topology gets the same addresses as before.
+    Both directions are indexed:
+        (host id, peer host id) -> ip of the host on the link
+        ip -> (host id, interface name)
+    """
+
+    def __init__(self, ip_range: str = "10.0.0.0/8", link_prefix: int = 24):
+        self.network = ipaddress.ip_network(ip_range, strict=False)
+        if link_prefix < self.network.prefixlen or link_prefix > 31:
+            raise ValueError(
+                f"link prefix /{link_prefix} does not fit in {ip_range}.")
+        self.link_prefix = link_prefix
+        self.subnet_size = 1 << (32 - link_prefix)
+        self.capacity = self.network.num_addresses // self.subnet_size
+        self.next_subnet = 0
+        # released subnet indexes
+        self.free_subnets = []
+        # (min id, max id) -> subnet index
+        self.link_subnets = {}
+        # (host id, peer host id) -> ip of the host
+        self.pair_to_ip = {}
+        # ip -> (host id, interface name)
+        self.ip_to_owner = {}
+
+    def allocate(self, id1: int, id2: int):
+        """Allocate the subnet of the link between `id1` and `id2`.
+
+        Returns the ip of `id1` and the ip of `id2` without prefix, or
+        (None, None) if the address space is exhausted.
+        """
+        key = (min(id1, id2), max(id1, id2))
+        if key in self.link_subnets:
+            return self.pair_to_ip[(id1, id2)], self.pair_to_ip[(id2, id1)]
+        if self.free_subnets:
+            index = heapq.heappop(self.free_subnets)
+        elif self.next_subnet < self.capacity:
+            index = self.next_subnet
+            self.next_subnet += 1
+        else:
+            logging.error("IPAM: no free /%s subnet left in %s.",
+                          self.link_prefix, self.network)
+            return None, None
+        base = self.network.network_address + index * self.subnet_size
+        # /31 links have no network/broadcast address(RFC 3021).
+        offset = 0 if self.link_prefix == 31 else 1
+        low_ip, high_ip = str(base + offset), str(base + offset + 1)
+        self.link_subnets[key] = index
+        self.pair_to_ip[key] = low_ip
+        self.pair_to_ip[(key[1], key[0])] = high_ip
+        self.ip_to_owner[low_ip] = (key[0], None)
+        self.ip_to_owner[high_ip] = (key[1], None)
+        return self.pair_to_ip[(id1, id2)], self.pair_to_ip[(id2, id1)]
+
+    def bind(self, ip: str, host_id: int, intf: str):
+        """Record the interface that `ip` is assigned to.
+        """
+        self.ip_to_owner[ip] = (host_id, intf)
+
+    def release(self, id1: int, id2: int) -> bool:
+        key = (min(id1, id2), max(id1, id2))
+        index = self.link_subnets.pop(key, None)
+        if index is None:
+            return False
+        for pair in (key, (key[1], key[0])):
+            self.ip_to_owner.pop(self.pair_to_ip.pop(pair), None)
+        heapq.heappush(self.free_subnets, index)
+        return True
+
+    def release_all(self):
+        for id1, id2 in list(self.link_subnets):
+            self.release(id1, id2)
+
+    def ip_of(self, host_id: int, peer_id: int):
+        """The ip of `host_id` on the link to `peer_id`.
+        """
+        return self.pair_to_ip.get((host_id, peer_id))
+
+    def owner_of(self, ip: str):
+        """The (host id, interface name) that `ip` is assigned to.
+        """
+        return self.ip_to_owner.get(ip)
+
+    def num_of_links(self) -> int:
+        return len(self.link_subnets)
@@ -0,0 +1,209 @@
+import csv
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+import numpy as np
+
+# the link attributes that a trace can change
+trace_attrs = ['bandwidth', 'loss', 'latency', 'jitter']
+
+
+@dataclass
+class LinkTraceEvent:
+    """The attributes of the link direction `src` -> `dst` change to `attrs`
+    at `time` seconds after the start of the replay.
+    """
+    time: float
+    src: int
+    dst: int
+    attrs: Dict[str, float] = field(default_factory=dict)
+
+
+def merge_events(events) -> List[LinkTraceEvent]:
+    """Sort the events by time, the events of a link at the same time are
+    merged into one; the later ones win.
+    """
+    merged = {}
+    for event in events:
+        key = (event.time, event.src, event.dst)
+        if key not in merged:
+            merged[key] = LinkTraceEvent(event.time, event.src, event.dst)
+        merged[key].attrs.update(event.attrs)
+    return sorted(merged.values(), key=lambda event: event.time)
+
+
+def load_trace_csv(csv_path: str) -> List[LinkTraceEvent]:
+    """Load a trace from a csv file with the header
+        time,src,dst[,bandwidth][,loss][,latency][,jitter]
+    `time` is in seconds; an empty attribute keeps its former value.
+    """
+    events = []
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = {'time', 'src', 'dst'} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"{csv_path} misses the columns {sorted(missing)}.")
+        for row in reader:
+            attrs = {attr: float(row[attr]) for attr in trace_attrs
+                     if row.get(attr) not in (None, '')}
+            events.append(LinkTraceEvent(float(row['time']), int(row['src']),
+                                         int(row['dst']), attrs))
+    return events
+
+
+def random_walk_trace(link, attr: str, *, low: float, high: float, step: float,
+                      interval: float, duration: float, seed=None,
+                      start=None) -> List[LinkTraceEvent]:
+    """A bounded random walk of `attr`, e.g. the bandwidth of a cellular link.
+
+    Every `interval` seconds the value moves by up to `step` in either direction.
+    """
+    if attr not in trace_attrs:
+        raise ValueError(f"Unsupported trace attribute {attr}.")
+    if interval <= 0:
+        raise ValueError(f"The interval of a trace must be positive, got {interval}.")
+    rng = np.random.default_rng(seed)
+    value = (low + high) / 2 if start is None else start
+    events = []
+    for cur_time in np.arange(0, duration, interval):
+        events.append(LinkTraceEvent(round(float(cur_time), 6), link[0], link[1],
+                                     {attr: round(float(value), 2)}))
+        value = min(high, max(low, value + rng.uniform(-step, step)))
+    return events
+
+
+def loss_burst_trace(link, *, interval: float, duration: float,
+                     good_loss: float, bad_loss: float,
+                     p_good_to_bad: float, p_bad_to_good: float,
+                     seed=None) -> List[LinkTraceEvent]:
+    """A Gilbert-Elliott loss schedule: the link switches between the good
+    state of `good_loss`% and the bad state(burst) of `bad_loss`%.
+
+    The state is drawn every `interval` seconds, events are only emitted
+    when it changes.
+    """
+    if interval <= 0:
+        raise ValueError(f"The interval of a trace must be positive, got {interval}.")
+    rng = np.random.default_rng(seed)
+    is_bad = False
+    events = [LinkTraceEvent(0.0, link[0], link[1], {'loss': good_loss})]
+    for cur_time in np.arange(interval, duration, interval):
+        switch_prob = p_bad_to_good if is_bad else p_good_to_bad
+        if rng.random() >= switch_prob:
+            continue
+        is_bad = not is_bad
+        events.append(LinkTraceEvent(
+            round(float(cur_time), 6), link[0], link[1],
+            {'loss': bad_loss if is_bad else good_loss}))
+    return events
+
+
+trace_generators = {
+    'random_walk': random_walk_trace,
+    'loss_burst': loss_burst_trace,
+}
+
+
+def load_link_traces(config_base_path: str, traces_yaml):
+    """Load the events of `link_traces` in the test case yaml:
+
+        link_traces:
+          - csv: traces/cellular.csv
+          - generator: random_walk
+            link: [0, 1]
+            attr: bandwidth
+            ...
+
+    Returns the merged events, or None on error.
+    """
+    events = []
+    for trace in traces_yaml or []:
+        trace = dict(trace)
+        try:
+            if 'csv' in trace:
+                csv_path = trace['csv']
+                if not os.path.isabs(csv_path):
+                    csv_path = os.path.join(config_base_path, csv_path)
+                events.extend(load_trace_csv(csv_path))
+                continue
+            generator = trace_generators.get(trace.pop('generator', None))
+            if generator is None:
+                logging.error("link_traces: unsupported trace %s", trace)
+                return None
+            events.extend(generator(**trace))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logging.error("link_traces: failed to load %s: %s", trace, e)
+            return None
+    return merge_events(events)
+
+
+class LinkTraceScheduler:
+    """LinkTraceScheduler replays the events of a trace on time in a thread.
+
+    `apply(event)` changes the link and returns True on success. An event
+    is applied when it is due, or right after the former one if that one
+    was late; the lag of every event is kept for `timing_report()`.
+    """
+
+    def __init__(self, events, apply, name: str = "link-trace"):
+        self.events = merge_events(events)
+        self.apply = apply
+        self.name = name
+        self.stop_event = threading.Event()
+        self.thread = None
+        # (lag, apply duration, is applied) of the replayed events, in seconds
+        self.timings = []
+
+    def start(self):
+        self.stop_event.clear()
+        self.timings = []
+        self.thread = threading.Thread(target=self._replay, name=self.name,
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def is_running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def _replay(self):
+        start = time.monotonic()
+        for event in self.events:
+            due = start + event.time
+            if self.stop_event.wait(max(0.0, due - time.monotonic())):
+                break
+            begin = time.monotonic()
+            try:
+                is_applied = bool(self.apply(event))
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error("%s: failed to apply %s: %s", self.name, event, e)
+                is_applied = False
+            self.timings.append((begin - due, time.monotonic() - begin,
+                                 is_applied))
+        logging.info("%s: replayed %s of %s events.", self.name,
+                     len(self.timings), len(self.events))
+
+    def timing_report(self) -> Dict[str, float]:
+        """The timing accuracy of the replay, in milliseconds.
+        """
+        report = {'events': len(self.events), 'replayed': len(self.timings),
+                  'failed': sum(1 for *_, ok in self.timings if not ok)}
+        if not self.timings:
+            return report
+        lags = np.array([lag for lag, _, _ in self.timings]) * 1000
+        durations = np.array([duration for _, duration, _ in self.timings]) * 1000
+        report.update({
+            'mean_lag_ms': round(float(lags.mean()), 3),
+            'p95_lag_ms': round(float(np.percentile(lags, 95)), 3),
+            'max_lag_ms': round(float(lags.max()), 3),
+            'mean_apply_ms': round(float(durations.mean()), 3),
+            'max_apply_ms': round(float(durations.max()), 3),
+        })
+        return report
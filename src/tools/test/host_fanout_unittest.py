@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from src.interfaces.host import (IHost, exit_code_marker)
+from src.tools.host_fanout import (fan_out, for_each_host, failed_hosts)
+
+
+class FakeHost(IHost):
+    """A host whose shell takes `delay` seconds for each command.
+    """
+
+    def __init__(self, name, delay=0.0, exit_code=0):
+        super().__init__()
+        self.host_name = name
+        self.delay = delay
+        self.exit_code = exit_code
+        self.commands = []
+
+    def cmd(self, command: str) -> str:
+        time.sleep(self.delay)
+        self.commands.append(command)
+        if command.endswith('&'):
+            return ""
+        return f"out of {self.host_name}\n{exit_code_marker}{self.exit_code}\n"
+
+    def name(self) -> str:
+        return self.host_name
+
+    def is_connected(self) -> bool:
+        return True
+
+
+class TestHostFanOut(unittest.TestCase):
+
+    def test_cmd_status(self):
+        result = FakeHost('h0', exit_code=2).cmd_status('ls')
+        self.assertEqual(result.output, "out of h0\n")
+        self.assertEqual(result.exit_code, 2)
+        self.assertFalse(result.is_succeed())
+
+    def test_cmd_status_of_background_command(self):
+        host = FakeHost('h0')
+        result = host.cmd_status('sleep 10 &')
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(host.commands, ['sleep 10 &'])
+
+    def test_fan_out_is_concurrent(self):
+        hosts = [FakeHost(f'h{i}', delay=0.2) for i in range(8)]
+        start = time.time()
+        results = fan_out(hosts, 'ls')
+        # the hosts wait for each other only if it takes 8 * 0.2 seconds.
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual([result.host for result in results], hosts)
+        self.assertEqual(failed_hosts(results), [])
+
+    def test_fan_out_per_host_command(self):
+        hosts = [FakeHost('h0'), FakeHost('h1', exit_code=1)]
+        results = fan_out(hosts, lambda host: f'echo {host.name()}')
+        self.assertTrue(hosts[1].commands[0].startswith('echo h1;'))
+        self.assertEqual(failed_hosts(results), [hosts[1]])
+
+    def test_fan_out_timeout(self):
+        hosts = [FakeHost('h0', delay=0.5)]
+        results = fan_out(hosts, 'ls', timeout=0.05)
+        self.assertEqual(results[0].exit_code, -1)
+
+    def test_fan_out_timeout_is_one_deadline(self):
+        hosts = [FakeHost(f'h{i}', delay=0.5) for i in range(4)] + [FakeHost('h4')]
+        start = time.time()
+        with self.assertLogs(level='ERROR') as logs:
+            results = fan_out(hosts, 'ls', timeout=0.2)
+        # not 4 * 0.2 seconds, the slow hosts share the deadline.
+        self.assertLess(time.time() - start, 0.4)
+        self.assertEqual(failed_hosts(results), hosts[:4])
+        self.assertTrue(results[4].is_succeed())
+        self.assertIn("h0, h1, h2, h3", logs.output[0])
+
+    def test_cmd_async_uses_the_shared_pool(self):
+        thread_name = []
+
+        class NamedHost(FakeHost):
+            def cmd(self, command: str) -> str:
+                thread_name.append(threading.current_thread().name)
+                return super().cmd(command)
+        self.assertTrue(NamedHost('h0').cmd_async('ls').result(timeout=1).is_succeed())
+        self.assertTrue(thread_name[0].startswith('oasis-host-cmd'))
+
+    def test_for_each_host(self):
+        hosts = [FakeHost(f'h{i}') for i in range(4)]
+        thread_ids = for_each_host(hosts, lambda host: threading.get_ident())
+        self.assertEqual(len(thread_ids), 4)
+        self.assertEqual(for_each_host([], lambda host: None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from src.tools.ipam import LinkIPAM
+
+
+class TestLinkIPAM(unittest.TestCase):
+
+    def test_allocate_default_prefix(self):
+        ipam = LinkIPAM("10.0.0.0/8", 24)
+        self.assertEqual(ipam.allocate(0, 1), ("10.0.0.1", "10.0.0.2"))
+        self.assertEqual(ipam.allocate(1, 2), ("10.0.1.1", "10.0.1.2"))
+        # the lower host id always gets the lower address
+        self.assertEqual(ipam.allocate(3, 2), ("10.0.2.2", "10.0.2.1"))
+
+    def test_allocate_compact_prefix(self):
+        ipam = LinkIPAM("10.0.0.0/24", 30)
+        self.assertEqual(ipam.allocate(0, 1), ("10.0.0.1", "10.0.0.2"))
+        self.assertEqual(ipam.allocate(1, 2), ("10.0.0.5", "10.0.0.6"))
+        ipam = LinkIPAM("10.0.0.0/24", 31)
+        self.assertEqual(ipam.allocate(0, 1), ("10.0.0.0", "10.0.0.1"))
+        self.assertEqual(ipam.allocate(1, 2), ("10.0.0.2", "10.0.0.3"))
+
+    def test_allocate_same_link_twice(self):
+        ipam = LinkIPAM("10.0.0.0/24", 30)
+        ipam.allocate(0, 1)
+        self.assertEqual(ipam.allocate(1, 0), ("10.0.0.2", "10.0.0.1"))
+        self.assertEqual(ipam.num_of_links(), 1)
+
+    def test_release_and_reuse(self):
+        ipam = LinkIPAM("10.0.0.0/24", 30)
+        ipam.allocate(0, 1)
+        ipam.allocate(1, 2)
+        ipam.allocate(2, 3)
+        self.assertTrue(ipam.release(2, 1))
+        self.assertFalse(ipam.release(2, 1))
+        self.assertIsNone(ipam.ip_of(1, 2))
+        self.assertIsNone(ipam.owner_of("10.0.0.5"))
+        self.assertEqual(ipam.allocate(1, 4), ("10.0.0.5", "10.0.0.6"))
+        ipam.release_all()
+        self.assertEqual(ipam.num_of_links(), 0)
+        self.assertEqual(ipam.allocate(0, 1), ("10.0.0.1", "10.0.0.2"))
+
+    def test_lookups(self):
+        ipam = LinkIPAM("10.0.0.0/24", 31)
+        ipam.allocate(0, 1)
+        ipam.bind("10.0.0.1", 1, "h1-eth0")
+        self.assertEqual(ipam.ip_of(0, 1), "10.0.0.0")
+        self.assertEqual(ipam.ip_of(1, 0), "10.0.0.1")
+        self.assertEqual(ipam.owner_of("10.0.0.0"), (0, None))
+        self.assertEqual(ipam.owner_of("10.0.0.1"), (1, "h1-eth0"))
+
+    def test_exhausted(self):
+        ipam = LinkIPAM("10.0.0.0/30", 31)
+        ipam.allocate(0, 1)
+        ipam.allocate(1, 2)
+        self.assertEqual(ipam.allocate(2, 3), (None, None))
+
+    def test_invalid_prefix(self):
+        with self.assertRaises(ValueError):
+            LinkIPAM("10.0.0.0/24", 16)
+        with self.assertRaises(ValueError):
+            LinkIPAM("10.0.0.0/24", 32)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from src.tools.link_trace import (
+    LinkTraceEvent, LinkTraceScheduler, load_link_traces, load_trace_csv,
+    loss_burst_trace, merge_events, random_walk_trace)
+
+
+class TestLinkTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.base_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.base_path)
+
+    def _write_csv(self, content):
+        path = os.path.join(self.base_path, 'trace.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_load_trace_csv(self):
+        path = self._write_csv("time,src,dst,bandwidth,loss\n"
+                               "0,0,1,100,\n"
+                               "1.5,0,1,,5\n")
+        events = load_trace_csv(path)
+        self.assertEqual(events, [
+            LinkTraceEvent(0.0, 0, 1, {'bandwidth': 100.0}),
+            LinkTraceEvent(1.5, 0, 1, {'loss': 5.0})])
+        with self.assertRaises(ValueError):
+            load_trace_csv(self._write_csv("t,src,dst\n"))
+
+    def test_merge_events(self):
+        events = merge_events([LinkTraceEvent(1, 0, 1, {'loss': 1}),
+                               LinkTraceEvent(0, 1, 2, {'loss': 2}),
+                               LinkTraceEvent(1, 0, 1, {'latency': 10})])
+        self.assertEqual(events, [
+            LinkTraceEvent(0, 1, 2, {'loss': 2}),
+            LinkTraceEvent(1, 0, 1, {'loss': 1, 'latency': 10})])
+
+    def test_random_walk_trace(self):
+        walk = {'low': 20, 'high': 100, 'step': 30, 'interval': 0.5,
+                'duration': 60, 'seed': 1}
+        events = random_walk_trace([0, 1], 'bandwidth', **walk)
+        self.assertEqual(len(events), 120)
+        values = [event.attrs['bandwidth'] for event in events]
+        self.assertTrue(all(20 <= value <= 100 for value in values))
+        self.assertEqual(events, random_walk_trace([0, 1], 'bandwidth', **walk))
+        with self.assertRaises(ValueError):
+            random_walk_trace([0, 1], 'delay', **walk)
+
+    def test_loss_burst_trace(self):
+        events = loss_burst_trace([1, 2], interval=0.1, duration=100,
+                                  good_loss=0, bad_loss=30,
+                                  p_good_to_bad=0.1, p_bad_to_good=0.5, seed=3)
+        losses = [event.attrs['loss'] for event in events]
+        self.assertEqual(losses[0], 0)
+        # the events are the state changes.
+        self.assertTrue(all(a != b for a, b in zip(losses, losses[1:])))
+        self.assertGreater(len(events), 10)
+
+    def test_load_link_traces(self):
+        self._write_csv("time,src,dst,latency\n2,1,0,30\n")
+        events = load_link_traces(self.base_path, [
+            {'csv': 'trace.csv'},
+            {'generator': 'loss_burst', 'link': [0, 1], 'interval': 1,
+             'duration': 1, 'good_loss': 0, 'bad_loss': 10,
+             'p_good_to_bad': 0, 'p_bad_to_good': 0}])
+        self.assertEqual(events, [LinkTraceEvent(0.0, 0, 1, {'loss': 0}),
+                                  LinkTraceEvent(2.0, 1, 0, {'latency': 30.0})])
+        self.assertIsNone(load_link_traces(self.base_path, [{'generator': 'x'}]))
+        self.assertIsNone(load_link_traces(self.base_path, [{'csv': 'none.csv'}]))
+
+    def test_scheduler_replays_on_time(self):
+        applied = []
+
+        def apply(event):
+            applied.append((time.monotonic(), event))
+            return event.src == 0
+        events = [LinkTraceEvent(0.1 * i, i % 2, 1, {'loss': i}) for i in range(4)]
+        scheduler = LinkTraceScheduler(events, apply)
+        start = time.monotonic()
+        scheduler.start()
+        time.sleep(0.5)
+        scheduler.stop()
+        self.assertEqual([event for _, event in applied], events)
+        self.assertAlmostEqual(applied[-1][0] - start, 0.3, delta=0.1)
+        report = scheduler.timing_report()
+        self.assertEqual(report['replayed'], 4)
+        self.assertEqual(report['failed'], 2)
+        self.assertLess(report['max_lag_ms'], 100)
+
+    def test_scheduler_stop(self):
+        scheduler = LinkTraceScheduler(
+            [LinkTraceEvent(10, 0, 1, {'loss': 1})], lambda event: True)
+        scheduler.start()
+        scheduler.stop(timeout=1)
+        self.assertFalse(scheduler.is_running())
+        self.assertEqual(scheduler.timing_report(),
+                         {'events': 1, 'replayed': 0, 'failed': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+from src.tools.tracer import PhaseTracer
+
+
+class TestPhaseTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tracer = PhaseTracer()
+
+    def test_span_records_complete_event(self):
+        with self.tracer.span("build_networks", networks=2):
+            pass
+        events = self.tracer.get_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['name'], "build_networks")
+        self.assertEqual(events[0]['ph'], "X")
+        self.assertGreaterEqual(events[0]['dur'], 0)
+        self.assertEqual(events[0]['args'], {'networks': '2'})
+
+    def test_span_recorded_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with self.tracer.span("test.run"):
+                raise RuntimeError("failed")
+        self.assertEqual(len(self.tracer.get_events()), 1)
+
+    def test_dump_and_load(self):
+        self.tracer.add_span("start_networks", 1.0, 2.5)
+        self.tracer.add_span("setup_routes", 0.5, 1.0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "topology-0", "oasis_trace.json")
+            self.assertTrue(self.tracer.dump(trace_file))
+            with open(trace_file, 'r', encoding='utf-8') as f:
+                trace = json.load(f)
+            names = [event['name'] for event in trace['traceEvents']]
+            self.assertEqual(names, ["setup_routes", "start_networks"])
+            self.assertEqual(trace['traceEvents'][1]['dur'], 1500000)
+            loaded = PhaseTracer()
+            self.assertTrue(loaded.load(trace_file))
+            self.assertEqual(len(loaded.get_events()), 2)
+
+    def test_load_missing_file(self):
+        self.assertFalse(self.tracer.load("/nonexistent/oasis_trace.json"))
+
+    def test_reset(self):
+        self.tracer.add_span("archive_results", 1.0, 2.0)
+        self.tracer.reset()
+        self.assertEqual(self.tracer.get_events(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTracer:
+    """PhaseTracer records the wall-clock spans of the oasis pipeline phases.
+
+    The spans are kept as complete ("X") events of the Chrome trace event
+    format, so the dumped file can be opened by chrome://tracing or Perfetto.
+    """
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Record the time spent in the `with` block as a span named `name`.
+
+        Extra keyword arguments are attached to the span as its `args`.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.time(), **args)
+
+    def add_span(self, name: str, start: float, end: float, **args):
+        event = {
+            'name': name,
+            'cat': 'oasis',
+            'ph': 'X',
+            'ts': int(start * 1e6),
+            'dur': int((end - start) * 1e6),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+        with self.lock:
+            self.events.append(event)
+
+    def get_events(self):
+        with self.lock:
+            return list(self.events)
+
+    def extend(self, events):
+        """Merge the events recorded by another process.
+        """
+        with self.lock:
+            self.events.extend(events)
+
+    def reset(self):
+        with self.lock:
+            self.events = []
+
+    def load(self, trace_file: str) -> bool:
+        """Merge the events from a trace file written by `dump()`.
+        """
+        if not os.path.exists(trace_file):
+            return False
+        try:
+            with open(trace_file, 'r', encoding='utf-8') as f:
+                trace = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Failed to load trace file %s: %s", trace_file, e)
+            return False
+        self.extend(trace.get('traceEvents', []))
+        return True
+
+    def dump(self, trace_file: str) -> bool:
+        trace_dir = os.path.dirname(trace_file)
+        if trace_dir and not os.path.exists(trace_dir):
+            os.makedirs(trace_dir)
+        events = sorted(self.get_events(), key=lambda e: e['ts'])
+        try:
+            with open(trace_file, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': events,
+                          'displayTimeUnit': 'ms'}, f)
+        except OSError as e:
+            logging.error("Failed to write trace file %s: %s", trace_file, e)
+            return False
+        logging.info("Oasis phase trace is saved to %s", trace_file)
+        return True
+
+
+# the tracer shared by the whole oasis process
+g_tracer = PhaseTracer()
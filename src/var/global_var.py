@@ -2,3 +2,9 @@
 g_root_path = '/root/oasis/'
 # after oasis workspace is mapped, the root fs path is at
 g_oasis_root_fs = '/root/oasis/src/config/rootfs/'
+# batched setup scripts, visible to both oasis and the docker nodes
+g_oasis_batch_path = '/root/oasis/test_results/.batch/'
+# parsed config files, reused by the runs until the files change
+g_oasis_config_cache_path = '/root/oasis/test_results/.config_cache/'
+# trace of the nested containernet start, relative to the oasis workspace
+g_nested_start_trace = 'test_results/.nested_start_trace.json'